@@ -1,11 +1,28 @@
 from fastapi import FastAPI, UploadFile, Form
 from fastapi.middleware.cors import CORSMiddleware
-import tempfile
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 import os
-import sys
-from iengine import parse_input_file, get_solver
+import json
+import hashlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional
+from iengine import (parse_input_text, get_solver, solver_options, split_queries, answer_queries, format_result,
+                     parse_passes, make_budget)
+from sequence import Unknown, BudgetExceeded
+from solver_pool import SolverPool, PoolBusy, PoolTimeout
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    """Warm the solver pool up with the app and stop its workers on shutdown."""
+    POOL.start()
+    try:
+        yield
+    finally:
+        POOL.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,52 +32,411 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Rows returned per truth table page; further pages come from /api/truth-table
+TRUTH_TABLE_PAGE_SIZE = 256
+MAX_TRUTH_TABLE_PAGE_SIZE = 4096
+# Rows per event when streaming the truth table
+TRUTH_TABLE_CHUNK_SIZE = 256
+
+
+class LRUCache:
+    """Least-recently-used cache bounded by entry count and an approximate byte budget."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (value, size)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached value (marking it most recently used), or None."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, size: int = 1):
+        """Store a value charged at `size` bytes, evicting the least recently used entries to fit."""
+        if key in self.entries:
+            self.bytes -= self.entries.pop(key)[1]
+        if size > self.max_bytes:
+            return
+        self.entries[key] = (value, size)
+        self.bytes += size
+        while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def stats(self):
+        return {'entries': len(self.entries), 'bytes': self.bytes, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+
+class Metrics:
+    """Running totals of the engines' statistics, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self.solves = {}    # method -> solves run
+        self.errors = {}    # method -> requests that failed
+        self.counters = {}  # (method, counter) -> total
+        self.seconds = {}   # (method, phase) -> total wall time
+
+    def record(self, method: str, stats: dict):
+        """Add one solve's statistics ('<phase>_seconds' timings and integer counters)."""
+        self.solves[method] = self.solves.get(method, 0) + 1
+        for key, value in stats.items():
+            if key.endswith('_seconds'):
+                phase = (method, key[:-len('_seconds')])
+                self.seconds[phase] = self.seconds.get(phase, 0.0) + value
+            elif isinstance(value, int):
+                self.counters[(method, key)] = self.counters.get((method, key), 0) + value
+
+    def record_error(self, method: str):
+        self.errors[method] = self.errors.get(method, 0) + 1
+
+    def render(self, pool_stats: dict, cache_stats: dict):
+        lines = []
+
+        def family(name, kind, help, samples):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{label}"' for key, label in labels)
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        family("iengine_solves_total", "counter", "Solves run, by method.",
+               [((("method", method),), count) for method, count in sorted(self.solves.items())])
+        family("iengine_errors_total", "counter", "Solve requests that failed, by method.",
+               [((("method", method),), count) for method, count in sorted(self.errors.items())])
+        family("iengine_engine_events_total", "counter",
+               "Engine work counters (models evaluated, rule firings, decisions, ...) summed over solves.",
+               [((("method", method), ("counter", counter)), total)
+                for (method, counter), total in sorted(self.counters.items())])
+        family("iengine_phase_seconds_total", "counter", "Wall time per solve phase (parse, cnf, search).",
+               [((("method", method), ("phase", phase)), f"{total:.6f}")
+                for (method, phase), total in sorted(self.seconds.items())])
+        family("iengine_pool_pending", "gauge", "Requests running or waiting for a worker.",
+               [((), pool_stats["pending"])])
+        for key, help in (("completed", "Pool requests completed."), ("timeouts", "Pool requests that timed out."),
+                          ("rejected", "Pool requests turned away while busy.")):
+            family(f"iengine_pool_{key}_total", "counter", help, [((), pool_stats[key])])
+        for key in ("hits", "misses", "evictions"):
+            family(f"iengine_result_cache_{key}_total", "counter", f"Result cache {key}.", [((), cache_stats[key])])
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = Metrics()
+
+
+# Solvers keep their compiled KB (parsed formulas, CNF, Horn rule indexes) between
+# requests in each pool worker, keyed by a hash of the normalized KB. Entries are charged by KB text
+# length times a rough expansion factor for the compiled structures.
+SOLVER_CACHE = LRUCache(max_entries=64, max_bytes=256 * 1024 * 1024)
+RESULT_CACHE = LRUCache(max_entries=1024, max_bytes=64 * 1024 * 1024)
+COMPILED_BYTES_PER_CHAR = 64
+
+
+def kb_hash(kb_clauses):
+    """Content address of a KB: the hash of its clauses with whitespace removed."""
+    normalized = ';'.join(clause.replace(' ', '') for clause in kb_clauses)
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def solver_key(method, kb_clauses, options):
+    return (kb_hash(kb_clauses), method, tuple(sorted(options.items())))
+
+
+def cached_solver(method, kb_clauses, options):
+    """Return the solver for this KB and method, reusing a compiled one when cached."""
+    key = solver_key(method, kb_clauses, options)
+    solver = SOLVER_CACHE.get(key)
+    if solver is None:
+        solver = get_solver(method, kb_clauses, **options)
+        SOLVER_CACHE.put(key, solver, COMPILED_BYTES_PER_CHAR * sum(len(clause) for clause in kb_clauses))
+    return key, solver
+
+
+def solve_request(method, kb_clauses, query, options, budget=None):
+    """Solve one query and build the /api/process response; runs in a pool worker."""
+    _, solver = cached_solver(method, kb_clauses, options)
+
+    # Solve the query; the stats are this solve's, whatever building the page adds later
+    result, additional_info = solver.solve(query, budget=budget)
+    stats = dict(solver.stats)
+    
+    response_data = {}
+    
+    # Out of budget: which limit was hit and the progress made, in place of an answer
+    if isinstance(result, Unknown):
+        response_data["result"] = "UNKNOWN"
+        response_data["unknown"] = result.to_dict()
+        response_data["stats"] = stats
+        return response_data
+    
+    # Format the result string as the CLI prints it
+    response_data["result"] = format_result(method, result, additional_info)
+        
+    # If using TT method, include the first page of truth table data
+    if method == "TT":
+        truth_table = solver.get_truth_table(query, limit=TRUTH_TABLE_PAGE_SIZE)
+        response_data["truthTable"] = truth_table
+     
+    # If using DPLL or CDCL method, include the assignment and trace
+    if method in ("DPLL", "CDCL"):
+        response_data["assignment"] = additional_info
+        response_data["steps"] = additional_info.get("steps", [])
+    # Counters and time per phase of this solve (CDCL's include its search statistics)
+    response_data["stats"] = stats
+    # Chaining steps are only rendered into dicts when a trace was asked for
+    if method in ("FC", "BC") and solver.trace.level != "off":
+        response_data["steps"] = solver.steps
+    if solver.trace.level != "off":
+        response_data["trace"] = solver.trace.summary()
+
+    return response_data
+
+
+def batch_request(method, kb_clauses, query):
+    """Answer every query of an ASK section; runs in a pool worker."""
+    _, solver = cached_solver(method, kb_clauses, solver_options(method))
+    results = answer_queries(solver, split_queries(query))
+    return {"results": [{"query": q, "result": "YES" if entailed else "NO"} for q, entailed in results]}
+
+
+def truth_table_request(kb_clauses, query, options, start, limit, filter, budget):
+    """Build one truth table page within the budget, or an UNKNOWN response; runs in a pool worker.
+
+    The query is solved first, so the page's summary reuses a count made within the budget.
+    """
+    _, solver = cached_solver("TT", kb_clauses, options)
+    budget = budget.started()
+    result, _ = solver.solve(query, budget=budget)
+    if isinstance(result, Unknown):
+        return {"result": "UNKNOWN", "unknown": result.to_dict()}
+    try:
+        return solver.get_truth_table(query, start=start, limit=limit, filter=filter, budget=budget)
+    except BudgetExceeded as e:
+        return {"result": "UNKNOWN", "unknown": Unknown(e.reason, e.progress).to_dict()}
+
+
+def stream_request(method, kb_clauses, query, options, rows_limit, budget, emit):
+    """Solve one query within the budget, emitting trace events as the engine runs; runs in a pool worker.
+
+    FC/BC steps, DPLL decisions and conflicts and CDCL restarts are emitted as
+    they happen, and for TT the first `rows_limit` rows follow in chunks. Returns the final result record, whose result is
+    "UNKNOWN" (with the limit and progress under "unknown") if the solve ran
+    out of budget. Should the rows then run out of it, they stop early and
+    the record carries "rows_unknown" alongside the answer.
+    """
+    _, solver = cached_solver(method, kb_clauses, options)
+    budget = budget.started()
+    solver.on_step = emit
+    try:
+        result, additional_info = solver.solve(query, budget=budget)
+    finally:
+        solver.on_step = None
+    stats = dict(solver.stats)
+
+    if isinstance(result, Unknown):
+        return {"type": "result", "result": "UNKNOWN", "unknown": result.to_dict(), "stats": stats}
+    final = {"type": "result", "result": format_result(method, result, additional_info)}
+
+    if method == "TT":
+        symbols, _ = solver._prepare(query)
+        emit({"type": "truth_table", "symbols": symbols, "clauses": solver.kb.clauses, "query": query})
+        chunk = []
+        try:
+            for row in solver.iter_truth_table(query, limit=rows_limit, budget=budget):
+                chunk.append(row)
+                if len(chunk) == TRUTH_TABLE_CHUNK_SIZE:
+                    emit({"type": "rows", "rows": chunk})
+                    chunk = []
+        except BudgetExceeded as e:
+            final["rows_unknown"] = Unknown(e.reason, e.progress).to_dict()
+        if chunk:
+            emit({"type": "rows", "rows": chunk})
+        final["summary"] = solver.get_summary(query)
+    if method in ("DPLL", "CDCL"):
+        # The steps have already been streamed
+        final["assignment"] = {key: value for key, value in additional_info.items() if key != "steps"}
+    final["stats"] = stats
+    return final
+
+
+def trace_options(method, trace_level, trace_limit, default):
+    """Trace options for a request: the requested level, else `default` for DPLL/CDCL
+    (whose steps are part of the response) and 'off' for the other engines."""
+    if trace_level is None:
+        trace_level = default if method in ("DPLL", "CDCL") else "off"
+    return {"trace_level": trace_level, "trace_limit": trace_limit}
+
+
+def solver_cache_stats():
+    return SOLVER_CACHE.stats()
+
+
+# Solving runs in warm worker processes, each with its own SOLVER_CACHE, so the
+# event loop stays free. A request past the timeout has its worker killed; past
+# the queue limit, requests are turned away with 429 rather than piling up.
+POOL_WORKERS = int(os.environ.get('IENGINE_WORKERS', os.cpu_count() or 1))
+POOL_MAX_PENDING = int(os.environ.get('IENGINE_MAX_PENDING', 4 * POOL_WORKERS))
+REQUEST_TIMEOUT = float(os.environ.get('IENGINE_TIMEOUT', 30))
+POOL = SolverPool(POOL_WORKERS, POOL_MAX_PENDING, REQUEST_TIMEOUT, stats=solver_cache_stats)
+# Deadline of a solve in a request, so a hard query answers UNKNOWN with its
+# progress before the pool timeout kills the worker (and its warm caches)
+SOLVE_TIMEOUT = float(os.environ.get('IENGINE_SOLVE_TIMEOUT', 0.8 * REQUEST_TIMEOUT))
+
+
+def request_budget(timeout=None, *limits):
+    """Budget of a request's solve: the given limits, with a deadline of `timeout` but at most SOLVE_TIMEOUT."""
+    return make_budget(SOLVE_TIMEOUT if timeout is None else min(timeout, SOLVE_TIMEOUT), *limits)
+
+
+async def run_in_pool(function, *args):
+    """Run a request in the solver pool, mapping pool failures to HTTP errors."""
+    try:
+        return await POOL.run(function, *args)
+    except PoolBusy as e:
+        return JSONResponse(status_code=429, content={"error": f"Server busy, try again later: {e}"})
+    except PoolTimeout as e:
+        return JSONResponse(status_code=504, content={"error": str(e)})
+    except RuntimeError as e:
+        return {"error": str(e)}
+
+
+async def load_upload(file: UploadFile):
+    """Parse an uploaded KB file into its clauses and query, straight from its bytes."""
+    content = await file.read()
+    return parse_input_text(content.decode('utf-8'))
+
+
 @app.post("/api/process")
-async def process_file(file: UploadFile, method: str = Form(...)):
+async def process_file(file: UploadFile, method: str = Form(...), tt_mode: Optional[str] = Form(None),
+                       block_size: Optional[int] = Form(None),
+                       trace_level: Optional[str] = Form(None), trace_limit: Optional[int] = Form(None),
+                       node_limit: Optional[int] = Form(None), general_path: bool = Form(False),
+                       preprocess: Optional[str] = Form(None), slice_query: bool = Form(True),
+                       timeout: Optional[float] = Form(None), max_models: Optional[int] = Form(None),
+                       max_decisions: Optional[int] = Form(None), max_conflicts: Optional[int] = Form(None),
+                       max_trace_events: Optional[int] = Form(None)):
     try:
-        # Create a temporary file to store the uploaded content
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.txt') as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
-
-        # Parse the input file and create the solver
-        kb_clauses, query = parse_input_file(tmp_file_path)
-        solver = get_solver(method, kb_clauses)
-
-        # Solve the query
-        result, additional_info = solver.solve(query)
-        
-        response_data = {}
-        
-        # Format the result string
-        if result:
-            info_str = str(additional_info) if isinstance(additional_info, int) else ', '.join(additional_info)
-            response_data["result"] = f'YES: {info_str}'
-        else:
-            response_data["result"] = "NO"
-            
-        # If using TT method, include truth table data
-        if method == "TT":
-            truth_table = solver.get_truth_table(query)
-            response_data["truthTable"] = truth_table
-         
-        # If using DPLL method, include DPLL result data
-        if method == "DPLL":
-            response_data["assignment"] = additional_info
-            response_data["steps"] = additional_info.get("steps", [])
-
-        # Clean up the temporary file
-        os.unlink(tmp_file_path)
+        # Parse the input file; the solver itself is built in a pool worker
+        kb_clauses, query = await load_upload(file)
+        # Truth table worker processes are CLI-only: a request must not fork past the pool's bound
+        options = solver_options(method, tt_mode, block_size, node_limit=node_limit, general_path=general_path,
+                                 preprocess=None if preprocess is None else parse_passes(preprocess),
+                                 slice_query=slice_query,
+                                 **trace_options(method, trace_level, trace_limit, "full"))
+        budget = request_budget(timeout, max_models, max_decisions, max_conflicts, max_trace_events)
+        result_key = solver_key(method, kb_clauses, options) + (query,)
+        response_data = RESULT_CACHE.get(result_key)
+        if response_data is not None:
+            return response_data
 
+        response_data = await run_in_pool(solve_request, method, kb_clauses, query, options, budget)
+        if isinstance(response_data, dict) and "error" not in response_data:
+            METRICS.record(method, response_data["stats"])
+            # A YES or NO holds under any budget; an UNKNOWN may not recur under a larger one
+            if response_data["result"] != "UNKNOWN":
+                RESULT_CACHE.put(result_key, response_data, len(repr(response_data)))
+        else:
+            METRICS.record_error(method)
         return response_data
 
     except Exception as e:
         return {"error": str(e)}
 
 
+@app.post("/api/process/stream")
+async def process_file_stream(file: UploadFile, method: str = Form(...), tt_mode: Optional[str] = Form(None),
+                              block_size: Optional[int] = Form(None),
+                              rows_limit: int = Form(TRUTH_TABLE_PAGE_SIZE), format: str = Form('ndjson'),
+                              trace_level: Optional[str] = Form(None), timeout: Optional[float] = Form(None)):
+    """Stream the solver's trace as it runs, as NDJSON lines or (format=sse) Server-Sent Events.
+
+    Events are {"type": "step"|"progress"|"truth_table"|"rows", ...}; the last
+    one is {"type": "result", ...}, or {"type": "error", ...} if solving failed.
+    Steps are streamed whatever the trace level, which by default is 'off' so
+    the worker keeps none of them.
+    """
+    sse = format == 'sse'
+
+    def encode(event):
+        line = json.dumps(event)
+        return f"data: {line}\n\n" if sse else line + "\n"
+
+    try:
+        kb_clauses, query = await load_upload(file)
+        options = solver_options(method, tt_mode, block_size,
+                                 **trace_options(method, trace_level, None, "off"))
+        budget = request_budget(timeout)
+    except Exception as e:
+        return {"error": str(e)}
+
+    async def events():
+        try:
+            async for kind, event in POOL.stream(stream_request, method, kb_clauses, query, options,
+                                                   min(rows_limit, MAX_TRUTH_TABLE_PAGE_SIZE), budget):
+                if kind == "result":
+                    METRICS.record(method, event["stats"])
+                yield encode(event)
+        except (PoolBusy, PoolTimeout, RuntimeError) as e:
+            METRICS.record_error(method)
+            yield encode({"type": "error", "error": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream" if sse else "application/x-ndjson")
+
+
+@app.post("/api/batch")
+async def process_batch(file: UploadFile, method: str = Form(...)):
+    """Answer every query of the ASK section against one loaded KB."""
+    try:
+        kb_clauses, query = await load_upload(file)
+        return await run_in_pool(batch_request, method, kb_clauses, query)
+
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@app.post("/api/truth-table")
+async def truth_table_page(file: UploadFile, start: int = Form(0), limit: int = Form(TRUTH_TABLE_PAGE_SIZE),
+                           filter: str = Form('all'), tt_mode: Optional[str] = Form(None),
+                           timeout: Optional[float] = Form(None)):
+    """Return one page of truth table rows, streamed from the model space rather than materialised.
+
+    Counting the models and scanning for the page share one budget; past it the
+    response is "UNKNOWN" as in /api/process.
+    """
+    try:
+        kb_clauses, query = await load_upload(file)
+        return await run_in_pool(truth_table_request, kb_clauses, query, solver_options("TT", tt_mode),
+                                 start, min(limit, MAX_TRUTH_TABLE_PAGE_SIZE), filter, request_budget(timeout))
+
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@app.get("/api/cache")
+async def cache_stats():
+    """Report the result cache, the solver pool and the solver caches summed over its workers."""
+    pool_stats = POOL.stats()
+    return {"solvers": pool_stats.pop("worker_stats"), "results": RESULT_CACHE.stats(), "pool": pool_stats}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Engine counters and phase timings summed over all solves, for Prometheus to scrape."""
+    return PlainTextResponse(METRICS.render(POOL.stats(), RESULT_CACHE.stats()),
+                             media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
-
-
@@ -0,0 +1,118 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from iengine import parse_input_text, split_queries, get_solver, format_result
+
+METHODS = ['TT', 'FC', 'BC', 'DPLL']
+
+
+def expand_inputs(paths, manifest=None):
+    """Resolve files, directories (every .txt inside) and glob patterns into a sorted list of input files.
+
+    A manifest is a text file listing one path or pattern per line; blank lines
+    and lines starting with '#' are ignored, and relative entries are taken
+    relative to the manifest.
+    """
+    patterns = list(paths)
+    if manifest:
+        base = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest, 'r') as file:
+            for line in file:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    patterns.append(os.path.join(base, line))
+
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            files.extend(sorted(glob.glob(os.path.join(pattern, '*.txt'))))
+        elif glob.has_magic(pattern):
+            files.extend(sorted(glob.glob(pattern)))
+        else:
+            files.append(pattern)
+    # Keep the first occurrence of each file
+    return list(dict.fromkeys(files))
+
+
+def run_file(filename, methods):
+    """Run every method on every query of one input file; returns one record per run.
+
+    The solver for each method is built once and reused for all the file's
+    queries. Records carry the solver's load time and the time of each solve.
+    """
+    try:
+        with open(filename, 'r') as file:
+            kb_clauses, query = parse_input_text(file.read())
+    except (OSError, ValueError) as e:
+        return [{'file': filename, 'error': str(e)}]
+    queries = split_queries(query)
+
+    records = []
+    for method in methods:
+        start = time.perf_counter()
+        try:
+            solver = get_solver(method, kb_clauses, trace_level='off')
+        except ValueError as e:
+            records.append({'file': filename, 'method': method, 'error': str(e)})
+            continue
+        load_seconds = time.perf_counter() - start
+
+        for q in queries:
+            start = time.perf_counter()
+            try:
+                result, additional_info = solver.solve(q)
+            except Exception as e:
+                records.append({'file': filename, 'method': method, 'query': q, 'error': str(e)})
+                continue
+            records.append({
+                'file': filename,
+                'method': method,
+                'query': q,
+                'result': format_result(method, result, additional_info),
+                'load_seconds': round(load_seconds, 6),
+                'seconds': round(time.perf_counter() - start, 6),
+            })
+    return records
+
+
+def run_batch(files, methods, workers=1):
+    """Yield the records of every file in order, running files across `workers` processes."""
+    if workers <= 1:
+        for filename in files:
+            yield from run_file(filename, methods)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for records in pool.map(run_file, files, [methods] * len(files)):
+            yield from records
+
+
+def parse_arguments(argv):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(usage="python batch.py <path|dir|glob>... [--manifest FILE] [--methods TT,FC,...] [--workers N]")
+    parser.add_argument('paths', nargs='*')
+    parser.add_argument('--manifest', default=None,
+                        help="Text file listing input files or glob patterns, one per line")
+    parser.add_argument('--methods', type=lambda value: [m.strip().upper() for m in value.split(',') if m.strip()],
+                        default=METHODS, help="Comma-separated inference methods to run on every file")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes; each runs whole files")
+    args = parser.parse_args(argv)
+    if not args.paths and not args.manifest:
+        parser.error("give at least one input path or a manifest")
+    return args
+
+
+def main():
+    args = parse_arguments(sys.argv[1:])
+    files = expand_inputs(args.paths, args.manifest)
+    # One JSON object per line, flushed as soon as each file's runs finish
+    for record in run_batch(files, args.methods, args.workers):
+        print(json.dumps(record), flush=True)
+
+
+if __name__ == "__main__":
+    main()
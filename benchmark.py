@@ -0,0 +1,267 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import zipfile
+from iengine import parse_input_text, get_solver, format_result
+from sequence import KnowledgeBase, TruthTable
+
+METHODS = ['TT', 'FC', 'BC', 'DPLL', 'CDCL']
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+TESTS_ARCHIVE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Tests_2024.zip')
+
+# Expected TT output on the Tests_2024 cases. The other engines only have to
+# agree on YES/NO, since the facts FC and BC list are their own; FC and BC
+# are not run on the non-Horn KBs they reject.
+EXPECTED = {
+    'Generic_1.txt': 'YES: 3',
+    'Generic_2.txt': 'NO',
+    'Generic_3.txt': 'YES: 1',
+    'Generic_4.txt': 'NO',
+    'Generic_5.txt': 'YES: 1',
+    'Horn_1.txt': 'NO',
+    'Horn_2.txt': 'YES: 3',
+    'Horn_3.txt': 'YES: 7',
+    'Horn_4.txt': 'NO',
+    'Horn_5.txt': 'YES: 4',
+}
+
+
+def chain(size, rng):
+    """p0; p0 => p1; ...; p(n-1) => pn, asking pn: one long derivation (entailed)."""
+    clauses = ['p0'] + [f'p{i} => p{i + 1}' for i in range(size)]
+    return clauses, f'p{size}', True
+
+
+def fan_in(size, rng, width=4):
+    """`width` facts, then `size` rules each concluding a new symbol from `width`
+    earlier ones, asking the last: wide conjunctions, all derivable (entailed)."""
+    clauses = [f'x{i}' for i in range(width)]
+    for i in range(width, width + size):
+        premises = rng.sample(range(i), width)
+        clauses.append(f"{' & '.join(f'x{p}' for p in premises)} => x{i}")
+    return clauses, f'x{width + size - 1}', True
+
+
+def random_kcnf(size, rng, k=3, ratio=4.26):
+    """Random k-CNF over `size` variables at the 3-SAT phase transition ratio,
+    asking one variable.
+
+    Clauses are drawn at random but kept only if a hidden assignment satisfies
+    them, so the KB is always consistent and every engine gives the same answer
+    (an inconsistent KB is where TT and DPLL conventions differ).
+    """
+    planted = [rng.random() < 0.5 for _ in range(size)]
+    clauses = []
+    while len(clauses) < round(ratio * size):
+        variables = rng.sample(range(size), min(k, size))
+        signs = [rng.random() < 0.5 for _ in variables]
+        if any(planted[v] == sign for v, sign in zip(variables, signs)):
+            clauses.append(' || '.join(f"{'' if sign else '~'}v{v}" for v, sign in zip(variables, signs)))
+    return clauses, f'v{rng.randrange(size)}', None
+
+
+def biconditionals(size, rng):
+    """Generic KB of nested biconditionals: each symbol after the first few is
+    defined as a random connective over earlier ones, plus a few facts, asking
+    one symbol. Facts follow a hidden assignment so the KB is consistent."""
+    planted = {}
+    clauses = []
+    seeds = min(4, size)
+    for i in range(seeds):
+        planted[i] = rng.random() < 0.5
+        clauses.append(f"{'' if planted[i] else '~'}b{i}")
+    operators = [('&', lambda a, b: a and b), ('||', lambda a, b: a or b),
+                 ('=>', lambda a, b: not a or b), ('<=>', lambda a, b: a == b)]
+    for i in range(seeds, size):
+        a, b = rng.sample(range(i), 2)
+        symbol, function = rng.choice(operators)
+        negated = rng.random() < 0.5
+        planted[i] = function(planted[a], planted[b] != negated)
+        clauses.append(f"b{i} <=> (b{a} {symbol} {'~' if negated else ''}b{b})")
+    return clauses, f'b{rng.randrange(size)}', None
+
+
+GENERATORS = {
+    'chain': (chain, [8, 64, 512, 4096]),
+    'fan_in': (fan_in, [8, 64, 512, 2048]),
+    'kcnf': (random_kcnf, [8, 16, 64, 256]),
+    'biconditional': (biconditionals, [8, 16, 64, 256]),
+}
+
+
+def time_solve(method, kb_clauses, query, repeat, options):
+    """Build a fresh solver for each run (so no per-query memo carries over) and
+    time only its solve(); returns (best seconds, result, additional info)."""
+    best = None
+    for _ in range(repeat):
+        solver = get_solver(method, kb_clauses, trace_level='off', **options)
+        start = time.perf_counter()
+        result, additional_info = solver.solve(query)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result, additional_info
+
+
+def run_case(name, kb_clauses, query, expected, methods, repeat, tt_max_symbols, tt_mode='enumerate'):
+    """Time every applicable method on one KB and check their answers.
+
+    TT is skipped above `tt_max_symbols` symbols and FC/BC on non-Horn KBs.
+    Returns the case record and a list of answer errors.
+    """
+    kb = KnowledgeBase(kb_clauses)
+    record = {'symbols': len(kb.symbols), 'clauses': len(kb_clauses), 'seconds': {}, 'answers': {}}
+    errors = []
+    for method in methods:
+        if method == 'TT' and len(kb.symbols) > tt_max_symbols:
+            continue
+        if method in ('FC', 'BC') and not kb.is_horn_form:
+            continue
+        options = {'mode': tt_mode} if method == 'TT' else {}
+        seconds, result, _ = time_solve(method, kb_clauses, query, repeat, options)
+        record['seconds'][method] = round(seconds, 6)
+        record['answers'][method] = bool(result)
+    answers = set(record['answers'].values())
+    if len(answers) > 1:
+        errors.append(f"{name}: engines disagree: {record['answers']}")
+    elif expected is not None and answers and answers != {expected}:
+        errors.append(f"{name}: expected {'YES' if expected else 'NO'}, got {record['answers']}")
+    return record, errors
+
+
+def run_synthetic(generators, methods, repeat, tt_max_symbols, tt_mode='enumerate', max_size=None, seed=0):
+    """Yield (name, record, errors) for every generator at each of its sizes."""
+    for generator_name in generators:
+        generator, sizes = GENERATORS[generator_name]
+        for size in sizes:
+            if max_size is not None and size > max_size:
+                continue
+            kb_clauses, query, expected = generator(size, random.Random(f'{seed}/{generator_name}/{size}'))
+            name = f'{generator_name}/{size}'
+            record, errors = run_case(name, kb_clauses, query, expected, methods, repeat, tt_max_symbols, tt_mode)
+            yield name, record, errors
+
+
+def check_tests_archive(methods, tt_max_symbols, archive=TESTS_ARCHIVE):
+    """Check every engine's answer on the cases of Tests_2024.zip; returns a list of errors.
+
+    KBs with more than `tt_max_symbols` symbols are checked with the pruned
+    truth table, which gives the same count without visiting every model.
+    """
+    errors = []
+    with zipfile.ZipFile(archive) as tests:
+        for member in sorted(tests.namelist()):
+            filename = os.path.basename(member)
+            if member.startswith('__MACOSX/') or not filename.endswith('.txt'):
+                continue
+            if filename not in EXPECTED:
+                errors.append(f"{filename}: no expected answer recorded")
+                continue
+            kb_clauses, query = parse_input_text(tests.read(member).decode('utf-8'))
+            kb = KnowledgeBase(kb_clauses)
+            expected = EXPECTED[filename]
+            for method in methods:
+                options = {'mode': 'pruned'} if method == 'TT' and len(kb.symbols) > tt_max_symbols else {}
+                try:
+                    result, additional_info = get_solver(method, kb_clauses, trace_level='off', **options).solve(query)
+                except ValueError:
+                    if method in ('FC', 'BC') and not kb.is_horn_form:
+                        continue  # Non-Horn KBs are rejected by the chaining engines
+                    raise
+                output = format_result(method, result, additional_info)
+                if method != 'TT':
+                    output, expected_output = output.split(':')[0], expected.split(':')[0]
+                else:
+                    expected_output = expected
+                if output != expected_output:
+                    errors.append(f"{filename} {method}: expected {expected_output}, got {output}")
+    return errors
+
+
+def compare(results, baseline, threshold, min_seconds):
+    """List the (case, method) timings more than `threshold` (a fraction) slower than
+    the baseline; timings under `min_seconds` on both sides are too noisy to judge."""
+    regressions = []
+    for name, record in results.items():
+        previous = baseline.get(name, {}).get('seconds', {})
+        for method, seconds in record['seconds'].items():
+            before = previous.get(method)
+            if before is None or max(seconds, before) < min_seconds:
+                continue
+            if seconds > before * (1 + threshold):
+                regressions.append(f"{name} {method}: {seconds:.6f}s vs {before:.6f}s baseline "
+                                   f"(+{(seconds / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def parse_arguments(argv):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(usage="python benchmark.py [--generators chain,...] [--methods TT,FC,...] "
+                                           "[--baseline FILE] [--update] [--threshold 0.25]")
+    split = lambda value: [item.strip() for item in value.split(',') if item.strip()]
+    parser.add_argument('--generators', type=split, default=list(GENERATORS),
+                        help="Comma-separated synthetic KB generators: " + ', '.join(GENERATORS))
+    parser.add_argument('--methods', type=lambda value: [m.upper() for m in split(value)], default=METHODS,
+                        help="Comma-separated inference methods to time")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Runs per case and method; the fastest is kept")
+    parser.add_argument('--max-size', type=int, default=None,
+                        help="Skip generator sizes above this")
+    parser.add_argument('--tt-max-symbols', type=int, default=16,
+                        help="Largest KB (in symbols) the truth table is timed on")
+    parser.add_argument('--tt-mode', choices=TruthTable.MODES, default='enumerate',
+                        help="Truth table mode to time")
+    parser.add_argument('--seed', default='0', help="Seed for the generators")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help="JSON file of baseline timings (written if missing)")
+    parser.add_argument('--update', action='store_true',
+                        help="Overwrite the baseline with this run's timings")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="Fail when a timing is this fraction slower than its baseline")
+    parser.add_argument('--min-seconds', type=float, default=0.05,
+                        help="Ignore timings below this many seconds when comparing, as jitter swamps them")
+    parser.add_argument('--skip-tests', action='store_true',
+                        help="Do not check the answers on Tests_2024.zip")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.generators if name not in GENERATORS]
+    if unknown:
+        parser.error(f"unknown generators: {', '.join(unknown)}")
+    return args
+
+
+def main():
+    args = parse_arguments(sys.argv[1:])
+    errors = [] if args.skip_tests else check_tests_archive(args.methods, args.tt_max_symbols)
+
+    results = {}
+    for name, record, case_errors in run_synthetic(args.generators, args.methods, args.repeat,
+                                                   args.tt_max_symbols, args.tt_mode, args.max_size, args.seed):
+        results[name] = record
+        errors.extend(case_errors)
+        timings = '  '.join(f"{method} {seconds:.6f}s" for method, seconds in record['seconds'].items())
+        print(f"{name:<20} {record['symbols']:>6} symbols  {timings}", flush=True)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.update:
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline['cases'], args.threshold, args.min_seconds)
+    else:
+        with open(args.baseline, 'w') as file:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                       'seed': args.seed, 'repeat': args.repeat, 'cases': results}, file, indent=2)
+        print(f"Baseline written to {args.baseline}")
+
+    for error in errors:
+        print(f"WRONG ANSWER: {error}")
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    if errors or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -86,6 +86,39 @@ const iEngineUI = () => {
     }
   };
 
+  const fetchTruthTablePage = async (start) => {
+    if (!file || !truthTable) return;
+    const { limit, filter } = truthTable.page;
+
+    setIsLoading(true);
+    try {
+      const formData = new FormData();
+      formData.append('file', file);
+      formData.append('start', Math.max(0, start));
+      formData.append('limit', limit);
+      formData.append('filter', filter);
+
+      const response = await fetch('/api/truth-table', {
+        method: 'POST',
+        body: formData,
+      });
+
+      if (!response.ok) {
+        throw new Error('Failed to load truth table page');
+      }
+
+      const data = await response.json();
+      if (data.error) {
+        throw new Error(data.error);
+      }
+      setTruthTable(data);
+    } catch (err) {
+      setError('Error loading truth table: ' + err.message);
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
   const renderTruthTable = () => {
     if (!truthTable) return null;
 
@@ -132,7 +165,7 @@ const iEngineUI = () => {
                 {truthTable.rows.map((row, rowIndex) => (
                   <tr key={rowIndex} className={`hover:bg-blue-100 ${row.proves_query ? 'bg-green-50' : ''}`}>
                     <td className="p-4 border-b border-gray-200 text-center text-black">
-                      {rowIndex + 1}
+                      {(row.index ?? rowIndex) + 1}
                     </td>
                     {/* Model values */}
                     {symbols.map(symbol => (
@@ -162,6 +195,27 @@ const iEngineUI = () => {
             </table>
           </div>
         </div>
+        {truthTable.page && truthTable.page.limit && (
+          <div className="mt-4 flex items-center justify-center gap-4 text-gray-800">
+            <button
+              onClick={() => fetchTruthTablePage(truthTable.page.start - truthTable.page.limit)}
+              disabled={isLoading || truthTable.page.start === 0}
+              className="p-2 rounded-lg bg-white shadow hover:bg-gray-200 transition duration-200 disabled:opacity-50 disabled:cursor-not-allowed border-none text-gray-800"
+            >
+              <SkipBack className="w-5 h-5" />
+            </button>
+            <span className="text-sm">
+              Rows {truthTable.page.start + 1} - {truthTable.page.start + truthTable.rows.length}
+            </span>
+            <button
+              onClick={() => fetchTruthTablePage(truthTable.page.start + truthTable.page.limit)}
+              disabled={isLoading || !truthTable.page.has_more}
+              className="p-2 rounded-lg bg-white shadow hover:bg-gray-200 transition duration-200 disabled:opacity-50 disabled:cursor-not-allowed border-none text-gray-800"
+            >
+              <SkipForward className="w-5 h-5" />
+            </button>
+          </div>
+        )}
         <div className="mt-4 p-4 bg-gradient-to-b from-sky-400 to-blue-900 text-white rounded-lg text-center">
           <h3 className="text-2xl font-extrabold mb-2">Summary</h3>
           <p className="text-lg font-semibold mb-1">Total Models: {truthTable.summary.total_models}</p>
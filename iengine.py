@@ -1,37 +1,43 @@
+import argparse
+import re
 import sys
-from sequence import TruthTable, ForwardChaining, BackwardChaining, DPLL
+from sequence import TruthTable, ForwardChaining, BackwardChaining, DPLL, CDCL, BDD, Budget, Unknown
+
+def parse_input_text(text):
+    """Parse the text of an input file into KB clauses and query; raises ValueError if malformed."""
+    content = text.splitlines(keepends=True)
+    
+    # Find the indices of TELL and ASK markers
+    tell_index = -1
+    ask_index = -1
+    for i, line in enumerate(content):
+        if line.strip() == 'TELL':
+            tell_index = i
+        elif line.strip() == 'ASK':
+            ask_index = i
+            
+    if tell_index == -1 or ask_index == -1:
+        raise ValueError("Input file must contain both TELL and ASK sections.")
+        
+    # Extract KB section (everything between TELL and ASK)
+    kb_lines = content[tell_index + 1:ask_index]
+    kb_str = ''.join(kb_lines).strip().replace(' ', '').replace('\n', '')
+    
+    # Extract query (everything after ASK)
+    query_lines = content[ask_index + 1:]
+    query = ''.join(query_lines).strip()
+
+    # Split KB into clauses
+    kb_clauses = [clause.strip() for clause in kb_str.split(';') if clause.strip()]
+    
+    return kb_clauses, query
+
 
 def parse_input_file(filename):
     """Parse the input file to extract KB and query."""
     try:
         with open(filename, 'r') as file:
-            content = file.readlines()
-
-            
-        # Find the indices of TELL and ASK markers
-        tell_index = -1
-        ask_index = -1
-        for i, line in enumerate(content):
-            if line.strip() == 'TELL':
-                tell_index = i
-            elif line.strip() == 'ASK':
-                ask_index = i
-                
-        if tell_index == -1 or ask_index == -1:
-            raise ValueError("Input file must contain both TELL and ASK sections.")
-            
-        # Extract KB section (everything between TELL and ASK)
-        kb_lines = content[tell_index + 1:ask_index]
-        kb_str = ''.join(kb_lines).strip().replace(' ', '').replace('\n', '')
-        
-        # Extract query (everything after ASK)
-        query_lines = content[ask_index + 1:]
-        query = ''.join(query_lines).strip()
-  
-        # Split KB into clauses
-        kb_clauses = [clause.strip() for clause in kb_str.split(';') if clause.strip()]
-        
-        return kb_clauses, query
+            return parse_input_text(file.read())
         
     except FileNotFoundError:
         print(f'Error: File "{filename}" not found.')
@@ -42,47 +48,197 @@ def parse_input_file(filename):
         sys.exit(1)
 
 
+def format_result(method, result, additional_info):
+    """Format a solver result the way the CLI prints it."""
+    if isinstance(result, Unknown):
+        return format_unknown(result)
+    if not result:
+        return 'NO'
+    if method == 'TT':
+        return f'YES: {additional_info}'  # additional_info is number of models
+    if method == 'BDD' and additional_info is not None:
+        return f'YES: {additional_info}'  # Model count, unless DPLL answered past the node limit
+    if method in ['FC', 'BC']:
+        return f'YES: {", ".join(additional_info)}'  # additional_info is list of symbols
+    return 'YES'  # DPLL, CDCL
+
 
+def format_unknown(result):
+    """Format an out-of-budget result as 'UNKNOWN: <limit> (<progress>)', leaving out timings."""
+    progress = ', '.join(f'{key}: {value}' for key, value in result.progress.items()
+                         if not isinstance(value, float))
+    return f'UNKNOWN: {result.reason} ({progress})'
 
 
-def get_solver(method, kb_clauses):
-    """Factory function to create appropriate solver instance."""
+def split_queries(query):
+    """Split an ASK section holding several queries (separated by ';' or newlines) into a list."""
+    return [q.strip() for q in re.split(r'[;\n]', query) if q.strip()]
+
+
+def answer_queries(solver, queries, budget=None):
+    """Answer many queries against one solver, reusing its loaded KB where the engine supports it.
+
+    Yields (query, answer) pairs as they are answered, so the solver's stats
+    are those of the query just yielded. With a budget, each query gets the
+    whole budget and is answered by solve(), so an answer may be an Unknown.
+    """
+    for query in queries:
+        if budget is None:
+            yield query, solver.entails(query)
+        else:
+            yield query, solver.solve(query, budget=budget)[0]
+
+
+def add_stats(totals, stats):
+    """Add one solve's stats into running totals (counters and phase timings alike)."""
+    for key, value in stats.items():
+        totals[key] = totals.get(key, 0) + value
+
+
+def make_budget(timeout=None, max_models=None, max_decisions=None, max_conflicts=None, max_trace_events=None):
+    """Build the Budget for a solve from its limits, or None when no limit is set."""
+    limits = (timeout, max_models, max_decisions, max_conflicts, max_trace_events)
+    if all(limit is None for limit in limits):
+        return None
+    return Budget(*limits)
+
+
+def get_solver(method, kb_clauses, **options):
+    """Factory function to create appropriate solver instance.
+
+    Extra keyword options (e.g. the truth table `mode`) are passed on to the solver.
+    """
     solvers = {
         'TT': TruthTable,
         'FC': ForwardChaining,
         'BC': BackwardChaining,
-        'DPLL': DPLL
+        'DPLL': DPLL,
+        'CDCL': CDCL,
+        'BDD': BDD
     }
     
     solver_class = solvers.get(method)
     if not solver_class:
         raise ValueError(f"Invalid method. Please choose among: {list(solvers.keys())}")
     
-    return solver_class(kb_clauses)
+    return solver_class(kb_clauses, **options)
+
+def parse_passes(value):
+    """Turn a comma-separated list of preprocessing passes, or 'none', into a tuple of pass names."""
+    if value.strip().lower() == 'none':
+        return ()
+    return tuple(name.strip() for name in value.split(',') if name.strip())
+
+
+def parse_arguments(argv):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(usage="python iengine.py <filename> <method> [options]")
+    parser.add_argument('filename')
+    parser.add_argument('method', type=str.upper)
+    parser.add_argument('--tt-mode', choices=TruthTable.MODES, default=None,
+                        help="Truth table evaluation mode (TT only)")
+    parser.add_argument('--block-size', type=int, default=None,
+                        help="Models per block in the vectorized truth table mode")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes for truth table enumeration")
+    parser.add_argument('--early-exit', action='store_true',
+                        help="Stop forward chaining as soon as the query is derived (FC only)")
+    parser.add_argument('--batch', action='store_true',
+                        help="Answer every query of the ASK section (separated by ';' or newlines) in turn")
+    parser.add_argument('--node-limit', type=int, default=None,
+                        help="Largest decision diagram (in nodes) before DPLL answers instead (BDD only)")
+    parser.add_argument('--stats', action='store_true',
+                        help="After the result, print the engine's counters and time per phase (with --batch, summed over the queries)")
+    parser.add_argument('--general-path', action='store_true',
+                        help="Skip the Horn fast path and always run the general method (TT, DPLL)")
+    parser.add_argument('--no-slice', action='store_true',
+                        help="Run on the whole KB instead of only the part connected to the query (TT, DPLL)")
+    parser.add_argument('--preprocess', type=parse_passes, default=None,
+                        help="Comma-separated CNF preprocessing passes run before the DPLL search, or 'none' "
+                             "(default: all of " + ', '.join(DPLL.PREPROCESS_PASSES) + ")")
+    parser.add_argument('--timeout', type=float, default=None,
+                        help="Seconds a solve may take before it answers UNKNOWN")
+    parser.add_argument('--max-models', type=int, default=None,
+                        help="Models (search nodes in the pruned mode) the truth table may evaluate (TT only)")
+    parser.add_argument('--max-decisions', type=int, default=None,
+                        help="Search decisions before answering UNKNOWN (DPLL, CDCL, TT components mode)")
+    parser.add_argument('--max-conflicts', type=int, default=None,
+                        help="Search conflicts before answering UNKNOWN (DPLL, CDCL)")
+    parser.add_argument('--max-trace-events', type=int, default=None,
+                        help="Trace steps kept in memory; older ones are dropped")
+    return parser.parse_args(argv)
+
+
+def solver_options(method, tt_mode=None, block_size=None, workers=None, early_exit=False,
+                   trace_level=None, trace_limit=None, node_limit=None, general_path=False, preprocess=None,
+                   slice_query=True):
+    """Collect the solver options that apply to the given method."""
+    options = {}
+    if method == 'BDD' and node_limit is not None:
+        options['node_limit'] = node_limit
+    if trace_level is not None:
+        options['trace_level'] = trace_level
+    if trace_limit is not None:
+        options['trace_limit'] = trace_limit
+    if method in ('TT', 'DPLL') and general_path:
+        options['horn_fast_path'] = False
+    if method in ('TT', 'DPLL') and not slice_query:
+        options['slice_query'] = False
+    if method == 'DPLL' and preprocess is not None:
+        options['preprocess'] = preprocess
+    if method == 'FC' and early_exit:
+        options['early_exit'] = True
+    if method == 'TT':
+        if tt_mode is not None:
+            options['mode'] = tt_mode
+        if block_size is not None:
+            options['block_size'] = block_size
+        if workers is not None:
+            options['workers'] = workers
+    return options
+
+
+def format_stats(stats):
+    """Format engine statistics as 'name: value' lines, timings in seconds."""
+    return '\n'.join(f'{key}: {value:.6f}' if isinstance(value, float) else f'{key}: {value}'
+                     for key, value in stats.items())
+
 
 def main():
     # Validate command line arguments
-    if len(sys.argv) != 3:
-        print("Usage: python iengine.py <filename> <method>")
-        sys.exit(1)
-    filename = sys.argv[1]
-    method = sys.argv[2].upper()
+    args = parse_arguments(sys.argv[1:])
+    filename = args.filename
+    method = args.method
     
     try:
         kb_clauses, query = parse_input_file(filename)
-        solver = get_solver(method, kb_clauses)
+        # The CLI prints no reasoning steps, so the engines need not record any
+        solver = get_solver(method, kb_clauses, **solver_options(method, args.tt_mode, args.block_size, args.workers,
+                                                                 args.early_exit, trace_level='off',
+                                                                 node_limit=args.node_limit,
+                                                                 general_path=args.general_path,
+                                                                 preprocess=args.preprocess,
+                                                                 slice_query=not args.no_slice))
+        budget = make_budget(args.timeout, args.max_models, args.max_decisions, args.max_conflicts,
+                             args.max_trace_events)
         
-        result, additional_info = solver.solve(query)
+        if args.batch:
+            totals = {}
+            for batch_query, entailed in answer_queries(solver, split_queries(query), budget):
+                if isinstance(entailed, Unknown):
+                    print(f'{batch_query}: {format_unknown(entailed)}')
+                else:
+                    print(f'{batch_query}: {"YES" if entailed else "NO"}')
+                add_stats(totals, solver.stats)
+            if args.stats:
+                # Summed over every query of the batch
+                print(format_stats(totals))
+            return
         
-        if result:
-            if method == 'TT':
-                print(f'YES: {additional_info}')  # additional_info is number of models
-            elif method in ['FC', 'BC']:
-                print(f'YES: {", ".join(additional_info)}')  # additional_info is list of symbols
-            else:  # DPLL
-                print('YES')
-        else:
-            print('NO')
+        result, additional_info = solver.solve(query, budget=budget)
+        print(format_result(method, result, additional_info))
+        if args.stats:
+            print(format_stats(solver.stats))
     except Exception as e:
         print(f"Error: {str(e)}")
         sys.exit(1)
@@ -1,7 +1,17 @@
 from typing import List, Set, Dict, Tuple, Union, Optional
 from enum import Enum
-import re, sys
+import re, gc, heapq, time
+from collections import deque
+from itertools import product
+from multiprocessing import Pool, TimeoutError as PoolTimeoutError
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from functools import partial, wraps
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for the vectorized truth table mode
+    np = None
 
 class LogicalConnective(Enum):
     """Enumeration of logical connectives with their symbols and descriptions.""" 
@@ -26,198 +36,1031 @@ class LogicalConnective(Enum):
         # Escape special characters and join with OR
         return '|'.join(re.escape(member.symbol) for member in cls)
 
+
+class Formula:
+    """Node of a parsed propositional formula (a symbol or a connective applied to sub-formulas)."""
+    __slots__ = ('connective', 'args', 'symbol')
+
+    def __init__(self, connective: Optional[LogicalConnective] = None, args: Tuple['Formula', ...] = (), symbol: Optional[str] = None):
+        self.connective = connective
+        self.args = args
+        self.symbol = symbol
+
+    def symbols(self): # -> Set[str]
+        """Collect every propositional symbol occurring in the formula."""
+        found = set()
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.connective is None:
+                found.add(node.symbol)
+            else:
+                stack.extend(node.args)
+        return found
+
+    def __repr__(self):
+        if self.connective is None:
+            return self.symbol
+        if self.connective is LogicalConnective.NEGATION:
+            return f'~{self.args[0]!r}'
+        return '(' + f' {self.connective.symbol} '.join(repr(arg) for arg in self.args) + ')'
+
+
+# One alternative per token kind: connective or parenthesis, symbol, or anything else (an error)
+_TOKEN_PATTERN = re.compile(r'\s*(?:(' + LogicalConnective.get_operator_pattern() + r'|\(|\))|([A-Za-z_][A-Za-z0-9_]*)|(\S))')
+
+# Binding strength of the binary connectives; negation binds tighter than all of them
+_BINARY_PRECEDENCE = {
+    LogicalConnective.BICONDITIONAL.symbol: 0,
+    LogicalConnective.IMPLICATION.symbol: 1,
+    LogicalConnective.DISJUNCTION.symbol: 2,
+    LogicalConnective.CONJUNCTION.symbol: 3,
+}
+_RIGHT_ASSOCIATIVE = {LogicalConnective.IMPLICATION.symbol, LogicalConnective.BICONDITIONAL.symbol}
+_CONNECTIVES = {member.symbol: member for member in LogicalConnective}
+
+
+def tokenize(text: str): # -> List[str]
+    """Split a formula string into symbol, connective and parenthesis tokens in a single regex pass."""
+    tokens = []
+    for operator, symbol, unexpected in _TOKEN_PATTERN.findall(text):
+        if unexpected:
+            raise ValueError(f"Unexpected character {unexpected!r} in formula '{text}'")
+        tokens.append(operator or symbol)
+    return tokens
+
+
+def parse_formula(text: str, leaves: Optional[Dict[str, Formula]] = None): # -> Formula
+    """Parse a formula string into a Formula tree by precedence climbing.
+
+    Precedence follows the usual convention (~, &, ||, =>, <=> from tightest
+    to loosest); & and || chains are flattened, => and <=> associate to the right.
+    Symbol nodes are interned in `leaves` when given, so formulas parsed with
+    the same dict share one node per symbol.
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        raise ValueError("Empty formula")
+    n_tokens = len(tokens)
+    pos = 0
+
+    def parse_binary(min_precedence):
+        nonlocal pos
+        left = parse_unary()
+        while pos < n_tokens:
+            token = tokens[pos]
+            precedence = _BINARY_PRECEDENCE.get(token)
+            if precedence is None or precedence < min_precedence:
+                break
+            pos += 1
+            connective = _CONNECTIVES[token]
+            if token in _RIGHT_ASSOCIATIVE:
+                left = Formula(connective, (left, parse_binary(precedence)))
+                continue
+            operands = [left, parse_binary(precedence + 1)]
+            while pos < n_tokens and tokens[pos] == token:
+                pos += 1
+                operands.append(parse_binary(precedence + 1))
+            flattened = []
+            for operand in operands:
+                if operand.connective is connective:
+                    flattened.extend(operand.args)
+                else:
+                    flattened.append(operand)
+            left = Formula(connective, tuple(flattened))
+        return left
+
+    def parse_unary():
+        nonlocal pos
+        if pos >= n_tokens:
+            raise ValueError(f"Unexpected end of formula '{text}'")
+        token = tokens[pos]
+        pos += 1
+        if token == LogicalConnective.NEGATION.symbol:
+            return Formula(LogicalConnective.NEGATION, (parse_unary(),))
+        if token == '(':
+            inner = parse_binary(0)
+            if pos >= n_tokens or tokens[pos] != ')':
+                raise ValueError(f"Missing closing parenthesis in formula '{text}'")
+            pos += 1
+            return inner
+        if token == ')' or token in _CONNECTIVES:
+            raise ValueError(f"Unexpected '{token}' in formula '{text}'")
+        if leaves is None:
+            return Formula(symbol=token)
+        leaf = leaves.get(token)
+        if leaf is None:
+            leaf = leaves[token] = Formula(symbol=token)
+        return leaf
+
+    formula = parse_binary(0)
+    if pos != n_tokens:
+        raise ValueError(f"Unexpected '{tokens[pos]}' in formula '{text}'")
+    return formula
+
+
+# Python source templates per connective for each value encoding. Conjunction and
+# disjunction are (prefix, separator, suffix) triples joined over all operands.
+#   boolean: one model, values are bools
+#   bitwise: 64 models per integer word, values are NumPy uint64 arrays
+#   kleene:  partial models, values are 1 (true), 0 (false) or UNKNOWN (0.5)
+_TEMPLATES = {
+    'boolean': {
+        LogicalConnective.NEGATION: '(not {0})',
+        LogicalConnective.CONJUNCTION: ('(', ' and ', ')'),
+        LogicalConnective.DISJUNCTION: ('(', ' or ', ')'),
+        LogicalConnective.IMPLICATION: '(not {0} or {1})',
+        LogicalConnective.BICONDITIONAL: '({0} == {1})',
+    },
+    'bitwise': {
+        LogicalConnective.NEGATION: '(~{0})',
+        LogicalConnective.CONJUNCTION: ('(', ' & ', ')'),
+        LogicalConnective.DISJUNCTION: ('(', ' | ', ')'),
+        LogicalConnective.IMPLICATION: '(~{0} | {1})',
+        LogicalConnective.BICONDITIONAL: '(~({0} ^ {1}))',
+    },
+    'kleene': {
+        LogicalConnective.NEGATION: '(1 - {0})',
+        LogicalConnective.CONJUNCTION: ('min(', ', ', ')'),
+        LogicalConnective.DISJUNCTION: ('max(', ', ', ')'),
+        LogicalConnective.IMPLICATION: 'max(1 - {0}, {1})',
+        LogicalConnective.BICONDITIONAL: '_iff({0}, {1})',
+    },
+}
+
+UNKNOWN = 0.5
+
+
+def _kleene_iff(a, b): # -> float
+    """Three-valued biconditional: unknown if either side is unknown."""
+    if a == UNKNOWN or b == UNKNOWN:
+        return UNKNOWN
+    return 1 if a == b else 0
+
+
+def _python_expr(formula: Formula, index: Dict[str, int], templates: Dict[LogicalConnective, Union[str, Tuple[str, str, str]]]): # -> str
+    """Render a formula as a Python expression over the value array `v`."""
+    connective = formula.connective
+    if connective is None:
+        return f'v[{index[formula.symbol]}]'
+    args = [_python_expr(arg, index, templates) for arg in formula.args]
+    if connective in (LogicalConnective.CONJUNCTION, LogicalConnective.DISJUNCTION):
+        prefix, separator, suffix = templates[connective]
+        return prefix + separator.join(args) + suffix
+    return templates[connective].format(*args)
+
+
+def compile_formula(formula: Formula, index: Dict[str, int], logic: str = 'boolean'): # -> Callable[[Sequence], Any]
+    """Compile a formula into a function of a value array indexed by `index`.
+
+    The generated source only ever contains `v[i]` lookups and Python operators,
+    so it is compiled once and evaluated per model with no string work. `logic`
+    selects the value encoding (see _TEMPLATES): 'boolean' evaluates one model,
+    'bitwise' evaluates integer words holding one model per bit, and 'kleene'
+    evaluates a partial model where unassigned symbols are UNKNOWN.
+    """
+    namespace = {'__builtins__': {}, 'min': min, 'max': max, '_iff': _kleene_iff}
+    return eval(f'lambda v: {_python_expr(formula, index, _TEMPLATES[logic])}', namespace)
+
+
+def compile_conjunction(formulas: List[Formula], index: Dict[str, int], logic: str = 'boolean'): # -> Optional[Callable[[Sequence], Any]]
+    """Compile a list of formulas into a single function testing that all of them hold.
+
+    Returns None for an empty list, which callers treat as always true.
+    """
+    if not formulas:
+        return None
+    formula = Formula(LogicalConnective.CONJUNCTION, tuple(formulas)) if len(formulas) > 1 else formulas[0]
+    return compile_formula(formula, index, logic)
+
+
+# Bit patterns of the six lowest symbols within a 64-model word: bit b of pattern j is bit j of b
+_LOW_BIT_PATTERNS = [
+    0xAAAAAAAAAAAAAAAA,
+    0xCCCCCCCCCCCCCCCC,
+    0xF0F0F0F0F0F0F0F0,
+    0xFF00FF00FF00FF00,
+    0xFFFF0000FFFF0000,
+    0xFFFFFFFF00000000,
+]
+
+if np is not None:
+    _ALL_ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+    _BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(words): # -> int
+    """Count the set bits in a NumPy uint64 array."""
+    return int(_BYTE_POPCOUNT[words.view(np.uint8)].sum(dtype=np.uint64))
+
+
 class KnowledgeBase:
-    """Class to manage the knowledge base and provide common utility functions."""
+    """Class to manage the knowledge base and provide common utility functions.
+
+    Every clause is parsed once into a Formula tree and all engines work from
+    those trees. Symbols are interned: each has one shared leaf node and a
+    dense integer id in sorted order, with the list of clauses it occurs in.
+    """
     
     def __init__(self, clauses: List[str]):
         """Initialize knowledge base with a list of clauses."""
         self.clauses = clauses
-        self.symbols = self._extract_symbols()
-        self.horn_clauses = self._parse_horn_clauses()
-        self.is_horn_form = self._check_horn_form()
-    
-    def _extract_symbols(self):  # -> Set[str]
-        """Extract all unique propositional symbols from the KB."""
-        # Get pattern for all operators
-        op_pattern = LogicalConnective.get_operator_pattern()
-        # Split by operators and filter out empty strings
-        symbols = set()
-        for clause in self.clauses:
-            # Replace operators with spaces
-            cleaned = re.sub(op_pattern, ' ', clause)
-            
-            # Extract symbols (alphanumeric strings)
-            symbols.update(token for token in cleaned.split() if token.isalnum() and not token.isnumeric())
-        return symbols
-    
-    def _check_horn_form(self): # -> bool
-        """Check if the knowledge base is in Horn form."""
-        for clause in self.clauses:
-            if '||' in clause or '<=>' in clause:
-                return False
-            if '=>' in clause:
-                antecedent = clause.split('=>')[0]
-                if '~' in antecedent:
-                    return False
-        return True
+        # The IR is acyclic, so pause the cycle collector instead of letting it rescan the objects as they grow
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._build()
+        finally:
+            if gc_was_enabled:
+                gc.enable()
     
-    def _parse_horn_clauses(self):
-        """Parse all clauses from the knowledge base into premises and conclusions."""
-        parsed_clauses = []
-        
-        for clause in self.clauses:
-            # Skip non-Horn clauses for parsing
-            if '||' in clause or '<=>' in clause:
-                continue
-                
-            if '=>' in clause:
-                try:
-                    premises, conclusion = clause.split('=>')
-                    premises = premises.split('&') if '&' in premises else [premises]
-                    parsed_clauses.append(
-                        ([premise.strip() for premise in premises], 
-                        conclusion.strip())
-                    )
-                except ValueError:
-                    print(f"Error parsing clause: {clause}")
-                    continue
+    def _build(self):
+        """Parse every clause and derive the symbol tables, occurrence lists and Horn structure."""
+        leaves = {}
+        self.formulas = [parse_formula(clause, leaves) for clause in self.clauses]
+        self.symbols = set(leaves)
+        self.symbol_names = sorted(leaves)
+        self.symbol_ids = {symbol: k for k, symbol in enumerate(self.symbol_names)}
+        self.occurrences = [[] for _ in self.symbol_names]  # symbol id -> indices of clauses containing it
+        self.horn_clauses = []
+        self.non_horn_clauses = []
+        for c, (clause, formula) in enumerate(zip(self.clauses, self.formulas)):
+            for symbol in formula.symbols():
+                self.occurrences[self.symbol_ids[symbol]].append(c)
+            parsed = self._horn_clauses(formula)
+            if parsed is None:
+                self.non_horn_clauses.append(clause)
             else:
-                # Handle simple facts
-                clauses_split = [c.strip() for c in clause.split('&') if c.strip()]
-                for c in clauses_split:
-                    if '~' not in c:  # Skip negated facts
-                        parsed_clauses.append(([], c.strip()))
-                    
-        return parsed_clauses
+                self.horn_clauses.extend(parsed)
+        self.is_horn_form = not self.non_horn_clauses
+        self._rules_by_conclusion = None  # Built on the first goal_cone() call
+    
+    def connected_clauses(self, symbols): # -> List[int]
+        """
+        Indices of the clauses connected to the given symbols in the symbol-clause
+        graph, i.e. of the components of the KB those symbols occur in.
+        """
+        seen = {symbol for symbol in symbols if symbol in self.symbol_ids}
+        queue = list(seen)
+        found = set()
+        while queue:
+            for c in self.occurrences[self.symbol_ids[queue.pop()]]:
+                if c in found:
+                    continue
+                found.add(c)
+                for symbol in self.formulas[c].symbols():
+                    if symbol not in seen:
+                        seen.add(symbol)
+                        queue.append(symbol)
+        return sorted(found)
+    
+    def goal_cone(self, goals): # -> List[Tuple[List[str], str]]
+        """
+        The Horn clauses that can take part in deriving any of the goals: those
+        concluding a goal, or a premise of another clause in the cone. They are
+        returned in KB order.
+        """
+        if self._rules_by_conclusion is None:
+            self._rules_by_conclusion = {}
+            for k, (_, conclusion) in enumerate(self.horn_clauses):
+                self._rules_by_conclusion.setdefault(conclusion, []).append(k)
+        reached = set(goals)
+        queue = list(reached)
+        kept = []
+        while queue:
+            for k in self._rules_by_conclusion.get(queue.pop(), ()):
+                kept.append(k)
+                for premise in self.horn_clauses[k][0]:
+                    if premise not in reached:
+                        reached.add(premise)
+                        queue.append(premise)
+        return [self.horn_clauses[k] for k in sorted(kept)]
+    
+    @staticmethod
+    def _horn_clauses(formula: Formula): # -> Optional[List[Tuple[List[str], str]]]
+        """Read a clause as Horn (premises, conclusion) pairs, or None if it is not Horn.
+
+        A conjunction of symbols implying a symbol (or a conjunction of them)
+        is a rule, and a symbol or conjunction of literals is a set of facts.
+        Negated facts and rules with a negated conclusion are Horn but derive
+        nothing, so they yield no pairs.
+        """
+        if formula.connective is LogicalConnective.IMPLICATION:
+            premises = _horn_atoms(formula.args[0])
+            conclusions = _horn_literals(formula.args[1])
+            if premises is None or conclusions is None:
+                return None
+            return [(premises, conclusion) for conclusion in conclusions]
+        facts = _horn_literals(formula)
+        if facts is None:
+            return None
+        return [([], fact) for fact in facts]
+
+
+def _horn_atoms(node: Formula): # -> Optional[List[str]]
+    """Symbols of a symbol or conjunction of symbols, or None for anything else."""
+    if node.connective is None:
+        return [node.symbol]
+    if node.connective is LogicalConnective.CONJUNCTION and all(arg.connective is None for arg in node.args):
+        return [arg.symbol for arg in node.args]
+    return None
+
+
+def _horn_literals(node: Formula): # -> Optional[List[str]]
+    """Positive symbols of a conjunction of literals (negated ones are dropped), or None if it is not one."""
+    if node.connective is LogicalConnective.NEGATION:
+        return [] if node.args[0].connective is None else None
+    if node.connective is LogicalConnective.CONJUNCTION:
+        found = []
+        for arg in node.args:
+            arg_atoms = _horn_literals(arg)
+            if arg_atoms is None:
+                return None
+            found.extend(arg_atoms)
+        return found
+    return _horn_atoms(node)
+
+class Trace:
+    """
+    Bounded record of an engine's reasoning trace.
+    
+    At level 'off' nothing is kept, at 'summary' only a count per event kind,
+    and at 'full' every event as a compact tuple (kind, *data) holding symbol
+    ids, literals or references to existing lists rather than text. With a
+    limit, only the most recent events are kept (a ring buffer) while the
+    counts still cover the whole run. Engines render the tuples into their
+    display format only when a caller asks for the steps.
+    """
+    LEVELS = ('off', 'summary', 'full')
+    
+    def __init__(self, level: str = 'full', limit: Optional[int] = None):
+        if level not in self.LEVELS:
+            raise ValueError(f"Unknown trace level '{level}'. Available levels: {', '.join(self.LEVELS)}")
+        if limit is not None and limit < 1:
+            raise ValueError("Trace limit must be a positive number of events")
+        self.level = level
+        self.limit = limit
+        self.clear()
+    
+    def clear(self):
+        """Forget the events of the previous solve."""
+        self.counts = {}
+        self.total = 0
+        self.records = deque(maxlen=self.limit)
+    
+    def add(self, kind: str, *data):
+        """Record one event of the given kind."""
+        if self.level == 'off':
+            return
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        self.total += 1
+        if self.level == 'full':
+            self.records.append((kind,) + data)
+    
+    @property
+    def dropped(self): # -> int
+        """Events recorded in full but since pushed out of the ring buffer."""
+        return self.total - len(self.records) if self.level == 'full' else 0
+    
+    def summary(self): # -> Dict[str, object]
+        return {'level': self.level, 'events': self.total, 'dropped': self.dropped, 'counts': dict(self.counts)}
+
+
+class BudgetExceeded(Exception):
+    """Raised inside an engine when the budget of its solve runs out."""
+    
+    def __init__(self, reason: str, progress: Optional[Dict[str, object]] = None):
+        super().__init__(reason)
+        self.reason = reason
+        self.progress = progress or {}
+
+
+class Budget:
+    """
+    Resource limits on one solve.
+    
+    `seconds` is a wall-clock allowance. The other caps apply to models
+    evaluated (TT; search nodes in the pruned mode), search decisions
+    (DPLL, CDCL, the #SAT counter) and conflicts (DPLL, CDCL). Any of them
+    may be None for no limit. `max_trace_events` caps the steps a full
+    trace keeps, dropping the oldest as trace_limit does, rather than
+    stopping the solve. Engines call check() from their inner loops, every
+    so many iterations where a check would cost more than the work.
+    """
+    
+    def __init__(self, seconds: Optional[float] = None, max_models: Optional[int] = None,
+                 max_decisions: Optional[int] = None, max_conflicts: Optional[int] = None,
+                 max_trace_events: Optional[int] = None):
+        for name, value in (('seconds', seconds), ('max_models', max_models), ('max_decisions', max_decisions),
+                            ('max_conflicts', max_conflicts)):
+            if value is not None and value < 0:
+                raise ValueError(f"Budget {name} must not be negative")
+        if max_trace_events is not None and max_trace_events < 1:
+            raise ValueError("Budget max_trace_events must be a positive number of events")
+        self.seconds = seconds
+        self.max_models = max_models
+        self.max_decisions = max_decisions
+        self.max_conflicts = max_conflicts
+        self.max_trace_events = max_trace_events
+        self.deadline = None  # perf_counter() time by which a started budget runs out
+    
+    def started(self): # -> Budget
+        """This budget with its deadline running from now. A budget already running (or
+        without a deadline) is returned as is, so engines a solve delegates to share it."""
+        if self.seconds is None or self.deadline is not None:
+            return self
+        running = Budget(self.seconds, self.max_models, self.max_decisions, self.max_conflicts, self.max_trace_events)
+        running.deadline = time.perf_counter() + self.seconds
+        return running
+    
+    def check(self, models: int = 0, decisions: int = 0, conflicts: int = 0, **progress):
+        """Raise BudgetExceeded, carrying the given progress, if a limit has been passed."""
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            reason = 'deadline'
+        elif self.max_models is not None and models > self.max_models:
+            reason = 'max_models'
+        elif self.max_decisions is not None and decisions > self.max_decisions:
+            reason = 'max_decisions'
+        elif self.max_conflicts is not None and conflicts > self.max_conflicts:
+            reason = 'max_conflicts'
+        else:
+            return
+        raise BudgetExceeded(reason, progress)
+
+
+class Unknown:
+    """
+    The answer of a solve that ran out of budget: which limit stopped it
+    and the progress made so far (the engine's counters, plus partial
+    results such as the models checked and counted until then).
+    
+    It has no truth value, so code expecting YES or NO cannot mistake it for either.
+    """
+    __slots__ = ('reason', 'progress')
+    
+    def __init__(self, reason: str, progress: Dict[str, object]):
+        self.reason = reason
+        self.progress = progress
+    
+    def __bool__(self):
+        raise TypeError("An UNKNOWN result is neither YES nor NO")
+    
+    def __repr__(self):
+        return f"Unknown({self.reason!r}, {self.progress!r})"
+    
+    def to_dict(self): # -> Dict[str, object]
+        return {'reason': self.reason, 'progress': self.progress}
+
+
+def _budgeted(solve):
+    """
+    Give an engine's solve(query) an optional `budget` argument. While it
+    runs the started budget is the engine's `_budget`; if it runs out the
+    solve returns (Unknown, None) instead of its usual answer.
+    """
+    @wraps(solve)
+    def solve_within(self, query: str, budget: Optional[Budget] = None):
+        if budget is None:
+            return solve(self, query)
+        self._budget = budget.started()
+        trace_limit = self.trace.limit
+        if budget.max_trace_events is not None and (trace_limit is None or trace_limit > budget.max_trace_events):
+            self.trace.limit = budget.max_trace_events
+        try:
+            return solve(self, query)
+        except BudgetExceeded as e:
+            # Counters only added up at the end of a solve were never filled in
+            progress = {key: value for key, value in self.stats.items() if key not in self.FINAL_STATS}
+            progress.update(e.progress)
+            return Unknown(e.reason, progress), None
+        finally:
+            self._budget = None
+            self.trace.limit = trace_limit
+    return solve_within
+
 
 class InferenceEngine(ABC):
     """Abstract base class for inference engines."""
+    BUDGET_CHECK_INTERVAL = (1 << 12) - 1  # Loops over cheap steps check the budget once every 4096
+    FINAL_STATS = ()  # Stats only filled in once a solve completes, so not part of an Unknown's progress
     
-    def __init__(self, clauses: List[str]):
+    def __init__(self, clauses: List[str], trace_level: str = 'full', trace_limit: Optional[int] = None):
+        self.on_step = None  # Optional callable receiving each trace event as the engine runs
+        self.trace = Trace(trace_level, trace_limit)
+        self.stats = {}  # Counters and phase timings of the last solve
+        self._budget = None  # Started Budget of the solve in progress, if it was given one
+        start = time.perf_counter()
         try:
             self.kb = KnowledgeBase(clauses)
-            
-            # Skip Horn form validation for DPLL and TT methods
-            if not isinstance(self, (DPLL, TruthTable)) and not self.kb.is_horn_form:
-                print(f"Error: Knowledge base contains non-Horn clauses. Found:")
-                for clause in clauses:
-                    if '||' in clause or '<=>' in clause or ('=>' in clause and '~' in clause.split('=>')[0]):
-                        print(f"  - {clause}")
-                print("\nOnly TT (truth table) method and DPLL can be used with non-Horn clauses.")
-                sys.exit(1)
-                
-        except Exception as e:
-            print(f"Error initializing knowledge base: {str(e)}")
-            sys.exit(1)
+        except ValueError as e:
+            raise ValueError(f"Could not parse knowledge base: {e}") from e
+        self._parse_seconds = time.perf_counter() - start
+        
+        # Skip Horn form validation for the DPLL, TT and BDD methods
+        if not isinstance(self, (DPLL, TruthTable, BDD)) and not self.kb.is_horn_form:
+            found = ''.join(f"\n  - {clause}" for clause in self.kb.non_horn_clauses)
+            raise ValueError(f"Knowledge base contains non-Horn clauses. Found:{found}\n\n"
+                             "Only TT (truth table) method and DPLL can be used with non-Horn clauses.")
     
     @abstractmethod
     def solve(self, query: str):
-        """Solve the inference problem."""
+        """Solve the inference problem; engines wrap this with _budgeted to take a Budget."""
         pass
+    
+    def _reset_stats(self, *counters: str):
+        """
+        Start the statistics of a new solve with the named counters at zero.
+        
+        Phase timings are kept as '<phase>_seconds' (parse, cnf, search). The
+        KB is parsed once, when the engine is built, so its parse time is
+        charged to the first solve only and totals over many solves add up.
+        """
+        self.stats = dict.fromkeys(counters, 0)
+        self.stats['parse_seconds'] = self._parse_seconds
+        self._parse_seconds = 0.0
+    
+    @contextmanager
+    def _phase(self, name: str):
+        """Add the wall time spent in the block to the current solve's '<name>_seconds'."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            key = f'{name}_seconds'
+            self.stats[key] = self.stats.get(key, 0.0) + time.perf_counter() - start
+    
+    def _emit(self, event: Dict[str, object]):
+        """Pass a trace event to the on_step listener, if one is set."""
+        if self.on_step is not None:
+            self.on_step(event)
+    
+    def entails(self, query: str): # -> bool
+        """Whether the KB entails the query; incremental engines override this for repeated queries."""
+        return self.solve(query)[0]
 
 
 
 class TruthTable(InferenceEngine):
     """Truth table checking algorithm implementation with visualization."""
     
-    def _evaluate_clause(self, clause: str, model: Dict[str, bool]):
-        """Evaluate a single clause given a model."""
-        # Replace symbols with their boolean values
-        expr = clause
-        for symbol, value in model.items():
-            expr = re.sub(r'\b' + re.escape(symbol) + r'\b', str(value), expr)
-        
-        try:
-            # Handle implications first
-            while '=>' in expr:
-                antecedent, consequent = expr.split('=>', 1)
-                antecedent_value = self._evaluate_boolean_expr(antecedent)
-                consequent_value = self._evaluate_boolean_expr(consequent)
-                expr = str(not antecedent_value or consequent_value)
-            
-            return self._evaluate_boolean_expr(expr)
-            
-        except Exception as e:
-            print(f"Error evaluating clause '{clause}': {str(e)}")
-            return False
+    MODES = ('enumerate', 'vectorized', 'pruned', 'components')
+    FINAL_STATS = ('models_evaluated', 'kb_evaluations', 'clause_evaluations', 'query_evaluations')
+    ROW_FILTERS = ('all', 'kb_satisfied', 'proves_query')
+    DEFAULT_BLOCK_SIZE = 1 << 20
     
-    def _evaluate_boolean_expr(self, expr: str):
-        """Evaluate a boolean expression."""
-        expr = expr.strip()
+    RANGES_PER_WORKER = 4
+    
+    def __init__(self, clauses: List[str], mode: str = 'enumerate', block_size: int = DEFAULT_BLOCK_SIZE, workers: int = 1,
+                 horn_fast_path: bool = True, slice_query: bool = True, **trace_options):
+        super().__init__(clauses, **trace_options)
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid truth table mode '{mode}'. Please choose among: {list(self.MODES)}")
+        if block_size < 1:
+            raise ValueError("Block size must be a positive number of models")
+        if workers < 1:
+            raise ValueError("Number of workers must be at least 1")
+        self.mode = mode
+        self.block_size = block_size
+        self.workers = workers
+        self.horn_fast_path = horn_fast_path  # False forces the configured mode on (renamable) Horn KBs too
+        self.slice_query = slice_query  # Count the query's components of the KB apart from the rest
+        self.nodes_visited = 0  # Search nodes of the last pruned count
+        self._model_counts = {}  # query -> (kb models, proving models), so solve and the summary count once
+        self._counting_cnf = None  # Count-preserving CNF of the KB, for the components mode
+        self._counter = None  # Model counter whose component cache is shared by all queries
+        self._horn_kb = None  # (CNF, renaming or None, satisfiable) of the KB, for the Horn fast path
+        self._slices = {}  # frozenset of clause indices -> TruthTable of those clauses alone
+        self._rest_counts = {}  # frozenset of clause indices -> model count of those clauses over their symbols
+        # Evaluators are compiled from the KB's parsed clauses per symbol ordering
+        self.formulas = self.kb.formulas
+
+    def _prepare(self, query: str): # -> Tuple[List[str], Formula]
+        """Parse the query and collect the sorted symbols of the KB and query."""
+        query_formula = parse_formula(query)
+        return sorted(self.kb.symbols | query_formula.symbols()), query_formula
+
+    def _compile(self, query: str): # -> Tuple[List[str], Callable, List[Callable], Callable]
+        """Parse the query and compile the KB and query over a shared symbol ordering.
+
+        Symbols are sorted and the value tuple of a model is laid out in reverse,
+        so that iterating itertools.product visits models in the same order as
+        counting i from 0 to 2^n - 1 with bit j holding symbol j.
+        """
+        symbols, query_formula = self._prepare(query)
+        index = {symbol: len(symbols) - 1 - j for j, symbol in enumerate(symbols)}
         
-        # Handle special case where the expression is already a boolean
-        if expr.lower() == 'true':
-            return True
-        if expr.lower() == 'false':
-            return False
-            
-        expr = expr.replace('&', ' and ').replace('||', ' or ').replace('~', ' not ')
-        try:
-            return bool(eval(expr))
-        except:
-            return False
+        kb_check = compile_conjunction(self.formulas, index) or (lambda values: True)
+        clause_checks = [compile_formula(formula, index) for formula in self.formulas]
+        query_check = compile_formula(query_formula, index)
+        return symbols, kb_check, clause_checks, query_check
+
+    def _count_enumerate(self, query: str, prefix: int = 0, prefix_bits: int = 0): # -> Tuple[int, int]
+        """Count KB models and proving models by evaluating one model at a time.
+
+        With `prefix_bits` > 0 only the models whose highest `prefix_bits` symbols
+        spell out `prefix` are counted, i.e. model indices in
+        [prefix * 2^k, (prefix + 1) * 2^k) for the remaining k symbols.
+        """
+        symbols, kb_check, _, query_check = self._compile(query)
+        # The reversed value layout puts the highest symbols first, so the prefix is a fixed head
+        head = [(bool((prefix >> shift) & 1),) for shift in range(prefix_bits - 1, -1, -1)]
+        tail = [(False, True)] * (len(symbols) - prefix_bits)
+        kb_sat_count = 0
+        proving_count = 0
+        budget = self._budget
+        for checked, values in enumerate(product(*head, *tail)):
+            if budget is not None and not checked & self.BUDGET_CHECK_INTERVAL:
+                budget.check(models=checked, models_checked=checked, kb_models=kb_sat_count, proving_models=proving_count)
+            if kb_check(values):
+                kb_sat_count += 1
+                if query_check(values):
+                    proving_count += 1
+        return kb_sat_count, proving_count
+
+    def _count_vectorized(self, query: str, prefix: int = 0, prefix_bits: int = 0): # -> Tuple[int, int]
+        """Count KB models and proving models 64 at a time with NumPy bit-parallel words.
 
-    def get_truth_table(self, query: str):
-        """Generate complete truth table data."""
-        # Get sorted list of symbols
-        symbols = sorted(list(self.kb.symbols))
+        Model i sets symbol j to bit j of i, as in the enumerating mode. Each
+        uint64 word holds 64 consecutive models, so the six lowest symbols are
+        fixed bit patterns and every other symbol is all-ones or all-zeros per
+        word. Words are generated `block_size` models at a time to bound memory.
+        A prefix restricts the count as in _count_enumerate and must leave at
+        least six free symbols.
+        """
+        if np is None:
+            raise ImportError("NumPy is required for the vectorized truth table mode")
+        symbols, query_formula = self._prepare(query)
         n_symbols = len(symbols)
-        total_models = 2 ** n_symbols
+        index = {symbol: j for j, symbol in enumerate(symbols)}
+        kb_check = compile_conjunction(self.formulas, index, logic='bitwise')
+        query_check = compile_formula(query_formula, index, logic='bitwise')
         
-        # Initialize truth table data
-        truth_table = {
-            'symbols': symbols,
-            'clauses': self.kb.clauses,
-            'query': query,
-            'rows': []
-        }
+        range_words = max(1, (2 ** (n_symbols - prefix_bits)) >> 6)
+        first_word = prefix * range_words
+        last_word = first_word + range_words
+        block_words = max(1, self.block_size >> 6)
+        # With fewer than six symbols only the low 2^n bits of the single word are real models
+        valid = np.uint64((1 << (2 ** n_symbols)) - 1) if n_symbols < 6 else _ALL_ONES
         
-        # Generate all possible models
         kb_sat_count = 0
         proving_count = 0
-        
-        for i in range(total_models):
-            # Create model
-            model = {}
-            for j, symbol in enumerate(symbols):
-                model[symbol] = bool((i >> j) & 1)
-            
-            # Evaluate clauses and query
-            kb_results = []
-            kb_satisfied = True
-            for clause in self.kb.clauses:
-                result = self._evaluate_clause(clause, model)
-                kb_results.append(result)
-                if not result:
-                    kb_satisfied = False
+        budget = self._budget
+        for start in range(first_word, last_word, block_words):
+            if budget is not None:
+                checked = (start - first_word) << 6
+                budget.check(models=checked, models_checked=checked, kb_models=kb_sat_count, proving_models=proving_count)
+            words = np.arange(start, min(start + block_words, last_word), dtype=np.uint64)
+            columns = [np.full(len(words), pattern, dtype=np.uint64) for pattern in _LOW_BIT_PATTERNS[:n_symbols]]
+            for j in range(6, n_symbols):
+                # 0 - bit wraps to all-ones for set bits
+                columns.append(np.uint64(0) - ((words >> np.uint64(j - 6)) & np.uint64(1)))
             
-            query_result = self._evaluate_clause(query, model)
+            kb_words = kb_check(columns) & valid if kb_check else np.full(len(words), valid, dtype=np.uint64)
+            kb_sat_count += _popcount(kb_words)
+            proving_count += _popcount(kb_words & query_check(columns))
+        return kb_sat_count, proving_count
+
+    def _count_pruned(self, query: str): # -> Tuple[int, int]
+        """Count KB models and proving models with TT-Entails style recursion over partial models.
+
+        Clauses are evaluated three-valued on the partial assignment. A subtree
+        whose KB is already false is pruned, and a subtree where the KB is true
+        and the query is decided contributes all of its 2^k models at once.
+        """
+        symbols, query_formula = self._prepare(query)
+        n_symbols = len(symbols)
+        
+        # Branch on the symbols occurring in the most clauses first so clauses are decided early
+        kb_ids = self.kb.symbol_ids
+        occurrences = {symbol: len(self.kb.occurrences[kb_ids[symbol]]) if symbol in kb_ids else 0 for symbol in symbols}
+        order = sorted(symbols, key=lambda symbol: (-occurrences[symbol], symbol))
+        index = {symbol: j for j, symbol in enumerate(order)}
+        kb_check = compile_conjunction(self.formulas, index, logic='kleene') or (lambda values: 1)
+        query_check = compile_formula(query_formula, index, logic='kleene')
+        
+        values = [UNKNOWN] * n_symbols
+        self.nodes_visited = 0
+        budget = self._budget
+        
+        def count(depth):
+            self.nodes_visited += 1
+            # Each node evaluates the KB, so the budget is checked every 256 nodes rather than 4096
+            if budget is not None and not self.nodes_visited & 0xFF:
+                budget.check(models=self.nodes_visited, nodes_visited=self.nodes_visited)
+            kb_value = kb_check(values)
+            if kb_value == 0:
+                return 0, 0
+            if kb_value == 1:
+                query_value = query_check(values)
+                if query_value != UNKNOWN:
+                    models = 1 << (n_symbols - depth)
+                    return models, models if query_value == 1 else 0
             
-            if kb_satisfied:
-                kb_sat_count += 1
-                if query_result:
-                    proving_count += 1
+            values[depth] = 1
+            true_kb, true_proving = count(depth + 1)
+            values[depth] = 0
+            false_kb, false_proving = count(depth + 1)
+            values[depth] = UNKNOWN
+            return true_kb + false_kb, true_proving + false_proving
+        
+        return count(0)
+
+    def _count_components(self, query: str, entailed: bool = False): # -> Tuple[int, int]
+        """Count KB models and proving models exactly with the #SAT model counter.
+
+        The KB and KB & query are Tseitin-encoded with every auxiliary defined
+        both ways, so their CNFs have as many models over all their variables
+        as the formulas have over the symbols. Symbols in no clause count 2^k.
+        The KB's CNF and the counter's component cache are kept for later queries.
+        When the query is already known to be `entailed`, every KB model proves
+        it and only the KB is counted.
+        """
+        if self._counting_cnf is None:
+            self._counting_cnf = CNFEncoder(self.kb.symbol_names, equivalence=True)
+            for formula in self.kb.formulas:
+                self._counting_cnf.add(formula)
+            self._counter = _ModelCounter()
+        counter = self._counter
+        counter.budget = self._budget
+        before = dict(counter.stats)
+        symbols, query_formula = self._prepare(query)
+        n_query_only = len(symbols) - len(self.kb.symbols)
+        kb_cnf = self._counting_cnf
+        try:
+            kb_sat_count = counter.count(kb_cnf.clauses, len(kb_cnf.names)) << n_query_only
+            proving_count = kb_sat_count if entailed else 0
+            if kb_sat_count and not entailed:
+                encoder = kb_cnf.copy()
+                encoder.add(query_formula)
+                proving_count = counter.count(encoder.clauses, len(encoder.names))
+        finally:
+            counter.budget = None
+            for key, value in counter.stats.items():
+                self.stats[key] = self.stats.get(key, 0) + value - before[key]
+        return kb_sat_count, proving_count
+
+    def _count_horn(self, query: str): # -> Optional[Tuple[int, int]]
+        """Count models on the Horn fast path, or return None where it does not apply.
+
+        When the KB's CNF is Horn, dual-Horn or renamable Horn, unit resolution
+        decides in linear time whether the KB has a model; an inconsistent KB
+        has no models to count. When KB & ~query is renamable Horn too, unit
+        resolution also decides entailment, so an entailed query costs a
+        single #SAT count of the KB and the proving count equals it.
+        """
+        if self._horn_kb is None:
+            cnf = CNFEncoder(self.kb.symbol_names)
+            for formula in self.kb.formulas:
+                cnf.add(formula)
+            renaming = _horn_renaming(cnf.clauses, len(cnf.names))
+            satisfiable = renaming is not None and _horn_sat(cnf.clauses, len(cnf.names), renaming) is not None
+            self._horn_kb = (cnf, renaming, satisfiable)
+        cnf, renaming, satisfiable = self._horn_kb
+        if renaming is None:
+            return None
+        if not satisfiable:
+            self.stats['horn_fast_path'] = 1
+            return 0, 0
+        refutation = cnf.copy()
+        refutation.add(parse_formula(query), positive=False)
+        renaming = _horn_renaming(refutation.clauses, len(refutation.names))
+        if renaming is None:
+            return None
+        self.stats['horn_fast_path'] = 1
+        entailed = _horn_sat(refutation.clauses, len(refutation.names), renaming) is None
+        return self._count_components(query, entailed)
+
+    def _count_sliced(self, query: str): # -> Optional[Tuple[int, int]]
+        """
+        Count the components of the KB holding query symbols apart from the rest,
+        or return None when the query's components are the whole KB.
+        
+        The rest shares no symbol with the KB & query part, so its models over
+        its own symbols multiply both counts: unconstrained symbols count 2^k,
+        and an inconsistent rest gives 0. The query's part is counted by a
+        TruthTable of its own clauses with this one's settings, and the rest
+        exactly by the #SAT model counter.
+        """
+        query_symbols = parse_formula(query).symbols()
+        kept = self.kb.connected_clauses(query_symbols)
+        if len(kept) == len(self.formulas):
+            return None
+        kept_key = frozenset(kept)
+        rest_key = frozenset(range(len(self.formulas))) - kept_key
+        
+        sliced = self._slices.get(kept_key)
+        if sliced is None:
+            sliced = TruthTable([self.kb.clauses[c] for c in kept], self.mode, self.block_size, self.workers,
+                                self.horn_fast_path, slice_query=False, trace_level='off')
+            self._slices[kept_key] = sliced
+        self.stats['sliced_clauses'] = len(rest_key)
+        self.stats['sliced_symbols'] = len(self.kb.symbols - sliced.kb.symbols - query_symbols)
+        
+        if rest_key not in self._rest_counts:
+            rest = [self.formulas[c] for c in sorted(rest_key)]
+            encoder = CNFEncoder(sorted(set().union(*(formula.symbols() for formula in rest))), equivalence=True)
+            for formula in rest:
+                encoder.add(formula)
+            counter = _ModelCounter()
+            counter.budget = self._budget
+            self._rest_counts[rest_key] = counter.count(encoder.clauses, len(encoder.names))
+        rest_count = self._rest_counts[rest_key]
+        
+        sliced.stats = {}
+        sliced._budget = self._budget
+        try:
+            kb_sat_count, proving_count = sliced._count_models(query)
+        finally:
+            sliced._budget = None
+            for key, value in sliced.stats.items():
+                if key != 'parse_seconds':
+                    self.stats[key] = self.stats.get(key, 0) + value
+        return kb_sat_count * rest_count, proving_count * rest_count
+
+    def iter_truth_table(self, query: str, start: int = 0, limit: Optional[int] = None, filter: str = 'all',
+                         budget: Optional[Budget] = None):
+        """Lazily yield truth table rows, one model at a time.
+
+        Args:
+            query: The query evaluated in every row
+            start: Number of matching rows to skip
+            limit: Maximum number of rows to yield (None for no limit)
+            filter: 'all', 'kb_satisfied' or 'proves_query' to keep only those rows
+            budget: Optional Budget bounding the models scanned; past it BudgetExceeded is raised
+
+        Yields:
+            Row dicts with the model index, model, per-clause results and query result
+        """
+        if filter not in self.ROW_FILTERS:
+            raise ValueError(f"Invalid row filter '{filter}'. Please choose among: {list(self.ROW_FILTERS)}")
+        if start < 0 or (limit is not None and limit < 0):
+            raise ValueError("Start and limit must not be negative")
+        symbols, kb_check, clause_checks, query_check = self._compile(query)
+        n_symbols = len(symbols)
+        total_models = 2 ** n_symbols
+        shifts = range(n_symbols - 1, -1, -1)
+        
+        # Without a filter every model is a row, so jump straight to the first requested one
+        first = start if filter == 'all' else 0
+        skip = 0 if filter == 'all' else start
+        emitted = 0
+        if budget is not None:
+            budget = budget.started()
+        for i in range(first, total_models):
+            if limit is not None and emitted >= limit:
+                return
+            if budget is not None and not (i - first) & self.BUDGET_CHECK_INTERVAL:
+                budget.check(models=i - first, rows=emitted)
+            # Value tuple in the reversed layout expected by the compiled checks
+            values = tuple(bool((i >> shift) & 1) for shift in shifts)
+            kb_satisfied = kb_check(values)
+            query_result = query_check(values)
+            if filter == 'kb_satisfied' and not kb_satisfied:
+                continue
+            if filter == 'proves_query' and not (kb_satisfied and query_result):
+                continue
+            if skip:
+                skip -= 1
+                continue
             
-            # Add row to truth table
-            row = {
-                'model': model,
-                'kb_results': kb_results,
+            emitted += 1
+            yield {
+                'index': i,
+                'model': dict(zip(symbols, reversed(values))),
+                'kb_results': [check(values) for check in clause_checks],
                 'kb_satisfied': kb_satisfied,
                 'query_result': query_result,
                 'proves_query': kb_satisfied and query_result
             }
-            truth_table['rows'].append(row)
-        
-        # Calculate summary
-        truth_table['summary'] = {
-            'total_models': total_models,
+
+    def get_summary(self, query: str): # -> Dict[str, Union[int, bool]]
+        """Compute the truth table summary by counting models, without keeping any rows."""
+        symbols, _ = self._prepare(query)
+        kb_sat_count, proving_count = self._count_models(query)
+        return {
+            'total_models': 2 ** len(symbols),
+            'kb_models': kb_sat_count,
             'proving_models': proving_count,
             'is_entailed': kb_sat_count > 0 and proving_count == kb_sat_count
         }
+
+    def get_truth_table(self, query: str, start: int = 0, limit: Optional[int] = None, filter: str = 'all',
+                        budget: Optional[Budget] = None):
+        """Generate truth table data for one page of rows (all rows by default) plus the summary.
+
+        A budget bounds the scan for the page's rows only; solve the query first
+        (under the same budget) so the summary reuses its count.
+        """
+        symbols, _ = self._prepare(query)
+        
+        # Fetch one extra row to tell whether another page follows
+        rows = list(self.iter_truth_table(query, start, None if limit is None else limit + 1, filter, budget))
+        has_more = limit is not None and len(rows) > limit
+        
+        return {
+            'symbols': symbols,
+            'clauses': self.kb.clauses,
+            'query': query,
+            'rows': rows[:limit] if has_more else rows,
+            'page': {'start': start, 'limit': limit, 'filter': filter, 'has_more': has_more},
+            'summary': self.get_summary(query)
+        }
+
+    def _count_models(self, query: str): # -> Tuple[int, int]
+        """Count KB models and proving models once per query: sliced to the query's components
+        of the KB, on the Horn fast path where it applies, and otherwise with the configured mode."""
+        if query not in self._model_counts:
+            counts = self._count_sliced(query) if self.slice_query else None
+            if counts is None and self.horn_fast_path:
+                counts = self._count_horn(query)
+            if counts is None:
+                if self.mode == 'pruned':
+                    counts = self._count_pruned(query)
+                elif self.mode == 'components':
+                    counts = self._count_components(query)
+                elif self.workers > 1:
+                    counts = self._count_parallel(query)
+                else:
+                    counts = self._count_range(query)
+                self._tally(query, counts[0])
+            self._model_counts[query] = counts
+        return self._model_counts[query]
+    
+    def _tally(self, query: str, kb_sat_count: int):
+        """
+        Add the work of one full count to the stats.
+        
+        The pruned mode evaluates the KB and query once per search node (its
+        'models' are partial), the vectorized mode once per 64-model word, and
+        the enumerating mode the KB once per model and the query once per KB
+        model. The compiled KB stops at its first false clause except in the
+        vectorized mode, so clause_evaluations is an upper bound elsewhere.
+        The components mode evaluates no models and keeps its own counters.
+        """
+        if self.mode == 'components':
+            return
+        n_symbols = len(self._prepare(query)[0])
+        if self.mode == 'pruned':
+            models = kb_evaluations = query_evaluations = self.nodes_visited
+        elif self.mode == 'vectorized':
+            models = 2 ** n_symbols
+            kb_evaluations = query_evaluations = max(1, models >> 6)
+        else:
+            models = kb_evaluations = 2 ** n_symbols
+            query_evaluations = kb_sat_count
+        stats = self.stats
+        for key, value in (('models_evaluated', models), ('kb_evaluations', kb_evaluations),
+                           ('clause_evaluations', kb_evaluations * len(self.formulas)),
+                           ('query_evaluations', query_evaluations)):
+            stats[key] = stats.get(key, 0) + value
+
+    def _count_range(self, query: str, prefix: int = 0, prefix_bits: int = 0): # -> Tuple[int, int]
+        """Count KB models and proving models within one fixed-prefix range of the model space."""
+        if self.mode == 'vectorized':
+            return self._count_vectorized(query, prefix, prefix_bits)
+        return self._count_enumerate(query, prefix, prefix_bits)
+
+    def _count_parallel(self, query: str): # -> Tuple[int, int]
+        """Split the model space into fixed-prefix ranges and count them across a process pool.
+
+        Each worker receives the clauses once through the pool initializer and
+        then only range numbers; partial counts are summed in the parent.
+        Under a deadline the parent waits for a range only until the deadline,
+        and leaving the pool terminates the workers, ranges still running included.
+        """
+        symbols, _ = self._prepare(query)
+        # Several ranges per worker keep the pool balanced when ranges prune unevenly
+        prefix_bits = (self.workers * self.RANGES_PER_WORKER - 1).bit_length()
+        free_bits = 6 if self.mode == 'vectorized' else 0
+        prefix_bits = min(prefix_bits, len(symbols) - free_bits)
+        if prefix_bits <= 0:
+            return self._count_range(query)
         
-        return truth_table
+        n_ranges = 2 ** prefix_bits
+        budget = self._budget
+        kb_sat_count = 0
+        proving_count = 0
+        with Pool(self.workers, _init_truth_table_worker, (self.kb.clauses, self.mode, self.block_size)) as pool:
+            counts = pool.imap(partial(_count_truth_table_range, query, prefix_bits=prefix_bits), range(n_ranges))
+            done = 0
+            while done < n_ranges:
+                wait = None
+                if budget is not None and budget.deadline is not None:
+                    wait = max(0.0, budget.deadline - time.perf_counter())
+                try:
+                    range_kb, range_proving = counts.next(wait)
+                    done += 1
+                    kb_sat_count += range_kb
+                    proving_count += range_proving
+                except PoolTimeoutError:
+                    pass  # The check below finds the deadline passed
+                if budget is not None:
+                    budget.check(ranges_done=done, ranges=n_ranges, kb_models=kb_sat_count,
+                                 proving_models=proving_count)
+        return kb_sat_count, proving_count
     
 
+    @_budgeted
     def solve(self, query: str): #  -> Tuple[bool, int]
         """Solve a propositional logic query using the truth table method.
     
@@ -229,327 +1072,1289 @@ class TruthTable(InferenceEngine):
                 - bool: Whether the query is entailed by the knowledge base
                 - int: Number of models that prove the query
         """
-       # Generate complete truth table and extract results
-        truth_table = self.get_truth_table(query)
+        self._reset_stats('models_evaluated', 'kb_evaluations', 'clause_evaluations', 'query_evaluations', 'memo_hits',
+                          'horn_fast_path', 'sliced_clauses', 'sliced_symbols')
+        # Only a solve reusing an earlier count is a memo hit, not the summary of a page
+        if query in self._model_counts:
+            self.stats['memo_hits'] += 1
+        # Count models without materialising rows
+        with self._phase('search'):
+            kb_sat_count, proving_count = self._count_models(query)
         
         # Return whether query is entailed and number of proving models
-        return (truth_table['summary']['is_entailed'], 
-                truth_table['summary']['proving_models'])
+        return (kb_sat_count > 0 and proving_count == kb_sat_count, proving_count)
+
+        
+# Per-process solver used by truth table pool workers, built once by the pool initializer
+_worker_truth_table = None
+
+
+def _init_truth_table_worker(clauses: List[str], mode: str, block_size: int):
+    """Build the worker's TruthTable from the shipped clauses."""
+    global _worker_truth_table
+    _worker_truth_table = TruthTable(clauses, mode=mode, block_size=block_size)
+
+
+def _count_truth_table_range(query: str, prefix: int, prefix_bits: int): # -> Tuple[int, int]
+    """Count one fixed-prefix range of models in a pool worker."""
+    return _worker_truth_table._count_range(query, prefix, prefix_bits)
 
         
 class ChainingSolver(InferenceEngine):
     """Base class for chaining algorithms with common functionality."""
     
-    def __init__(self, clauses: List[str]):
-        super().__init__(clauses)
+    # Reasoning text for each kind of step
+    REASONS = {
+        'fact': "Initial fact from knowledge base",
+        'derived': "Derived using: {}",
+        'goal': "Initial goal to prove",
+        'known': "Known fact from knowledge base",
+        'proved': "Proved using: {}",
+    }
+    
+    def __init__(self, clauses: List[str], **trace_options):
+        super().__init__(clauses, **trace_options)
         self.entailed = []
-        self.steps = [] # Track reasoning steps
-        
-    def _get_facts(self): # -> Set[str]
-        """Get initial facts from the knowledge base."""
-        return {conclusion for premises, conclusion in self.kb.horn_clauses if not premises}
-    
-    def _add_step(self, fact: str, reasoning: str, known_facts: List[str] = None):
-        """Add a reasoning step with explanation."""
-        step = {
-            'fact': fact,
-            'reasoning': reasoning,
-            'known_facts': known_facts or []
-        }
-        self.steps.append(step)
-
-class ForwardChaining(ChainingSolver):
-    """Forward chaining algorithm implementation."""
+        self._index = None
+        
+    def _indexed(self):
+        """Build the engine's rule index on first use and keep it for later queries."""
+        if self._index is None:
+            self._index = self._index_rules()
+        return self._index
+        
+    def _get_facts(self, horn_clauses=None): # -> Set[str]
+        """Get initial facts from the knowledge base (or from the given Horn clauses)."""
+        if horn_clauses is None:
+            horn_clauses = self.kb.horn_clauses
+        return {conclusion for premises, conclusion in horn_clauses if not premises}
     
-    def _find_next_conclusion(self, rules, known_facts):
+    def _add_step(self, kind: str, fact: str, known: int, premises: List[str] = None):
         """
-        Find the next conclusion that can be derived, prioritizing simpler rules.
+        Add a reasoning step: the fact, the kind of reasoning behind it, the rule's
+        premises (the KB's own list, not a copy) and how many entailed facts were
+        known at that point. Streamed events leave the known facts out, since the
+        listener has already seen each of them arrive.
         """
-        candidate_rules = []
-        
-        # First, gather all rules whose premises are satisfied
-        for premises, conclusion in rules:
-            if conclusion not in known_facts and all(p in known_facts for p in premises):
-                # Calculate rule complexity (number of premises)
-                complexity = len(premises)
-                candidate_rules.append((complexity, premises, conclusion))
-        
-        if not candidate_rules:
-            return None, None
-            
-        # Sort by complexity (fewer premises first)
-        candidate_rules.sort(key=lambda x: x[0])
-        _, premises, conclusion = candidate_rules[0]
-        return premises, conclusion
+        self.trace.add(kind, fact, known, premises)
+        if self.on_step is not None:
+            self.on_step({'type': 'step', 'fact': fact, 'reasoning': self._reasoning(kind, premises)})
+    
+    def _reasoning(self, kind: str, premises: Optional[List[str]]): # -> str
+        return self.REASONS[kind].format(' AND '.join(premises or ()))
+    
+    @property
+    def steps(self): # -> List[Dict[str, object]]
+        """The recorded reasoning steps, rendered as {fact, reasoning, known_facts} dicts."""
+        return [{'fact': fact,
+                 'reasoning': self._reasoning(kind, premises),
+                 'known_facts': self.entailed[:known]}
+                for kind, fact, known, premises in self.trace.records]
+
+class ForwardChaining(ChainingSolver):
+    """Forward chaining algorithm implementation (PL-FC-Entails with an agenda)."""
+    FINAL_STATS = ('agenda_pushes',)
     
+    def __init__(self, clauses: List[str], early_exit: bool = False, slice_query: bool = False, **trace_options):
+        super().__init__(clauses, **trace_options)
+        self.early_exit = early_exit
+        # Only chain over the rules that can reach the query. Off by default: it
+        # changes the facts listed, which are part of FC's output
+        self.slice_query = slice_query
+    
+    def _index_rules(self, horn_clauses=None): # -> Tuple[List[Tuple[List[str], str, Set[str]]], Dict[str, List[int]]]
+        """List the rules (excluding pure facts) with their distinct premises, and index them by premise."""
+        if horn_clauses is None:
+            horn_clauses = self.kb.horn_clauses
+        rules = [(premises, conclusion, set(premises))
+                 for premises, conclusion in horn_clauses
+                 if premises]
+        rules_by_premise = {}
+        for rule_index, (_, _, distinct) in enumerate(rules):
+            for premise in distinct:
+                rules_by_premise.setdefault(premise, []).append(rule_index)
+        return rules, rules_by_premise
+    
+    @_budgeted
     def solve(self, query: str):
         """
         Implement the forward chaining algorithm to determine if a query can be proven.
         
+        Each rule keeps a count of its premises not yet inferred, and an index from
+        premise to rules means each inferred fact only touches the rules it appears
+        in. Rules whose count reaches zero wait on the agenda, which fires them
+        simpler rules first (fewest premises, then KB order), matching the order
+        in which facts have always been reported.
+        
+        With slicing turned on, only the query's cone takes part: the facts and rules
+        that can contribute to deriving it, so other facts are neither derived
+        nor listed.
+        
         Args:
             query: The query to prove
             
         Returns:
             Tuple of (whether query was proven, list of facts derived in order)
         """
-        # Initialize with facts
         self.entailed = []
-        self.steps = []
+        self.trace.clear()
+        self._reset_stats('rule_firings', 'agenda_pushes', 'sliced_clauses')
+        search_start = time.perf_counter()
+        inferred = set()
+        
+        if self.slice_query:
+            cone = self.kb.goal_cone([query])
+            self.stats['sliced_clauses'] = len(self.kb.horn_clauses) - len(cone)
+            rules, rules_by_premise = self._index_rules(cone)
+            facts = self._get_facts(cone)
+        else:
+            rules, rules_by_premise = self._indexed()
+            facts = self._get_facts()
+        unsatisfied = [len(distinct) for _, _, distinct in rules]
+        agenda = []
+        agenda_pushes = 0
+        
+        def infer(fact):
+            nonlocal agenda_pushes
+            inferred.add(fact)
+            for rule_index in rules_by_premise.get(fact, ()):
+                unsatisfied[rule_index] -= 1
+                if unsatisfied[rule_index] == 0:
+                    heapq.heappush(agenda, (len(rules[rule_index][0]), rule_index))
+                    agenda_pushes += 1
         
         # Initialize with facts
-        facts = self._get_facts()
         for fact in sorted(facts):
+            self._add_step('fact', fact, len(self.entailed))
             self.entailed.append(fact)
-            self._add_step(
-                fact=fact,
-                reasoning="Initial fact from knowledge base",
-                known_facts=self.entailed[:-1]
-            )
-            
-        # Get rules (excluding pure facts)
-        rules = [(premises, conclusion) 
-                for premises, conclusion in self.kb.horn_clauses 
-                if premises]
+            infer(fact)
         
-        while True:
-            # Find next applicable rule based on current knowledge
-            premises, conclusion = self._find_next_conclusion(rules, self.entailed)
-            
-            if conclusion is None:  # No more rules can be applied
-                break
-                
-            # Apply the rule
-            if conclusion not in self.entailed:
-                self.entailed.append(conclusion)
-                self._add_step(
-                    fact=conclusion,
-                    reasoning=f"Derived using: {' AND '.join(premises)}",
-                    known_facts=self.entailed[:-1]
-                )
+        while agenda and not (self.early_exit and query in inferred):
+            # Fire the simplest applicable rule based on current knowledge
+            _, rule_index = heapq.heappop(agenda)
+            premises, conclusion, _ = rules[rule_index]
+            if conclusion in inferred:
+                continue
             
-            # Remove the used rule to prevent cyclic inference
-            rules.remove((premises, conclusion))
-                
-        return query in self.entailed, self.entailed
+            self._add_step('derived', conclusion, len(self.entailed), premises)
+            self.entailed.append(conclusion)
+            self.stats['rule_firings'] += 1
+            if self._budget is not None and not self.stats['rule_firings'] & self.BUDGET_CHECK_INTERVAL:
+                self._budget.check(facts_derived=len(self.entailed), agenda_pushes=agenda_pushes)
+            infer(conclusion)
+        
+        self.stats['agenda_pushes'] = agenda_pushes
+        self.stats['search_seconds'] = time.perf_counter() - search_start
+        return query in inferred, self.entailed
+
+
+class _GoalFrame:
+    """A goal being proved by BackwardChaining, with its position among its rules and premises."""
+    __slots__ = ('goal', 'rules', 'rule_index', 'premise_index', 'depth', 'lowlink', 'pending')
+
+    def __init__(self, goal: str, rules: List[List[str]], depth: int):
+        self.goal = goal
+        self.rules = rules
+        self.rule_index = 0
+        self.premise_index = 0
+        self.depth = depth
+        # Shallowest in-progress goal this goal's failures relied on (its own depth if none)
+        self.lowlink = depth
+        # Failed subgoals whose failure is only final once that goal fails too
+        self.pending = []
 
 
 class BackwardChaining(ChainingSolver):
-    """Backward chaining algorithm implementation."""
+    """Backward chaining algorithm implementation (tabled, with an explicit goal stack)."""
     
-    def _can_prove(self, query: str, visited: Set[str]): # -> bool
-        """Try to prove a query using backward chaining."""
-        if query in visited:
-            return False
-       
-        visited.add(query)
-        
-        # Check if query is a fact
-        if query in self._get_facts():
-            self._add_step(
-                fact=query,
-                reasoning="Known fact from knowledge base",
-                known_facts=self.entailed
-            )
-            if query not in self.entailed:
-                self.entailed.append(query)
-            return True
-        
-        
-        # Try to prove through implications
+    def _index_rules(self): # -> Tuple[Set[str], Dict[str, List[List[str]]]]
+        """Split the KB into facts and rules indexed by conclusion, in KB order."""
+        facts = set()
+        rules_by_conclusion = {}
         for premises, conclusion in self.kb.horn_clauses:
-            if conclusion == query:
-                all_premises_proven = True
-                required_premises = []
-                
-                for premise in premises:
-                    if not self._can_prove(premise, visited.copy()):
-                        all_premises_proven = False
-                        break
-                    required_premises.append(premise)
-                
-                if all_premises_proven:
-                    self._add_step(
-                        fact=query,
-                        reasoning=f"Proved using: {' AND '.join(required_premises)}",
-                        known_facts=self.entailed
-                    )
-                    if query not in self.entailed:
-                        self.entailed.append(query)
-                    return True
+            if premises:
+                rules_by_conclusion.setdefault(conclusion, []).append(premises)
+            else:
+                facts.add(conclusion)
+        return facts, rules_by_conclusion
+    
+    def _record(self, goal: str, kind: str, premises: List[str] = None):
+        """Record a proven goal as a reasoning step and entailed symbol."""
+        self._add_step(kind, goal, len(self.entailed), premises)
+        self.entailed.append(goal)
         
-        return False
+    @_budgeted
+    def solve(self, query: str): # -> Tuple[bool, List[str]]
+        """
+        Prove the query by backward chaining over a goal table.
         
+        Rules are tried in KB order and premises left to right, as in the classic
+        recursive formulation, but with an explicit stack. Every goal is proven
+        or refuted at most once: proven goals are remembered outright, while a
+        goal that failed only because it needed a goal still in progress above
+        it (a cycle) stays pending until that goal itself fails.
         
-    def solve(self, query: str): # -> Tuple[bool, List[str]]
-        # self.entailed = set()
+        Args:
+            query: The query to prove
+            
+        Returns:
+            Tuple of (whether query was proven, list of symbols proven in order)
+        """
         self.entailed = []
-        self.steps = []
+        self.trace.clear()
+        self._reset_stats('goals_expanded', 'memo_hits')
+        search_start = time.perf_counter()
+        stats = self.stats
         # Add initial goal step
-        self._add_step(
-            fact=query,
-            reasoning="Initial goal to prove",
-            known_facts=[]
-        )
-        result = self._can_prove(query, set())
+        self._add_step('goal', query, 0)
         
-        return result, self.entailed
-
-
-
-
-class DPLL(InferenceEngine):
-    """DPLL (Davis-Putnam-Logemann-Loveland) algorithm implementation."""
+        facts, rules_by_conclusion = self._indexed()
+        proven = set()
+        failed = set()
+        in_progress = {}  # goal -> depth of its frame on the stack
+        stack = []
+        
+        def visit(goal, parent):
+            """Resolve a goal from the tables, or push a frame for it; returns True/False/None."""
+            if goal in proven:
+                stats['memo_hits'] += 1
+                return True
+            if goal in failed:
+                stats['memo_hits'] += 1
+                return False
+            if goal in in_progress:
+                # Cycle: fail this branch, but the failure depends on that goal
+                parent.lowlink = min(parent.lowlink, in_progress[goal])
+                return False
+            if goal in facts:
+                proven.add(goal)
+                self._record(goal, 'known')
+                return True
+            rules = rules_by_conclusion.get(goal)
+            if not rules:
+                failed.add(goal)
+                return False
+            in_progress[goal] = len(stack)
+            stack.append(_GoalFrame(goal, rules, len(stack)))
+            stats['goals_expanded'] += 1
+            if self._budget is not None and not stats['goals_expanded'] & self.BUDGET_CHECK_INTERVAL:
+                self._budget.check(symbols_proven=len(self.entailed), goal_depth=len(stack))
+            return None
+        
+        root = _GoalFrame(None, [], -1)
+        outcome = visit(query, root)
+        
+        while stack:
+            frame = stack[-1]
+            if frame.rule_index < len(frame.rules):
+                premises = frame.rules[frame.rule_index]
+                if frame.premise_index < len(premises):
+                    outcome = visit(premises[frame.premise_index], frame)
+                    if outcome is None:
+                        continue  # Descend into the new subgoal
+                    if outcome:
+                        frame.premise_index += 1
+                    else:
+                        frame.rule_index += 1
+                        frame.premise_index = 0
+                    continue
+                # Every premise of the current rule is proven
+                outcome = True
+                proven.add(frame.goal)
+                self._record(frame.goal, 'proved', premises)
+            else:
+                # Every rule for this goal failed
+                outcome = False
+                
+            stack.pop()
+            del in_progress[frame.goal]
+            parent = stack[-1] if stack else root
+            if outcome:
+                # Tentative failures below may have been caused by this goal being in progress
+                parent.premise_index += 1
+                continue
+            if frame.lowlink >= frame.depth:
+                failed.add(frame.goal)
+                failed.update(frame.pending)
+            else:
+                parent.lowlink = min(parent.lowlink, frame.lowlink)
+                parent.pending.extend(frame.pending)
+                parent.pending.append(frame.goal)
+            parent.rule_index += 1
+            parent.premise_index = 0
+        
+        stats['search_seconds'] = time.perf_counter() - search_start
+        return outcome, self.entailed
+
+
+class CNFEncoder:
+    """Plaisted-Greenbaum (polarity-aware Tseitin) conversion of formulas to integer CNF.
+
+    Variables are numbered from 1 in the order they are declared; a negated
+    literal is the negative number. Sub-formulas that cannot be written as a
+    single clause get an auxiliary variable (named '#k', which no symbol can
+    be) defined only in the direction its polarity needs, so the CNF stays
+    linear in the size of the formulas instead of growing exponentially as
+    with distribution. Top-level conjunctions and clause-shaped formulas such
+    as `a & b => c` are emitted directly without auxiliaries.
+    
+    With `equivalence`, every auxiliary is defined in both directions (plain
+    Tseitin), so each one is a function of the symbols and the CNF has exactly
+    as many models as the formulas, as model counting needs.
+    """
     
-    #_____________________________ Horn 3 and Gen 1 not correct _____________________________ 
-    def _parse_cnf_clauses(self, clause_str: str): #  -> List[List[Tuple[str, str]]]
-        """Convert input clause string to CNF format."""
-        input_clauses = [c.strip() for c in clause_str.split(';') if c.strip()]
-        result_clauses = []
+    def __init__(self, symbols: List[str] = (), equivalence: bool = False):
+        self.names = []
+        self.ids = {}
+        self.clauses = []
+        self.equivalence = equivalence
+        self._definitions = {}  # id(node) -> [node, variable, polarities defined]
+        for symbol in symbols:
+            self.var(symbol)
+    
+    def var(self, name: str): # -> int
+        """Return the variable of a symbol, declaring it if new."""
+        if name not in self.ids:
+            self.names.append(name)
+            self.ids[name] = len(self.names)
+        return self.ids[name]
+    
+    def copy(self): # -> CNFEncoder
+        """Return an independent encoder with the same variables, clauses and definitions."""
+        other = CNFEncoder(equivalence=self.equivalence)
+        other.names = list(self.names)
+        other.ids = dict(self.ids)
+        other.clauses = list(self.clauses)
+        other._definitions = {key: [node, variable, set(polarities)] for key, (node, variable, polarities) in self._definitions.items()}
+        return other
+    
+    def aux(self): # -> int
+        """Declare a fresh auxiliary variable."""
+        return self.var(f'#{len(self.names) + 1}')
+    
+    def is_aux(self, name: str): # -> bool
+        return name.startswith('#')
+    
+    def forget_definitions(self, keep: int):
+        """Drop every definition but the first `keep`, so the nodes defined later (and no longer
+        encoded) can be freed and their ids never match a later node."""
+        while len(self._definitions) > keep:
+            self._definitions.popitem()
+    
+    def add_clause(self, literals: List[int]):
+        """Add a clause, merging duplicate literals and dropping it if tautological."""
+        clause = set(literals)
+        if any(-lit in clause for lit in clause):
+            return
+        self.clauses.append(sorted(clause, key=abs))
+    
+    def add(self, formula: Formula, positive: bool = True):
+        """Assert a formula (or its negation when `positive` is False)."""
+        connective = formula.connective
+        if connective is LogicalConnective.NEGATION:
+            self.add(formula.args[0], not positive)
+        elif connective is LogicalConnective.CONJUNCTION and positive:
+            for arg in formula.args:
+                self.add(arg, True)
+        elif connective is LogicalConnective.DISJUNCTION and not positive:
+            for arg in formula.args:
+                self.add(arg, False)
+        elif connective is LogicalConnective.IMPLICATION and not positive:
+            self.add(formula.args[0], True)
+            self.add(formula.args[1], False)
+        else:
+            literals = []
+            self._disjuncts(formula, positive, literals)
+            self.add_clause(literals)
+    
+    def _disjuncts(self, formula: Formula, positive: bool, literals: List[int]):
+        """Collect the literals of the clause a formula flattens to, naming non-literal parts."""
+        connective = formula.connective
+        if connective is LogicalConnective.NEGATION:
+            self._disjuncts(formula.args[0], not positive, literals)
+        elif connective is LogicalConnective.DISJUNCTION and positive:
+            for arg in formula.args:
+                self._disjuncts(arg, True, literals)
+        elif connective is LogicalConnective.CONJUNCTION and not positive:
+            for arg in formula.args:
+                self._disjuncts(arg, False, literals)
+        elif connective is LogicalConnective.IMPLICATION and positive:
+            self._disjuncts(formula.args[0], False, literals)
+            self._disjuncts(formula.args[1], True, literals)
+        elif positive:
+            literals.append(self.literal(formula, 1))
+        else:
+            literals.append(-self.literal(formula, -1))
+    
+    def literal(self, formula: Formula, polarity: int = 0): # -> int
+        """Return a literal equivalent to the formula where it occurs with the given polarity.
+
+        Polarity 1 means the formula only occurs positively (so the literal need
+        only imply it), -1 only negatively, and 0 both ways.
+        """
+        connective = formula.connective
+        if connective is None:
+            return self.var(formula.symbol)
+        if self.equivalence:
+            polarity = 0
+        if connective is LogicalConnective.NEGATION:
+            return -self.literal(formula.args[0], -polarity)
+        
+        definition = self._definitions.get(id(formula))
+        if definition is None:
+            definition = [formula, self.aux(), set()]
+            self._definitions[id(formula)] = definition
+        variable = definition[1]
+        for direction in ((1, -1) if polarity == 0 else (polarity,)):
+            if direction not in definition[2]:
+                definition[2].add(direction)
+                self._define(formula, variable, direction)
+        return variable
+    
+    def _define(self, formula: Formula, x: int, direction: int):
+        """Emit the clauses for x => formula (direction 1) or formula => x (direction -1)."""
+        connective = formula.connective
+        if connective is LogicalConnective.BICONDITIONAL:
+            a = self.literal(formula.args[0], 0)
+            b = self.literal(formula.args[1], 0)
+            if direction > 0:
+                self.add_clause([-x, -a, b])
+                self.add_clause([-x, a, -b])
+            else:
+                self.add_clause([x, a, b])
+                self.add_clause([x, -a, -b])
+        elif connective is LogicalConnective.CONJUNCTION:
+            literals = [self.literal(arg, direction) for arg in formula.args]
+            if direction > 0:
+                for lit in literals:
+                    self.add_clause([-x, lit])
+            else:
+                self.add_clause([x] + [-lit for lit in literals])
+        else:
+            # Disjunction, or implication as ~a || b
+            if connective is LogicalConnective.IMPLICATION:
+                literals = [-self.literal(formula.args[0], -direction), self.literal(formula.args[1], direction)]
+            else:
+                literals = [self.literal(arg, direction) for arg in formula.args]
+            if direction > 0:
+                self.add_clause([-x] + literals)
+            else:
+                for lit in literals:
+                    self.add_clause([x, -lit])
 
-        for clause in input_clauses:
+
+class _ModelCounter:
+    """
+    Exact model counter (#SAT) for integer CNF, by DPLL-style search.
+    
+    After each decision, unit propagation simplifies the clauses. Variables
+    that drop out of every clause without being assigned are free and
+    multiply the count by 2^k. The remaining clauses split into connected
+    components (clause sets sharing no variable), which are counted
+    separately and multiplied. Each component's count is cached under its
+    clause set, so a sub-problem reached again by another branch or another
+    query is not searched twice.
+    """
+    MAX_CACHE_ENTRIES = 1 << 20
+    
+    def __init__(self):
+        self.cache = {}  # frozenset of clauses -> model count over their variables
+        self.stats = {'decisions': 0, 'cache_hits': 0}
+        self.budget = None  # Optional started Budget; max_decisions applies to each count()
+        self._first_decision = 0
+    
+    def count(self, clauses: List[List[int]], n_vars: int): # -> int
+        """Count the models of the clauses over variables 1..n_vars."""
+        self._first_decision = self.stats['decisions']
+        clauses, assigned = self._propagate([tuple(clause) for clause in clauses], set())
+        if clauses is None:
+            return 0
+        if len(self.cache) > self.MAX_CACHE_ENTRIES:
+            self.cache.clear()
+        used = {abs(lit) for clause in clauses for lit in clause}
+        return self._count(clauses) << (n_vars - len(used) - len(assigned))
+    
+    @staticmethod
+    def _propagate(clauses: List[Tuple[int, ...]], true: Set[int]): # -> Tuple[Optional[List[Tuple[int, ...]]], Set[int]]
+        """
+        Simplify the clauses under the true literals and every unit they imply.
+        
+        Each clause counts its false literals, found through the occurrence
+        lists of the literal just made true, so propagation takes one pass
+        over the clauses however long the chain of units. Returns the
+        remaining (shortened, unsatisfied) clauses and all the true literals,
+        or None for the clauses on a conflict.
+        """
+        true = set(true)
+        occurrences = {}
+        queue = list(true)
+        for c, clause in enumerate(clauses):
             if not clause:
+                return None, true
+            for lit in clause:
+                occurrences.setdefault(lit, []).append(c)
+            if len(clause) == 1 and clause[0] not in true:
+                if -clause[0] in true:
+                    return None, true
+                true.add(clause[0])
+                queue.append(clause[0])
+        satisfied = [False] * len(clauses)
+        false_count = [0] * len(clauses)
+        while queue:
+            lit = queue.pop()
+            for c in occurrences.get(lit, ()):
+                satisfied[c] = True
+            for c in occurrences.get(-lit, ()):
+                if satisfied[c]:
+                    continue
+                false_count[c] += 1
+                clause = clauses[c]
+                if false_count[c] < len(clause) - 1:
+                    continue
+                open_lits = [other for other in clause if -other not in true]
+                if any(other in true for other in open_lits):
+                    satisfied[c] = True
+                elif not open_lits:
+                    return None, true
+                elif false_count[c] == len(clause) - 1:
+                    true.add(open_lits[0])
+                    queue.append(open_lits[0])
+        remaining = [tuple(lit for lit in clause if -lit not in true)
+                     for c, clause in enumerate(clauses) if not satisfied[c]]
+        return remaining, true
+    
+    @staticmethod
+    def _components(clauses: List[Tuple[int, ...]]): # -> List[List[Tuple[int, ...]]]
+        """Split clauses into groups that share no variable (union-find over variables)."""
+        parent = {}
+        
+        def find(var):
+            root = var
+            while parent[root] != root:
+                root = parent[root]
+            while parent[var] != root:
+                parent[var], var = root, parent[var]
+            return root
+        
+        for clause in clauses:
+            first = abs(clause[0])
+            parent.setdefault(first, first)
+            for lit in clause[1:]:
+                var = abs(lit)
+                parent.setdefault(var, var)
+                a, b = find(first), find(var)
+                if a != b:
+                    parent[b] = a
+        groups = {}
+        for clause in clauses:
+            groups.setdefault(find(abs(clause[0])), []).append(clause)
+        return list(groups.values())
+    
+    def _count(self, clauses: List[Tuple[int, ...]]): # -> int
+        """Count the models of clauses over exactly the variables occurring in them."""
+        total = 1
+        for component in self._components(clauses):
+            key = frozenset(component)
+            cached = self.cache.get(key)
+            if cached is None:
+                cached = self._count_component(component)
+                self.cache[key] = cached
+            else:
+                self.stats['cache_hits'] += 1
+            total *= cached
+            if not total:
+                return 0
+        return total
+    
+    def _count_component(self, clauses: List[Tuple[int, ...]]): # -> int
+        """Branch on the variable occurring most often and add the counts of both branches."""
+        occurrences = {}
+        for clause in clauses:
+            for lit in clause:
+                var = abs(lit)
+                occurrences[var] = occurrences.get(var, 0) + 1
+        var = max(occurrences, key=lambda v: (occurrences[v], -v))
+        n_vars = len(occurrences)
+        self.stats['decisions'] += 1
+        if self.budget is not None:
+            decisions = self.stats['decisions'] - self._first_decision
+            self.budget.check(decisions=decisions, counter_decisions=decisions)
+        total = 0
+        for lit in (var, -var):
+            remaining, assigned = self._propagate(clauses, {lit})
+            if remaining is None:
                 continue
+            used = {abs(l) for clause in remaining for l in clause}
+            free = n_vars - len(used) - len(assigned)
+            total += self._count(remaining) << free
+        return total
 
-            clause = clause.strip('() ')
-
-            # print(f"Parsing clause: {clause}")  # Debug statement
 
-            if '<=>' in clause:
-                p, q = clause.split('<=>', 1)
-                p, q = p.strip(), q.strip()
-                clause1 = f'~{p}||{q}'
-                clause2 = f'{p}||~{q}'
-                # print(f"Handling biconditional: {clause} as {clause1} and {clause2}")  # Debug statement
-                result_clauses.extend(self._parse_cnf_clauses(clause1))
-                result_clauses.extend(self._parse_cnf_clauses(clause2))
+def _horn_renaming(clauses: List[List[int]], n_vars: int): # -> Optional[Set[int]]
+    """
+    Find variables whose flipping makes every clause Horn (at most one positive literal).
+    
+    Horn clause sets need no flips and dual-Horn sets (at most one negative
+    literal per clause) flip every variable. Otherwise a renaming exists
+    exactly when a 2-SAT problem is satisfiable: flip_x is its variable, and
+    no two literals of a clause may both end up positive. Returns None when
+    the clauses are not renamable Horn.
+    """
+    clauses = [sorted(set(clause)) for clause in clauses]
+    if all(sum(lit > 0 for lit in clause) <= 1 for clause in clauses):
+        return set()
+    if all(sum(lit < 0 for lit in clause) <= 1 for clause in clauses):
+        return set(range(1, n_vars + 1))
+    
+    # 2-SAT over flip variables: literal l ends up positive iff (l > 0) != flip_|l|,
+    # i.e. iff the 2-SAT literal -l holds (reading +x as "flip x")
+    implications = {}
+    for clause in clauses:
+        for i, a in enumerate(clause):
+            for b in clause[i + 1:]:
+                # Not both positive: a (as "flip") or b (as "flip"), so -a => b and -b => a
+                implications.setdefault(-a, []).append(b)
+                implications.setdefault(-b, []).append(a)
+    
+    # Tarjan's strongly connected components, iteratively, over literals +-1..n
+    index, lowlink, component = {}, {}, {}
+    on_stack, stack = set(), []
+    counter = completed = 0
+    for start in [lit for var in range(1, n_vars + 1) for lit in (var, -var)]:
+        if start in index:
+            continue
+        work = [(start, iter(implications.get(start, ())))]
+        index[start] = lowlink[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start)
+        while work:
+            node, successors = work[-1]
+            advanced = False
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = lowlink[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(implications.get(successor, ()))))
+                    advanced = True
+                    break
+                if successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+            if advanced:
                 continue
+            work.pop()
+            if work:
+                lowlink[work[-1][0]] = min(lowlink[work[-1][0]], lowlink[node])
+            if lowlink[node] == index[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component[member] = completed
+                    if member == node:
+                        break
+                completed += 1
+    
+    flipped = set()
+    for var in range(1, n_vars + 1):
+        if component[var] == component[-var]:
+            return None
+        # Components complete in reverse topological order: take the later literal
+        if component[var] < component[-var]:
+            flipped.add(var)
+    return flipped
 
-            if '=>' in clause:
-                p, q = clause.split('=>', 1)
-                p, q = p.strip(), q.strip()
-                clause = f'~{p}||{q}'
-                # print(f"Handling implication: {clause}")  # Debug statement
 
-            literals = []
-            for lit in clause.split('||'):
-                lit = lit.strip()
-                if lit.startswith('~'):
-                    literals.append(('-', lit[1:].strip()))
-                else:
-                    literals.append(('+', lit.strip()))
+def _horn_sat(clauses: List[List[int]], n_vars: int, flipped: Set[int]): # -> Optional[List[bool]]
+    """
+    Decide a (renamed) Horn clause set by linear-time unit resolution (Dowling-Gallier).
+    
+    Each clause counts its negative literals not yet made false; when the
+    count of a clause reaches zero its positive literal is forced true, or
+    the clauses are unsatisfiable if it has none. Returns the least model
+    (mapped back through the renaming) as values for variables 1..n_vars,
+    index 0 unused, or None when unsatisfiable.
+    """
+    remaining = []
+    heads = []
+    watchers = {}  # var -> clauses with -var (after renaming)
+    true = [False] * (n_vars + 1)
+    queue = []
+    for c, clause in enumerate(clauses):
+        head = None
+        negatives = 0
+        for lit in set(clause):
+            if (lit > 0) != (abs(lit) in flipped):
+                head = abs(lit)
+            else:
+                negatives += 1
+                watchers.setdefault(abs(lit), []).append(c)
+        remaining.append(negatives)
+        heads.append(head)
+        if negatives == 0:
+            if head is None:
+                return None
+            queue.append(head)
+    
+    while queue:
+        var = queue.pop()
+        if true[var]:
+            continue
+        true[var] = True
+        for c in watchers.get(var, ()):
+            remaining[c] -= 1
+            if remaining[c] == 0:
+                if heads[c] is None:
+                    return None
+                queue.append(heads[c])
+    return [value != (var in flipped) for var, value in enumerate(true)]
 
-            if literals:
-                # print(f"Adding literals: {literals}")  # Debug statement
-                result_clauses.append(literals)
 
-        return result_clauses
+class _Preprocessor:
+    """
+    Simplify an integer CNF before search, keeping what is needed to extend a model back.
+    
+    The passes, each of which can be left out:
+      tautologies       drop clauses holding a literal and its negation
+      duplicates        drop repeated clauses (repeated literals always merge)
+      subsumption       drop every clause that contains all literals of another
+      self_subsumption  strengthen D = (~l | A | B) to (A | B) given C = (l | A)
+      units             fix unit clauses at the top level and propagate them
+      pure              fix literals whose negation occurs nowhere
+      elimination       resolve a variable away when that does not add clauses
+    
+    The passes repeat until none changes anything. Fixed literals and
+    eliminated variables (with the clauses they were removed from) go on a
+    stack, which extend() unwinds to turn a model of the simplified clauses
+    into one of the original clauses.
+    """
+    PASSES = ('tautologies', 'duplicates', 'subsumption', 'self_subsumption', 'units', 'pure', 'elimination')
+    ELIMINATION_MAX_OCCURRENCES = 16  # Variables in more clauses than this are not eliminated
+    ELIMINATION_MAX_LENGTH = 16  # Nor those whose resolvents would be longer
     
+    STATS = ('tautologies_removed', 'duplicates_removed', 'subsumed_clauses', 'strengthened_clauses', 'units_fixed',
+             'pure_fixed', 'variables_eliminated', 'clauses_removed', 'variables_removed')
     
-    # _____________________________ All Horn test cases are correct, but the genenric is not correct _____________________________ 
-    # def _parse_cnf_clauses(self, clause_str: str): #  -> List[List[Tuple[str, str]]]
-    #     """Convert input clause string to CNF format."""
-    #     # First split the input into individual clauses (split on &)
-    #     input_clauses = [c.strip() for c in clause_str.split('&')]
-    #     result_clauses = []
+    def __init__(self, passes=PASSES, budget: Optional[Budget] = None):
+        self.passes = set(passes)
+        self.budget = budget  # Checked once per round of the passes
+        self.stack = []  # ('fix', literal) or ('eliminate', variable, clauses), in order
+        self.clauses = {}  # clause id -> frozenset of literals
+        self.occurrences = {}  # literal -> ids of the clauses holding it
+        self.next_id = 0
+        self.units = []  # Ids of clauses that were unit when added
+        self.touched = set()  # Ids of clauses added since the last subsumption pass
+        self.unsatisfiable = False
+        self.stats = dict.fromkeys(self.STATS, 0)
+    
+    def run(self, clauses: List[List[int]]): # -> List[List[int]]
+        """Return the simplified clauses; [[]] if the clauses were found unsatisfiable."""
+        seen = set()
+        for clause in clauses:
+            literals = frozenset(clause)
+            if 'tautologies' in self.passes and any(-lit in literals for lit in literals):
+                self.stats['tautologies_removed'] += 1
+                continue
+            if 'duplicates' in self.passes:
+                if literals in seen:
+                    self.stats['duplicates_removed'] += 1
+                    continue
+                seen.add(literals)
+            self._add(literals)
         
-    #     for clause in input_clauses:
-    #         # Handle empty clauses
-    #         if not clause:
-    #             continue
-                
-    #         # Remove outer parentheses if they exist
-    #         clause = clause.strip('() ')
-            
-    #         # Handle biconditional (P <=> Q)
-    #         if '<=>' in clause:
-    #             p, q = clause.split('<=>')
-    #             p, q = p.strip(), q.strip()
-    #             # Convert P <=> Q to (~P || Q) & (P || ~Q)
-    #             clause1 = f'~{p}||{q}'
-    #             clause2 = f'{p}||~{q}'
-    #             result_clauses.extend(self._parse_cnf_clauses(clause1))
-    #             result_clauses.extend(self._parse_cnf_clauses(clause2))
-    #             continue
-            
-    #         # Handle implication (P => Q)
-    #         if '=>' in clause:
-    #             p, q = clause.split('=>')
-    #             p, q = p.strip(), q.strip()
-    #             # Convert P => Q to ~P || Q
-    #             clause = f'~{p}||{q}'
-            
-    #         # Handle disjunctions
-    #         literals = []
-    #         for lit in clause.split('||'):
-    #             lit = lit.strip()
-    #             if lit.startswith('~'):
-    #                 literals.append(('-', lit[1:].strip()))
-    #             else:
-    #                 literals.append(('+', lit.strip()))
-                    
-    #         if literals:
-    #             result_clauses.append(literals)
-                
-    #     return result_clauses
+        changed = True
+        while changed and not self.unsatisfiable:
+            changed = False
+            if self.budget is not None:
+                self.budget.check(clauses_left=len(self.clauses), preprocessing=True)
+            if 'units' in self.passes:
+                changed |= self._propagate_units()
+            if 'pure' in self.passes and not self.unsatisfiable:
+                changed |= self._fix_pure()
+            if ('subsumption' in self.passes or 'self_subsumption' in self.passes) and not self.unsatisfiable:
+                changed |= self._subsume()
+            if 'elimination' in self.passes and not self.unsatisfiable:
+                changed |= self._eliminate()
+        
+        self.stats['clauses_removed'] = len(clauses) - len(self.clauses)
+        self.stats['variables_removed'] = (self.stats['units_fixed'] + self.stats['pure_fixed']
+                                           + self.stats['variables_eliminated'])
+        if self.unsatisfiable:
+            return [[]]
+        return [sorted(literals, key=abs) for literals in self.clauses.values()]
+    
+    def extend(self, model: Dict[int, bool]): # -> Dict[int, bool]
+        """
+        Extend a model of the simplified clauses to the original ones.
+        
+        Unwinding the stack, fixed literals are set, and an eliminated variable
+        is made true exactly when one of its clauses needs it to be. Variables
+        a choice depends on but the model leaves unassigned are set false.
+        """
+        model = dict(model)
+        for entry in reversed(self.stack):
+            if entry[0] == 'fix':
+                model[abs(entry[1])] = entry[1] > 0
+                continue
+            _, var, clauses = entry
+            model[var] = False
+            for clause in clauses:
+                if var in clause and not any(model.setdefault(abs(lit), False) == (lit > 0)
+                                             for lit in clause if lit != var):
+                    model[var] = True
+                    break
+        return model
+    
+    def _add(self, literals: frozenset): # -> int
+        if not literals:
+            self.unsatisfiable = True
+        c = self.next_id
+        self.next_id += 1
+        self.clauses[c] = literals
+        if len(literals) == 1:
+            self.units.append(c)
+        self.touched.add(c)
+        for lit in literals:
+            self.occurrences.setdefault(lit, set()).add(c)
+        return c
+    
+    def _remove(self, c: int): # -> frozenset
+        literals = self.clauses.pop(c)
+        for lit in literals:
+            self.occurrences[lit].discard(c)
+        return literals
+    
+    def _fix(self, lit: int, counter: str):
+        """Make a literal true: drop the clauses it satisfies and shorten those holding its negation."""
+        self.stack.append(('fix', lit))
+        self.stats[counter] += 1
+        for c in list(self.occurrences.get(lit, ())):
+            self._remove(c)
+        for c in list(self.occurrences.get(-lit, ())):
+            self._add(self._remove(c) - {-lit})
     
+    def _propagate_units(self): # -> bool
+        changed = False
+        while self.units and not self.unsatisfiable:
+            c = self.units.pop()
+            if c in self.clauses:
+                (lit,) = self.clauses[c]
+                self._fix(lit, 'units_fixed')
+                changed = True
+        return changed
     
+    def _fix_pure(self): # -> bool
+        changed = False
+        literals = {lit for lit, ids in self.occurrences.items() if ids}
+        for lit in sorted(literals, key=abs):
+            if -lit not in literals and self.occurrences[lit]:
+                self._fix(lit, 'pure_fixed')
+                changed = True
+        return changed
+    
+    def _subsume(self): # -> bool
+        """
+        Remove subsumed clauses and strengthen clauses by self-subsuming resolution.
+        
+        Only clauses added since the last pass (all of them the first time)
+        are checked, shortest first. Such a clause C is dropped if a clause
+        no longer than it subsumes it; otherwise it looks for the clauses
+        holding all its literals among those holding its rarest literal, and
+        for strengthening with l in C, among those holding ~l.
+        """
+        changed = False
+        queue = sorted((c for c in self.touched if c in self.clauses), key=lambda c: len(self.clauses[c]), reverse=True)
+        self.touched = set()
+        while queue and not self.unsatisfiable:
+            c = queue.pop()
+            if c not in self.clauses:
+                continue
+            clause = self.clauses[c]
+            if not clause:
+                continue
+            if 'subsumption' in self.passes:
+                if any(d != c and len(self.clauses[d]) <= len(clause) and self.clauses[d] <= clause
+                       for lit in clause for d in self.occurrences[lit]):
+                    self._remove(c)
+                    self.stats['subsumed_clauses'] += 1
+                    changed = True
+                    continue
+                rarest = min(clause, key=lambda lit: len(self.occurrences[lit]))
+                for d in list(self.occurrences[rarest]):
+                    if d != c and d in self.clauses and len(self.clauses[d]) >= len(clause) and clause <= self.clauses[d]:
+                        self._remove(d)
+                        self.stats['subsumed_clauses'] += 1
+                        changed = True
+            if 'self_subsumption' in self.passes:
+                for lit in clause:
+                    if -lit in clause:
+                        continue  # A tautology strengthens nothing
+                    rest = clause - {lit}
+                    for d in list(self.occurrences.get(-lit, ())):
+                        if d != c and d in self.clauses and len(self.clauses[d]) >= len(clause) and rest <= self.clauses[d]:
+                            queue.append(self._add(self._remove(d) - {-lit}))
+                            self.stats['strengthened_clauses'] += 1
+                            changed = True
+        self.touched = set()
+        return changed
     
+    def _eliminate(self): # -> bool
+        """Eliminate each variable whose resolvents, tautologies dropped, are no more than its clauses."""
+        changed = False
+        variables = {abs(lit) for lit, ids in self.occurrences.items() if ids}
+        for var in sorted(variables, key=lambda v: (len(self.occurrences.get(v, ())) + len(self.occurrences.get(-v, ())), v)):
+            if self.unsatisfiable:
+                break
+            # Tautologies (kept only without that pass) are removed but give no resolvents
+            positive = [self.clauses[c] for c in self.occurrences.get(var, ()) if -var not in self.clauses[c]]
+            negative = [self.clauses[c] for c in self.occurrences.get(-var, ()) if var not in self.clauses[c]]
+            if len(positive) + len(negative) > self.ELIMINATION_MAX_OCCURRENCES:
+                continue
+            resolvents = set()
+            for p in positive:
+                for n in negative:
+                    resolvent = (p - {var}) | (n - {-var})
+                    if any(-lit in resolvent for lit in resolvent):
+                        continue
+                    resolvents.add(resolvent)
+                    if len(resolvents) > len(positive) + len(negative):
+                        break
+                if len(resolvents) > len(positive) + len(negative):
+                    break
+            if len(resolvents) > len(positive) + len(negative) or \
+                    any(len(resolvent) > self.ELIMINATION_MAX_LENGTH for resolvent in resolvents):
+                continue
+            removed = [self._remove(c) for c in self.occurrences.get(var, set()) | self.occurrences.get(-var, set())]
+            self.stack.append(('eliminate', var, removed))
+            for resolvent in resolvents:
+                self._add(resolvent)
+            self.stats['variables_eliminated'] += 1
+            changed = True
+        return changed
 
-    def _evaluate_clause(self, clause: List[Tuple[str, str]], assignment: Dict[str, bool]): #  -> Optional[bool]
-        """Evaluate a clause given an assignment."""
-        clause_value = False
-        for sign, var in clause:
-            if var in assignment:
-                if (sign == '+' and assignment[var]) or (sign == '-' and not assignment[var]):
-                    return True
-            else:
-                return None  # Undetermined
-        return False
 
-    def _eval_formula(self, clauses: List[List[Tuple[str, str]]], assignment: Dict[str, bool]): #  -> Optional[bool]
-        """Evaluate entire formula under an assignment."""
-        results = []
-        for clause in clauses:
-            val = self._evaluate_clause(clause, assignment)
-            if val is False:
-                return False
-            if val is not None:
-                results.append(val)
-        if len(results) == len(clauses):
-            return all(results)
-        return None
+class DPLL(InferenceEngine):
+    """DPLL (Davis-Putnam-Logemann-Loveland) algorithm implementation."""
+    
+    # Step text for each kind of trace event, given the name of its literal
+    STEPS = {
+        'empty': "Empty clause: formula is unsatisfiable",
+        'unit': "Unit propagation: {}",
+        'conflict': "Conflict at the top level: formula is unsatisfiable",
+        'backtrack': "Conflict, backtracking: Trying {}",
+        'sat': "Evaluating formula: True",
+        'pure': "Pure literal: {}",
+        'decide': "Trying {}",
+        'horn': "Renamable Horn clause set: deciding by unit resolution",
+        'inconsistent': "Clauses sharing no symbol with the query are unsatisfiable",
+    }
+    # Statistics counter for each kind of step
+    COUNTERS = {'decide': 'decisions', 'unit': 'propagations', 'backtrack': 'backtracks', 'pure': 'pure_literals'}
+    # Every counter a search of the KB (with or without the query) reports
+    SEARCH_STATS = (*COUNTERS.values(), 'conflicts', 'horn_fast_path', *_Preprocessor.STATS)
+    PREPROCESS_PASSES = _Preprocessor.PASSES
+    
+    def __init__(self, clauses: List[str], horn_fast_path: bool = True, preprocess=PREPROCESS_PASSES,
+                 slice_query: bool = True, **trace_options):
+        super().__init__(clauses, **trace_options)
+        unknown = set(preprocess) - set(self.PREPROCESS_PASSES)
+        if unknown:
+            raise ValueError(f"Invalid preprocessing passes {sorted(unknown)}. "
+                             f"Please choose among: {list(self.PREPROCESS_PASSES)}")
+        self.horn_fast_path = horn_fast_path  # False forces the search on (renamable) Horn clause sets too
+        self.preprocess = tuple(preprocess)  # Preprocessing passes run before the search, none if empty
+        self.slice_query = slice_query  # Search the query's components of the KB, then check the rest apart
+        self._kb_encoder = None  # CNF of the KB alone, built on first use
+        self._trace_names = []  # Variable names of the last traced search
+        self._slice_encoders = {}  # frozenset of clause indices -> CNF of those clauses
+        self._rest_models = {}  # frozenset of clause indices -> model of those clauses alone, or None
+    
+    def _dpll_solve(self, clauses: List[List[int]], n_vars: int, names: List[str]): #  -> Optional[Dict[str, bool]]
+        """Core DPLL search with unit propagation, pure literals and a trail.
 
-    def _dpll_solve(self, clauses: List[List[Tuple[str, str]]], assignment: Dict[str, bool], symbols: Set[str], steps: List[str]): #  -> bool
-        """Core DPLL recursive algorithm."""
-        eval_result = self._eval_formula(clauses, assignment)
-        steps.append(f"Evaluating formula: {eval_result}")
-        if eval_result is True:
+        Each clause keeps counts of its true and false literals, updated as
+        literals are assigned and unassigned, so unit and conflicting clauses
+        are found from the occurrence lists of the literal just assigned. The
+        trail records assignments in order and each decision level remembers
+        where it starts on the trail, so backtracking just unwinds the trail.
+        Decisions pick the literal occurring in the most unsatisfied clauses
+        (DLIS), after fixing any pure literals. Those occurrence counts are
+        kept per literal and only change when a clause becomes satisfied or
+        unsatisfied, so a decision scans the variables rather than the clauses. Steps go to the trace as
+        (kind, literal) pairs and are only turned into text by render_steps();
+        their counts go to the stats, whose counters solve() starts at zero.
+
+        Returns:
+            A satisfying assignment of the assigned symbols, or None if unsatisfiable
+        """
+        self._trace_names = names
+        trace = self.trace
+        stats = self.stats
+        
+        def note(kind, lit=0):
+            counter = self.COUNTERS.get(kind)
+            if counter is not None:
+                stats[counter] += 1
+            trace.add(kind, lit)
+            if self.on_step is not None:
+                self.on_step({'type': 'step', 'step': self._render_step(kind, lit)})
+        
+        if any(not clause for clause in clauses):
+            note('empty')
+            return None
+        
+        occurrences = {}
+        for c, clause in enumerate(clauses):
+            for lit in clause:
+                occurrences.setdefault(lit, []).append(c)
+        true_count = [0] * len(clauses)
+        false_count = [0] * len(clauses)
+        sizes = [len(clause) for clause in clauses]
+        value = [0] * (n_vars + 1)  # 1 true, -1 false, 0 unassigned
+        # Unsatisfied clauses holding each literal, at index n_vars + literal
+        unsatisfied = [0] * (2 * n_vars + 1)
+        for clause in clauses:
+            for lit in clause:
+                unsatisfied[n_vars + lit] += 1
+        trail = []
+        levels = []  # (trail position, decision literal, whether its negation was tried)
+        units = [c for c in range(len(clauses)) if sizes[c] == 1]
+        
+        def assign(lit):
+            """Assign a literal; returns False if it falsifies a clause."""
+            value[abs(lit)] = 1 if lit > 0 else -1
+            trail.append(lit)
+            for c in occurrences.get(lit, ()):
+                true_count[c] += 1
+                if true_count[c] == 1:
+                    for other in clauses[c]:
+                        unsatisfied[n_vars + other] -= 1
+            ok = True
+            for c in occurrences.get(-lit, ()):
+                false_count[c] += 1
+                if true_count[c] == 0:
+                    if false_count[c] == sizes[c]:
+                        ok = False
+                    elif false_count[c] == sizes[c] - 1:
+                        units.append(c)
+            return ok
+        
+        def unassign_to(position):
+            while len(trail) > position:
+                lit = trail.pop()
+                value[abs(lit)] = 0
+                for c in occurrences.get(lit, ()):
+                    true_count[c] -= 1
+                    if true_count[c] == 0:
+                        for other in clauses[c]:
+                            unsatisfied[n_vars + other] += 1
+                for c in occurrences.get(-lit, ()):
+                    false_count[c] -= 1
+        
+        def propagate():
+            """Assign the remaining literal of every unit clause; returns False on conflict."""
+            while units:
+                c = units.pop()
+                if true_count[c]:
+                    continue
+                free = [lit for lit in clauses[c] if not value[abs(lit)]]
+                if not free:
+                    return False
+                if len(free) == 1:
+                    note('unit', free[0])
+                    if not assign(free[0]):
+                        return False
             return True
-        if eval_result is False:
-            return False
+        
+        budget = self._budget
+        ok = propagate()
+        while True:
+            if not ok:
+                stats['conflicts'] += 1
+                if budget is not None:
+                    budget.check(decisions=stats['decisions'], conflicts=stats['conflicts'], assigned=len(trail))
+                # Undo decisions until one still has an untried branch
+                units.clear()
+                while levels and levels[-1][2]:
+                    levels.pop()
+                if not levels:
+                    note('conflict')
+                    return None
+                position, lit, _ = levels.pop()
+                unassign_to(position)
+                note('backtrack', -lit)
+                levels.append((position, -lit, True))
+                ok = assign(-lit) and propagate()
+                continue
+            
+            # Over the unassigned variables: pure literals, and the literal in most unsatisfied clauses
+            pure = []
+            best = None
+            best_count = 0
+            for v in range(1, n_vars + 1):
+                if value[v]:
+                    continue
+                positive, negative = unsatisfied[n_vars + v], unsatisfied[n_vars - v]
+                if positive and not negative:
+                    pure.append(v)
+                elif negative and not positive:
+                    pure.append(-v)
+                # Ties go to the lower variable, then to its positive literal
+                if positive > best_count or negative > best_count:
+                    best, best_count = (v, positive) if positive >= negative else (-v, negative)
+            if best is None:
+                note('sat')
+                return {names[v - 1]: value[v] > 0 for v in range(1, n_vars + 1) if value[v]}
+            
+            if pure:
+                for lit in pure:
+                    note('pure', lit)
+                    assign(lit)
+                continue
+            
+            note('decide', best)
+            if budget is not None:
+                budget.check(decisions=stats['decisions'], conflicts=stats['conflicts'], assigned=len(trail))
+            levels.append((len(trail), best, False))
+            ok = assign(best) and propagate()
 
-        if not symbols:
+    def _render_step(self, kind: str, lit: int): # -> str
+        name = self._trace_names[abs(lit) - 1] if lit else None
+        return self.STEPS[kind].format(f"{name} = {lit > 0}")
+    
+    def render_steps(self): # -> List[str]
+        """
+        The last search's steps as text: every recorded step at the 'full'
+        trace level, one line of event counts at 'summary', none when off.
+        """
+        if self.trace.level == 'full':
+            steps = [self._render_step(kind, lit) for kind, lit in self.trace.records]
+            if self.trace.dropped:
+                steps.insert(0, f"... {self.trace.dropped} earlier steps not kept")
+            return steps
+        if self.trace.level == 'summary':
+            counts = self.trace.counts
+            return [f"{counts.get('decide', 0)} decisions, {counts.get('unit', 0)} unit propagations, "
+                    f"{counts.get('pure', 0)} pure literals, {counts.get('backtrack', 0)} backtracks",
+                    f"Evaluating formula: {'sat' in counts and 'inconsistent' not in counts}"]
+        return []
+    
+    def _horn_solve(self, cnf: CNFEncoder): # -> Union[Optional[Dict[str, bool]], bool]
+        """
+        Decide a Horn, dual-Horn or renamable Horn CNF by linear-time unit resolution.
+        
+        Returns the least model (under the renaming) of all variables, None if
+        the CNF is unsatisfiable, or False when it is not renamable Horn and
+        needs the full search.
+        """
+        n_vars = len(cnf.names)
+        renaming = _horn_renaming(cnf.clauses, n_vars)
+        if renaming is None:
             return False
+        self._trace_names = cnf.names
+        self.stats['horn_fast_path'] = 1
+        values = _horn_sat(cnf.clauses, n_vars, renaming)
+        self._announce('horn')
+        self._announce('conflict' if values is None else 'sat')
+        if values is None:
+            return None
+        return dict(zip(cnf.names, values[1:]))
+    
+    def _search(self, cnf: CNFEncoder): # -> Optional[Dict[str, bool]]
+        """
+        Preprocess the CNF with the configured passes, search it, and extend
+        a model found back over the variables preprocessing removed.
+        """
+        if not self.preprocess:
+            with self._phase('search'):
+                return self._dpll_solve(cnf.clauses, len(cnf.names), cnf.names)
+        preprocessor = _Preprocessor(self.preprocess, self._budget)
+        try:
+            with self._phase('preprocess'):
+                clauses = preprocessor.run(cnf.clauses)
+        finally:
+            for key, value in preprocessor.stats.items():
+                self.stats[key] += value
+        with self._phase('search'):
+            model = self._dpll_solve(clauses, len(cnf.names), cnf.names)
+        if model is None:
+            return None
+        index = {name: var for var, name in enumerate(cnf.names, 1)}
+        values = preprocessor.extend({index[name]: value for name, value in model.items()})
+        return {cnf.names[var - 1]: values[var] for var in sorted(values)}
+    
+    def _announce(self, kind: str):
+        """Record a step that names no literal, and pass it to the listener."""
+        self.trace.add(kind, 0)
+        if self.on_step is not None:
+            self.on_step({'type': 'step', 'step': self._render_step(kind, 0)})
+    
+    def kb_model(self): # -> Optional[Dict[str, bool]]
+        """A model of the KB alone over its symbols, or None if it has none."""
+        self._reset_stats(*self.SEARCH_STATS)
+        self.trace.clear()
+        cnf = self._kb_cnf()
+        model = self._horn_solve(cnf) if self.horn_fast_path else False
+        if model is False:
+            model = self._search(cnf)
+        if model is None:
+            return None
+        return {name: value for name, value in model.items() if not cnf.is_aux(name)}
+    
+    def kb_satisfiable(self): # -> bool
+        """Whether the KB alone has a model."""
+        return self.kb_model() is not None
+    
+    def _kb_cnf(self, kept: Optional[List[int]] = None): # -> CNFEncoder
+        """Encode the KB (or only its clauses listed in `kept`) as CNF on first use and keep it for later queries.
 
-        var = next(iter(symbols))
-        remaining_symbols = symbols - {var}
-
-        assignment_true = assignment.copy()
-        assignment_true[var] = True
-        steps.append(f"Trying {var} = True")
-        if self._dpll_solve(clauses, assignment_true, remaining_symbols, steps):
-            assignment.update(assignment_true)
-            return True
-
-        assignment_false = assignment.copy()
-        assignment_false[var] = False
-        steps.append(f"Trying {var} = False")
-        if self._dpll_solve(clauses, assignment_false, remaining_symbols, steps):
-            assignment.update(assignment_false)
-            return True
+        KB symbols are declared first in sorted order, so the KB's auxiliary
+        variables number after them.
+        """
+        if kept is not None:
+            key = frozenset(kept)
+            if key not in self._slice_encoders:
+                formulas = [self.kb.formulas[c] for c in kept]
+                encoder = CNFEncoder(sorted(set().union(*(formula.symbols() for formula in formulas))))
+                for formula in formulas:
+                    encoder.add(formula)
+                self._slice_encoders[key] = encoder
+            return self._slice_encoders[key]
+        if self._kb_encoder is None:
+            self._kb_encoder = CNFEncoder(self.kb.symbol_names)
+            for formula in self.kb.formulas:
+                self._kb_encoder.add(formula)
+        return self._kb_encoder
 
-        return False
+    def _refutation_cnf(self, query: str, kept: Optional[List[int]] = None): # -> CNFEncoder
+        """Encode KB & ~query (with only the `kept` KB clauses, if given), whose unsatisfiability means entailment, as CNF."""
+        encoder = self._kb_cnf(kept).copy()
+        encoder.add(parse_formula(query), positive=False)
+        return encoder
+    
+    def _slice(self, query: str): # -> Tuple[Optional[List[int]], List[int]]
+        """
+        Split the KB clauses into the components holding query symbols and the
+        rest; (None, []) when the query's components are the whole KB.
+        """
+        kept = self.kb.connected_clauses(parse_formula(query).symbols())
+        if len(kept) == len(self.kb.formulas):
+            return None, []
+        kept_set = set(kept)
+        return kept, [c for c in range(len(self.kb.formulas)) if c not in kept_set]
+    
+    def _rest_model(self, rest: List[int]): # -> Optional[Dict[str, bool]]
+        """A model of the given KB clauses alone, or None if they are inconsistent; kept for later queries."""
+        key = frozenset(rest)
+        if key not in self._rest_models:
+            engine = DPLL([self.kb.clauses[c] for c in rest], self.horn_fast_path, self.preprocess,
+                          slice_query=False, trace_level='off')
+            engine._budget = self._budget
+            self._rest_models[key] = engine.kb_model()
+        return self._rest_models[key]
 
+    @_budgeted
     def solve(self, query: str): #  -> Tuple[bool, Dict[str, Union[bool, List[str]]]]
         """
         Solve using DPLL algorithm.
@@ -558,27 +2363,940 @@ class DPLL(InferenceEngine):
         Returns:
             Tuple of (whether query is entailed, assignments with steps)
         """
-        kb_clauses = []
-        for clause in self.kb.clauses:
-            kb_clauses.extend(self._parse_cnf_clauses(clause))
+        self._reset_stats(*self.SEARCH_STATS, 'sliced_clauses')
+        with self._phase('cnf'):
+            kept, rest = self._slice(query) if self.slice_query else (None, [])
+            cnf = self._refutation_cnf(query, kept)
+        self.stats['sliced_clauses'] = len(rest)
 
-        query_clauses = self._parse_cnf_clauses(query)
-        negated_query = []
-        for clause in query_clauses:
-            negated = [('+' if sign == '-' else '-', lit) for sign, lit in clause]
-            negated_query.append(negated)
+        self.trace.clear()
+        model = False
+        if self.horn_fast_path:
+            with self._phase('search'):
+                model = self._horn_solve(cnf)
+        if model is False:
+            model = self._search(cnf)
+        if model is not None and rest:
+            # KB & ~query has a model only if the clauses left out have one too
+            with self._phase('search'):
+                rest_model = self._rest_model(rest)
+            if rest_model is None:
+                self._announce('inconsistent')
+                model = None
+            else:
+                model = {**model, **rest_model}
+        # Report the KB and query symbols only, not the auxiliary variables
+        assignment = {name: value for name, value in (model or {}).items() if not cnf.is_aux(name)}
+        assignment['steps'] = self.render_steps()
 
-        all_clauses = kb_clauses + negated_query
+        return (model is None, assignment)
 
-        symbols = set()
-        for clause in all_clauses:
-            for _, var in clause:
-                symbols.add(var)
 
-        assignment = {}
-        steps = []
-        is_sat = self._dpll_solve(all_clauses, assignment, symbols, steps)
-        assignment['steps'] = steps
+def _luby(index: int): # -> int
+    """Return the index-th term (from 0) of the Luby restart sequence 1, 1, 2, 1, 1, 2, 4, ..."""
+    size, exponent = 1, 0
+    while size < index + 1:
+        exponent += 1
+        size = 2 * size + 1
+    while size - 1 != index:
+        size = (size - 1) >> 1
+        exponent -= 1
+        index %= size
+    return 1 << exponent
+
+
+class _CDCLSearch:
+    """Conflict-driven clause learning search state.
 
+    Variables are numbered from 1 and a literal is coded as 2 * var + sign
+    (sign 1 for negated), so `code ^ 1` is its negation and per-literal data
+    lives in flat lists. Clauses are lists of codes whose first two entries
+    are the watched literals; the literal a clause implies is kept first.
+    """
+    VAR_DECAY = 0.95
+    CLAUSE_DECAY = 0.999
+    RESTART_INTERVAL = 100
+    
+    def __init__(self):
+        self.n_vars = 0
+        self.lit_value = [0, 0]  # Per literal code: 1 true, -1 false, 0 unassigned
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.phase = [1]  # Saved sign bit per variable, initially negative
+        self.seen = [False]
+        self.watches = [[], []]
+        self.clauses = []
+        self.learnts = []
+        self.learnt_info = {}  # id(clause) -> [lbd, activity]
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.assumptions = []  # Literal codes decided first in the current solve
+        self.heap = []  # (-activity, var), stale entries are skipped lazily
+        self.var_inc = 1.0
+        self.cla_inc = 1.0
+        self.max_learnts = None
+        self.on_restart = None  # Optional callable receiving the stats at each restart
+        self.budget = None  # Optional started Budget, checked before each decision
+        self.ok = True
+        self.model = None
+        self.stats = {
+            'decisions': 0,
+            'propagations': 0,
+            'conflicts': 0,
+            'learned': 0,
+            'deleted': 0,
+            'restarts': 0,
+        }
+    
+    def new_var(self): # -> int
+        """Add a variable and return its number."""
+        self.n_vars += 1
+        self.lit_value += [0, 0]
+        self.level.append(0)
+        self.reason.append(None)
+        self.activity.append(0.0)
+        self.phase.append(1)
+        self.seen.append(False)
+        self.watches += [[], []]
+        heapq.heappush(self.heap, (0.0, self.n_vars))
+        return self.n_vars
+    
+    def add_clause(self, literals: List[int]): # -> bool
+        """Add a clause of signed integer literals at the top level; returns False once unsatisfiable."""
+        if not self.ok:
+            return False
+        codes = set()
+        for lit in literals:
+            while abs(lit) > self.n_vars:
+                self.new_var()
+            code = 2 * abs(lit) + (lit < 0)
+            if code ^ 1 in codes or self.lit_value[code] == 1:
+                return True  # Tautology, or already satisfied at the top level
+            if self.lit_value[code] == 0:
+                codes.add(code)
+        clause = sorted(codes)
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self._enqueue(clause[0], None)
+            self.ok = self._propagate() is None
+        else:
+            self.clauses.append(clause)
+            self.watches[clause[0]].append(clause)
+            self.watches[clause[1]].append(clause)
+        return self.ok
+    
+    def _enqueue(self, code: int, reason: Optional[List[int]]):
+        var = code >> 1
+        self.lit_value[code] = 1
+        self.lit_value[code ^ 1] = -1
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(code)
+    
+    def _propagate(self): # -> Optional[List[int]]
+        """Propagate all enqueued literals through the watch lists; returns a conflicting clause if any."""
+        lit_value = self.lit_value
+        watches = self.watches
+        trail = self.trail
+        while self.qhead < len(trail):
+            false_lit = trail[self.qhead] ^ 1
+            self.qhead += 1
+            self.stats['propagations'] += 1
+            watchers = watches[false_lit]
+            watches[false_lit] = kept = []
+            i = 0
+            while i < len(watchers):
+                clause = watchers[i]
+                i += 1
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                if lit_value[first] == 1:
+                    kept.append(clause)
+                    continue
+                # Look for a replacement watch that is not false
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    if lit_value[lit] != -1:
+                        clause[1] = lit
+                        clause[k] = false_lit
+                        watches[lit].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if lit_value[first] == -1:
+                        kept.extend(watchers[i:])
+                        self.qhead = len(trail)
+                        return clause
+                    self._enqueue(first, clause)
+        return None
+    
+    def _bump_var(self, var: int):
+        self.activity[var] += self.var_inc
+        if self.activity[var] > 1e100:
+            # Rescale every activity and rebuild the heap with the new keys
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.var_inc *= 1e-100
+            self.heap = [(-self.activity[v], v) for v in range(1, self.n_vars + 1) if self.lit_value[2 * v] == 0]
+            heapq.heapify(self.heap)
+        elif self.lit_value[2 * var] == 0:
+            heapq.heappush(self.heap, (-self.activity[var], var))
+    
+    def _bump_clause(self, clause: List[int]):
+        info = self.learnt_info.get(id(clause))
+        if info is None:
+            return
+        info[1] += self.cla_inc
+        if info[1] > 1e20:
+            for other in self.learnt_info.values():
+                other[1] *= 1e-20
+            self.cla_inc *= 1e-20
+    
+    def _analyze(self, conflict: List[int]): # -> Tuple[List[int], int]
+        """Derive the first-UIP learned clause of a conflict and the level to backjump to."""
+        seen = self.seen
+        level = self.level
+        trail = self.trail
+        current = len(self.trail_lim)
+        learnt = [None]
+        marked = []
+        counter = 0
+        code = None
+        index = len(trail) - 1
+        clause = conflict
+        while True:
+            self._bump_clause(clause)
+            for lit in (clause if code is None else clause[1:]):
+                var = lit >> 1
+                if not seen[var] and level[var] > 0:
+                    seen[var] = True
+                    marked.append(var)
+                    self._bump_var(var)
+                    if level[var] >= current:
+                        counter += 1
+                    else:
+                        learnt.append(lit)
+            # Walk back along the trail to the next marked literal of this level
+            while not seen[trail[index] >> 1]:
+                index -= 1
+            code = trail[index]
+            index -= 1
+            seen[code >> 1] = False
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.reason[code >> 1]
+        learnt[0] = code ^ 1
+        for var in marked:
+            seen[var] = False
+        
+        if len(learnt) == 1:
+            return learnt, 0
+        # Watch the literal from the highest remaining level second, so it is the next to become unassigned
+        deepest = max(range(1, len(learnt)), key=lambda k: level[learnt[k] >> 1])
+        learnt[1], learnt[deepest] = learnt[deepest], learnt[1]
+        return learnt, level[learnt[1] >> 1]
+    
+    def _cancel_until(self, target: int):
+        """Backjump to a decision level, unassigning the trail above it and saving phases."""
+        if len(self.trail_lim) <= target:
+            return
+        start = self.trail_lim[target]
+        for code in self.trail[start:]:
+            var = code >> 1
+            self.lit_value[code] = 0
+            self.lit_value[code ^ 1] = 0
+            self.reason[var] = None
+            self.phase[var] = code & 1
+            heapq.heappush(self.heap, (-self.activity[var], var))
+        del self.trail[start:]
+        del self.trail_lim[target:]
+        self.qhead = len(self.trail)
+        if len(self.heap) > 4 * self.n_vars + 64:
+            # Drop the stale entries that accumulate from lazy updates
+            self.heap = [(-self.activity[v], v) for v in range(1, self.n_vars + 1) if self.lit_value[2 * v] == 0]
+            heapq.heapify(self.heap)
+    
+    def _pick_branch_var(self): # -> Optional[int]
+        """Pop the unassigned variable with the highest VSIDS activity."""
+        while self.heap:
+            negative_activity, var = heapq.heappop(self.heap)
+            if self.lit_value[2 * var] == 0 and -negative_activity == self.activity[var]:
+                return var
+        return None
+    
+    def _locked(self, clause: List[int]): # -> bool
+        return self.reason[clause[0] >> 1] is clause and self.lit_value[clause[0]] == 1
+    
+    def _reduce_db(self):
+        """Delete the less useful half of the learned clauses (high LBD, low activity)."""
+        info = self.learnt_info
+        ranked = sorted(self.learnts, key=lambda c: (info[id(c)][0], -info[id(c)][1]))
+        keep = ranked[:len(ranked) // 2]
+        for clause in ranked[len(ranked) // 2:]:
+            if len(clause) <= 2 or info[id(clause)][0] <= 2 or self._locked(clause):
+                keep.append(clause)
+            else:
+                del info[id(clause)]
+                self.stats['deleted'] += 1
+        self.learnts = keep
+        self._rebuild_watches()
+    
+    def _rebuild_watches(self):
+        """Rebuild the watch lists from the surviving clauses' two watched literals."""
+        self.watches = [[] for _ in range(2 * self.n_vars + 2)]
+        for clause in self.clauses + self.learnts:
+            self.watches[clause[0]].append(clause)
+            self.watches[clause[1]].append(clause)
+    
+    def retire(self, activation: int, variables: List[int] = ()):
+        """
+        Fix an activation literal false at the top level, switching off for good
+        the clauses it guards and every clause learned from them, which all hold
+        its negation too. `variables` appear in no other clause, so they are
+        fixed as well and later searches do not branch on them. Call between solves.
+        """
+        if not self.add_clause([-activation]):
+            return  # Unsatisfiable whatever the query
+        for var in variables:
+            if self.lit_value[2 * var] == 0:
+                self._enqueue(2 * var + 1, None)
+    
+    def simplify(self):
+        """Delete the clauses satisfied at the top level, learned ones included; call between solves."""
+        lit_value = self.lit_value
+        for code in self.trail:
+            self.reason[code >> 1] = None  # Top-level reasons are never analysed
+        self.clauses = [clause for clause in self.clauses if not any(lit_value[code] == 1 for code in clause)]
+        learnts = []
+        for clause in self.learnts:
+            if any(lit_value[code] == 1 for code in clause):
+                del self.learnt_info[id(clause)]
+            else:
+                learnts.append(clause)
+        self.learnts = learnts
+        self._rebuild_watches()
+    
+    def _search(self, conflict_budget: int): # -> Optional[bool]
+        """Search until satisfiable, unsatisfiable, or the conflict budget for this restart runs out."""
+        conflicts = 0
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.stats['conflicts'] += 1
+                conflicts += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learnt, backjump = self._analyze(conflict)
+                self._cancel_until(backjump)
+                if len(learnt) == 1:
+                    self._enqueue(learnt[0], None)
+                else:
+                    self.learnts.append(learnt)
+                    self.learnt_info[id(learnt)] = [len({self.level[lit >> 1] for lit in learnt}), self.cla_inc]
+                    self.watches[learnt[0]].append(learnt)
+                    self.watches[learnt[1]].append(learnt)
+                    self._enqueue(learnt[0], learnt)
+                self.stats['learned'] += 1
+                self.var_inc /= self.VAR_DECAY
+                self.cla_inc /= self.CLAUSE_DECAY
+                continue
+            
+            if conflicts >= conflict_budget:
+                self._cancel_until(0)
+                return None
+            if len(self.learnts) - len(self.trail) >= self.max_learnts:
+                self._reduce_db()
+                self.max_learnts *= 1.1
+            
+            # Assumptions are decided first, one per decision level
+            decision = None
+            while len(self.trail_lim) < len(self.assumptions):
+                code = self.assumptions[len(self.trail_lim)]
+                if self.lit_value[code] == -1:
+                    return False  # Unsatisfiable under the assumptions only
+                if self.lit_value[code] == 0:
+                    decision = code
+                    break
+                self.trail_lim.append(len(self.trail))  # Already true: an empty level keeps levels aligned
+            if decision is None:
+                var = self._pick_branch_var()
+                if var is None:
+                    self.model = [self.lit_value[2 * v] == 1 for v in range(self.n_vars + 1)]
+                    return True
+                decision = 2 * var + self.phase[var]
+            if self.budget is not None:
+                self.budget.check(decisions=self.stats['decisions'], conflicts=self.stats['conflicts'],
+                                  learned_clauses=len(self.learnts))
+            self.stats['decisions'] += 1
+            self.trail_lim.append(len(self.trail))
+            self._enqueue(decision, None)
+    
+    def solve(self, assumptions: List[int] = ()): # -> bool
+        """Decide satisfiability of the clauses added so far, with Luby restarts.
+
+        Assumptions are signed integer literals that hold for this call only;
+        clauses learned under them stay valid for later calls.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        for lit in assumptions:
+            while abs(lit) > self.n_vars:
+                self.new_var()
+        self.assumptions = [2 * abs(lit) + (lit < 0) for lit in assumptions]
+        if self.max_learnts is None:
+            self.max_learnts = max(len(self.clauses) / 3, 1000)
+        restarts = 0
+        while True:
+            try:
+                status = self._search(_luby(restarts) * self.RESTART_INTERVAL)
+            except BudgetExceeded:
+                self._cancel_until(0)  # Learned clauses stay valid for a later call
+                raise
+            if status is not None:
+                self._cancel_until(0)
+                return status
+            restarts += 1
+            self.stats['restarts'] += 1
+            if self.on_restart is not None:
+                self.on_restart(dict(self.stats))
+
+
+class CDCL(DPLL):
+    """Conflict-driven clause learning (CDCL) solver for large CNFs.
+
+    Uses two watched literals, first-UIP learning with non-chronological
+    backjumping, VSIDS branching, Luby restarts and learned-clause deletion.
+    For many queries against one KB, entails() keeps the KB's CNF and the
+    clauses learned so far between calls.
+    """
+    
+    # DPLL options that do not apply: CDCL takes no Horn fast path and neither preprocesses nor slices
+    DPLL_OPTIONS = ('horn_fast_path', 'preprocess', 'slice_query')
+    SEARCH_STATS = ('decisions', 'propagations', 'conflicts', 'learned', 'deleted', 'restarts')
+    
+    def __init__(self, clauses: List[str], **trace_options):
+        unsupported = sorted(set(trace_options) & set(self.DPLL_OPTIONS))
+        if unsupported:
+            raise ValueError(f"CDCL does not support the options {unsupported}")
+        super().__init__(clauses, horn_fast_path=False, preprocess=(), slice_query=False, **trace_options)
+        self._cnf = None
+        self._incremental = None  # Search holding the loaded KB for entails(), built by load()
+        self._retired_clauses = 0  # Clauses of answered queries still in the incremental search
+    
+    def _new_search(self, cnf: CNFEncoder): # -> _CDCLSearch
+        """A CDCL search over the clauses of a CNF, checking the budget of the solve in progress."""
+        search = _CDCLSearch()
+        for _ in cnf.names:
+            search.new_var()
+        for clause in cnf.clauses:
+            search.add_clause(clause)
+        search.budget = self._budget
+        return search
+    
+    def _search(self, cnf: CNFEncoder): # -> Optional[Dict[str, bool]]
+        """Decide a CNF (for kb_model) by CDCL; a model of all its variables, or None if unsatisfiable."""
+        with self._phase('search'):
+            search = self._new_search(cnf)
+            try:
+                is_sat = search.solve()
+            finally:
+                self.stats.update(search.stats)
+        if not is_sat:
+            return None
+        return {name: search.model[k + 1] for k, name in enumerate(cnf.names)}
+    
+    def load(self, clauses: Optional[List[str]] = None):
+        """Encode the KB once for incremental entails() calls, replacing the KB if clauses are given."""
+        if clauses is not None:
+            self.kb = KnowledgeBase(clauses)
+            self._kb_encoder = None
+        self._cnf = self._kb_cnf().copy()
+        self._incremental = self._new_search(self._cnf)
+        self._retired_clauses = 0
+    
+    def entails(self, query: str): # -> bool
+        """
+        Decide entailment of one query against the loaded KB.
+        
+        The clauses of ~query are guarded by a fresh activation literal and
+        the search runs under the assumption that it is true, so nothing is
+        re-encoded and learned clauses carry over. Afterwards the activation
+        literal is fixed false, which switches this query's clauses off for good,
+        and once such clauses make up half the search's clauses they are deleted.
+        The stats are the search's counters for this query alone.
+        """
+        self._reset_stats()
+        if self._incremental is None:
+            with self._phase('cnf'):
+                self.load()
+        cnf, search = self._cnf, self._incremental
+        before = dict(search.stats)
+        first = len(cnf.clauses)
+        definitions = len(cnf._definitions)
+        auxiliaries = len(cnf.names) + 1
+        cnf.add(parse_formula(query), positive=False)
+        activation = cnf.aux()
+        for clause in cnf.clauses[first:]:
+            search.add_clause(clause + [-activation])
+        self._retired_clauses += len(cnf.clauses) - first
+        # Keep only the KB in the encoder; the guarded copies live in the search
+        del cnf.clauses[first:]
+        cnf.forget_definitions(definitions)
+        
+        with self._phase('search'):
+            is_sat = search.solve([activation])
+            # The query's auxiliary variables (unlike its symbols) are never used again
+            search.retire(activation, [var for var in range(auxiliaries, activation)
+                                       if cnf.is_aux(cnf.names[var - 1])])
+            if 2 * self._retired_clauses >= len(search.clauses):
+                search.simplify()
+                self._retired_clauses = 0
+        self.stats.update((key, value - before[key]) for key, value in search.stats.items())
+        return not is_sat
+    
+    @_budgeted
+    def solve(self, query: str): #  -> Tuple[bool, Dict[str, Union[bool, List[str], Dict[str, int]]]]
+        """
+        Solve by refuting KB & ~query with CDCL.
+        Args:
+            query: The query to prove
+        Returns:
+            Tuple of (whether query is entailed, assignment with search statistics and a summary step)
+        """
+        self._reset_stats()
+        with self._phase('cnf'):
+            cnf = self._refutation_cnf(query)
+        
+        with self._phase('search'):
+            search = self._new_search(cnf)
+            if self.on_step is not None:
+                search.on_restart = lambda stats: self._emit(dict(stats, type='progress'))
+            try:
+                is_sat = search.solve()
+            finally:
+                self.stats.update(search.stats)
+        
+        assignment = {}
+        if is_sat:
+            assignment = {name: search.model[k + 1] for k, name in enumerate(cnf.names) if not cnf.is_aux(name)}
+        stats = dict(search.stats)
+        assignment['stats'] = stats
+        # The search is too long to trace step by step, so every level above 'off' gets this summary
+        assignment['steps'] = [] if self.trace.level == 'off' else [
+            f"{len(cnf.names)} variables, {len(cnf.clauses)} clauses",
+            f"{stats['decisions']} decisions, {stats['propagations']} propagations, {stats['conflicts']} conflicts",
+            f"{stats['learned']} clauses learned, {stats['deleted']} deleted, {stats['restarts']} restarts",
+            f"Evaluating formula: {is_sat}",
+        ]
+        for step in assignment['steps']:
+            self._emit({'type': 'step', 'step': step})
+        
         return (not is_sat, assignment)
 
+
+class _NodeLimitExceeded(Exception):
+    """Raised inside BDD when building a diagram would pass its node limit."""
+
+
+class BDD(InferenceEngine):
+    """
+    Knowledge compilation of the KB to a reduced ordered binary decision diagram.
+    
+    The KB is compiled once. Nodes are hash-consed in a unique table, so
+    equivalent functions are the same node. Conjunction, disjunction and
+    biconditional go through one memoized, iterative apply. Variables are
+    ordered statically: the symbol occurring most often comes first, then
+    greedily the symbol most connected (by clause co-occurrence) to those
+    already placed.
+    
+    A query costs one apply: the KB entails q exactly when KB & q is the KB's
+    own node. Model counts are one linear pass over the diagram.
+    
+    If compiling the KB, or a query, would create more than `node_limit`
+    nodes, the answer comes from DPLL instead, and no model count is given.
+    """
+    DEFAULT_NODE_LIMIT = 1 << 18
+    FINAL_STATS = ('nodes',)
+    FALSE, TRUE = 0, 1
+    # Apply operators
+    AND, OR, IFF = 0, 1, 2
+    
+    def __init__(self, clauses: List[str], node_limit: int = DEFAULT_NODE_LIMIT, **trace_options):
+        super().__init__(clauses, **trace_options)
+        if node_limit < 2:
+            raise ValueError("Node limit must allow at least the two terminal nodes")
+        self.node_limit = node_limit
+        self._reset_diagram()
+        self.kb_root = None
+        self._kb_nodes = None  # Node count once the KB is compiled
+        self._fallback = None  # DPLL used when the diagram would pass the node limit
+        self._kb_satisfiable = None
+    
+    # ----- Diagram construction -----
+    
+    def _reset_diagram(self):
+        """Start from an empty diagram holding only the two terminals."""
+        # Node k tests variable level[k], with children low[k] (false) and high[k] (true)
+        n_levels = 1 << 62  # Terminals sit below every variable
+        self.level = [n_levels, n_levels]
+        self.low = [0, 1]
+        self.high = [0, 1]
+        self.unique = {}  # (level, low, high) -> node
+        self.apply_cache = {}
+        self.levels = {}  # symbol -> level
+    
+    def _make(self, level: int, low: int, high: int): # -> int
+        """Return the node testing `level` with these children, creating it only if new."""
+        if low == high:
+            return low
+        key = (level, low, high)
+        node = self.unique.get(key)
+        if node is None:
+            if len(self.level) >= self.node_limit:
+                raise _NodeLimitExceeded()
+            node = len(self.level)
+            if self._budget is not None and not node & self.BUDGET_CHECK_INTERVAL:
+                self._budget.check(nodes=node)
+            self.level.append(level)
+            self.low.append(low)
+            self.high.append(high)
+            self.unique[key] = node
+        return node
+    
+    def _terminal_case(self, op: int, u: int, v: int): # -> Optional[int]
+        """The result of an apply decided without recursion, or None."""
+        if op == self.AND:
+            if u == 0 or v == 0:
+                return 0
+            if u == 1 or u == v:
+                return v
+            if v == 1:
+                return u
+        elif op == self.OR:
+            if u == 1 or v == 1:
+                return 1
+            if u == 0 or u == v:
+                return v
+            if v == 0:
+                return u
+        else:
+            if u == v:
+                return 1
+            if u < 2 and v < 2:
+                return 0
+            if u == 1:
+                return v
+            if v == 1:
+                return u
+        return None
+    
+    def _apply(self, op: int, u: int, v: int): # -> int
+        """Combine two diagrams with a binary operator, iteratively and memoized."""
+        cache = self.apply_cache
+        level, low, high = self.level, self.low, self.high
+        stack = [(u, v)]
+        while stack:
+            a, b = stack[-1]
+            if b < a:
+                a, b = b, a  # Every operator is commutative
+            key = (op, a, b)
+            if key in cache:
+                stack.pop()
+                continue
+            result = self._terminal_case(op, a, b)
+            if result is not None:
+                cache[key] = result
+                stack.pop()
+                continue
+            top = min(level[a], level[b])
+            a0, a1 = (low[a], high[a]) if level[a] == top else (a, a)
+            b0, b1 = (low[b], high[b]) if level[b] == top else (b, b)
+            key0 = (op,) + ((a0, b0) if a0 <= b0 else (b0, a0))
+            key1 = (op,) + ((a1, b1) if a1 <= b1 else (b1, a1))
+            pending = [pair for pair, child_key in (((a0, b0), key0), ((a1, b1), key1)) if child_key not in cache]
+            if pending:
+                stack.extend(pending)
+                continue
+            cache[key] = self._make(top, cache[key0], cache[key1])
+            stack.pop()
+        return cache[(op,) + ((u, v) if u <= v else (v, u))]
+    
+    def _collect(self, roots: List[int]): # -> List[int]
+        """
+        Garbage-collect: keep only the nodes reachable from the roots, renumbered
+        in creation order (so children still come before parents), and return
+        the roots' new numbers. The apply memo refers to old numbers and is cleared.
+        """
+        level, low, high = self.level, self.low, self.high
+        live = [False] * len(level)
+        live[0] = live[1] = True
+        stack = list(roots)
+        while stack:
+            node = stack.pop()
+            if not live[node]:
+                live[node] = True
+                stack.append(low[node])
+                stack.append(high[node])
+        renumber = [0, 1]
+        new_level, new_low, new_high = level[:2], [0, 1], [0, 1]
+        self.unique = {}
+        for node in range(2, len(level)):
+            if live[node]:
+                renumber.append(len(new_level))
+                key = (level[node], renumber[low[node]], renumber[high[node]])
+                new_level.append(key[0])
+                new_low.append(key[1])
+                new_high.append(key[2])
+                self.unique[key] = renumber[-1]
+            else:
+                renumber.append(None)
+        self.level, self.low, self.high = new_level, new_low, new_high
+        self.apply_cache.clear()
+        return [renumber[root] for root in roots]
+    
+    def _negate(self, u: int): # -> int
+        return self._apply(self.IFF, u, self.FALSE)
+    
+    def _variable(self, symbol: str): # -> int
+        """The diagram of a symbol, placing symbols not seen before below all others."""
+        if symbol not in self.levels:
+            self.levels[symbol] = len(self.levels)
+        return self._make(self.levels[symbol], self.FALSE, self.TRUE)
+    
+    def _build(self, formula: Formula): # -> int
+        """Build the diagram of a formula bottom-up."""
+        connective = formula.connective
+        if connective is None:
+            return self._variable(formula.symbol)
+        args = [self._build(arg) for arg in formula.args]
+        if connective is LogicalConnective.NEGATION:
+            return self._negate(args[0])
+        if connective is LogicalConnective.IMPLICATION:
+            return self._apply(self.OR, self._negate(args[0]), args[1])
+        if connective is LogicalConnective.BICONDITIONAL:
+            return self._apply(self.IFF, args[0], args[1])
+        op = self.AND if connective is LogicalConnective.CONJUNCTION else self.OR
+        result = args[0]
+        for arg in args[1:]:
+            result = self._apply(op, result, arg)
+        return result
+    
+    def _order_symbols(self): # -> List[str]
+        """
+        Static variable order from clause co-occurrence.
+        
+        Two symbols gain 1 / (k - 1) for every clause of k symbols they share.
+        The order starts from the symbol in the most clauses and then always
+        takes the symbol most connected to the ones already placed (ties by
+        occurrence count, then name), restarting the same way for each
+        disconnected group.
+        """
+        kb = self.kb
+        clause_symbols = [sorted(formula.symbols()) for formula in kb.formulas]
+        weights = {}
+        for symbols in clause_symbols:
+            if len(symbols) > 1:
+                share = 1 / (len(symbols) - 1)
+                for a in symbols:
+                    row = weights.setdefault(a, {})
+                    for b in symbols:
+                        if a != b:
+                            row[b] = row.get(b, 0) + share
+        frequency = {name: len(kb.occurrences[kb.symbol_ids[name]]) for name in kb.symbol_names}
+        by_frequency = sorted(kb.symbol_names, key=lambda name: (-frequency[name], name))
+        
+        order = []
+        placed = set()
+        score = {}
+        heap = []
+        for start in by_frequency:
+            if start in placed:
+                continue
+            heapq.heappush(heap, (0, -frequency[start], start))
+            while heap:
+                _, _, symbol = heapq.heappop(heap)
+                if symbol in placed:
+                    continue
+                placed.add(symbol)
+                order.append(symbol)
+                for neighbour, weight in weights.get(symbol, {}).items():
+                    if neighbour not in placed:
+                        score[neighbour] = score.get(neighbour, 0) + weight
+                        heapq.heappush(heap, (-score[neighbour], -frequency[neighbour], neighbour))
+        return order
+    
+    def _deepest_level(self, root: int): # -> int
+        """The deepest variable level a diagram tests (-1 for a constant)."""
+        deepest = -1
+        seen = set()
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node < 2 or node in seen:
+                continue
+            seen.add(node)
+            deepest = max(deepest, self.level[node])
+            stack.append(self.low[node])
+            stack.append(self.high[node])
+        return deepest
+    
+    def _restrict(self, root: int, units: Dict[int, bool]): # -> int
+        """The diagram with the variables at the given levels fixed to the given values."""
+        level, low, high = self.level, self.low, self.high
+        done = {0: 0, 1: 1}
+        stack = [root]
+        while stack:
+            node = stack[-1]
+            if node in done:
+                stack.pop()
+                continue
+            value = units.get(level[node])
+            children = (low[node], high[node]) if value is None else ((high if value else low)[node],)
+            pending = [child for child in children if child not in done]
+            if pending:
+                stack.extend(pending)
+                continue
+            done[node] = done[children[0]] if value is not None else self._make(level[node], done[children[0]], done[children[1]])
+            stack.pop()
+        return done[root]
+    
+    def _conjoin(self, roots: List[int]): # -> int
+        """
+        Conjoin the clauses' diagrams one at a time, ordered by the deepest
+        variable each tests (then shallowest top first), so clauses over the
+        first variables in the order are combined before the ones that reach
+        further down and intermediate diagrams stay close to the final one.
+        
+        Variables the conjunction so far forces at its top are peeled off into
+        a set of units and fixed in every later clause, so chains of implied
+        facts never have to be rebuilt; they are conjoined back at the end.
+        Garbage is collected whenever half the node limit is in use, so only
+        live nodes count against it.
+        """
+        roots = sorted(roots, key=lambda root: (self._deepest_level(root), -self.level[root] if root > 1 else 0))
+        units = {}  # level -> value forced by the clauses conjoined so far
+        result = self.TRUE
+        for k, root in enumerate(roots):
+            result = self._apply(self.AND, result, self._restrict(root, units) if units else root)
+            while result > 1 and self.FALSE in (self.low[result], self.high[result]):
+                forced_true = self.low[result] == self.FALSE
+                units[self.level[result]] = forced_true
+                result = self.high[result] if forced_true else self.low[result]
+            if len(self.level) > self.node_limit // 2:
+                live = self._collect([result] + roots[k + 1:])
+                result, roots[k + 1:] = live[0], live[1:]
+        for level in sorted(units, reverse=True):
+            literal = self._make(level, self.FALSE, self.TRUE) if units[level] else self._make(level, self.TRUE, self.FALSE)
+            result = self._apply(self.AND, result, literal)
+        return result
+    
+    def compile(self): # -> Optional[int]
+        """
+        Compile the KB on first use. Returns its root, or None when the node
+        limit was reached and DPLL answers instead.
+        """
+        if self.kb_root is None and self._fallback is None:
+            with self._phase('compile'):
+                for symbol in self._order_symbols():
+                    self.levels[symbol] = len(self.levels)
+                try:
+                    self.kb_root = self._conjoin([self._build(formula) for formula in self.kb.formulas])
+                    self.kb_root, = self._collect([self.kb_root])
+                    self._kb_nodes = len(self.level)
+                except _NodeLimitExceeded:
+                    self._fallback = DPLL(self.kb.clauses, trace_level='off')
+                except BudgetExceeded:
+                    # Leave nothing half-compiled: the next solve starts over
+                    self._reset_diagram()
+                    raise
+                self.apply_cache.clear()
+        return self.kb_root
+    
+    def _rollback(self):
+        """Drop the nodes and memo entries made for a query, keeping the compiled KB."""
+        for node in range(self._kb_nodes, len(self.level)):
+            del self.unique[(self.level[node], self.low[node], self.high[node])]
+        del self.level[self._kb_nodes:], self.low[self._kb_nodes:], self.high[self._kb_nodes:]
+        self.apply_cache.clear()
+    
+    def count_models(self, root: int, n_symbols: int): # -> int
+        """
+        Count the models of a diagram over `n_symbols` symbols, which must
+        include every symbol it depends on, in one pass over its nodes.
+        """
+        level, low, high = self.level, self.low, self.high
+        n_levels = len(self.levels)
+        counts = {0: 0, 1: 1}  # node -> models over the levels from its own to the last
+        
+        def depth(node):
+            return n_levels if node < 2 else level[node]
+        
+        stack = [root]
+        while stack:
+            node = stack[-1]
+            if node in counts:
+                stack.pop()
+                continue
+            pending = [child for child in (low[node], high[node]) if child not in counts]
+            if pending:
+                stack.extend(pending)
+                continue
+            counts[node] = ((counts[low[node]] << (depth(low[node]) - level[node] - 1))
+                            + (counts[high[node]] << (depth(high[node]) - level[node] - 1)))
+            stack.pop()
+        # Over every level, then over only the given symbols (the rest are free in it)
+        return (counts[root] << depth(root)) >> (n_levels - n_symbols)
+    
+    def _solve_fallback(self, query: str): # -> Tuple[bool, None]
+        """Answer with DPLL, under the truth table's convention that an inconsistent KB entails nothing."""
+        self.stats['fallbacks'] = 1
+        self._fallback._budget = self._budget
+        try:
+            if self._kb_satisfiable is None:
+                self._kb_satisfiable = self._fallback.kb_satisfiable()
+            return self._kb_satisfiable and self._fallback.entails(query), None
+        finally:
+            self._fallback._budget = None
+    
+    @_budgeted
+    def solve(self, query: str): # -> Tuple[bool, Optional[int]]
+        """
+        Decide entailment and count the proving models with the compiled KB.
+        
+        Args:
+            query: The query to prove
+            
+        Returns:
+            Tuple of (whether the query is entailed, number of models of KB & query
+            over the KB and query symbols as the truth table counts them, or None
+            when DPLL answered because the diagram would pass the node limit)
+        """
+        self._reset_stats('nodes', 'fallbacks')
+        query_formula = parse_formula(query)
+        kb_root = self.compile()
+        if kb_root is None:
+            with self._phase('search'):
+                return self._solve_fallback(query)
+        
+        with self._phase('search'):
+            try:
+                proving = self._apply(self.AND, kb_root, self._build(query_formula))
+            except BudgetExceeded:
+                self._rollback()
+                raise
+            except _NodeLimitExceeded:
+                self._rollback()
+                if self._fallback is None:
+                    self._fallback = DPLL(self.kb.clauses, trace_level='off')
+                return self._solve_fallback(query)
+            self.stats['nodes'] = len(self.level)
+            n_symbols = len(self.kb.symbols | query_formula.symbols())
+            proving_count = self.count_models(proving, n_symbols)
+            self._rollback()
+        return (kb_root != self.FALSE and proving == kb_root, proving_count)
@@ -0,0 +1,186 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+import traceback
+from typing import Callable, Optional
+
+
+class PoolBusy(Exception):
+    """Raised when the pool already has as many requests running and waiting as it allows."""
+
+
+class PoolTimeout(Exception):
+    """Raised when a task runs past its deadline; its worker has been killed and replaced."""
+
+
+def _worker_main(conn, stats: Optional[Callable]):
+    """Worker loop: run (function, args, streaming) tasks from the pipe until it closes.
+
+    A streaming task is also passed an `emit` callable, and each event it emits
+    is sent at once as ('event', event). Every task ends with a
+    ('done', ok, value, stats) reply, where value is the result or an error
+    message and stats is the worker's `stats()` snapshot, if one was given.
+    """
+    if hasattr(os, 'setsid'):
+        # Own process group, so a kill also reaches any processes the task started
+        os.setsid()
+    emit = lambda event: conn.send(('event', event))
+    while True:
+        try:
+            function, args, streaming = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            reply = ('done', True, function(*args, emit) if streaming else function(*args))
+        except Exception as e:
+            reply = ('done', False, str(e) or traceback.format_exc(limit=1))
+        conn.send(reply + (stats() if stats else None,))
+
+
+class _Worker:
+    """A warm worker process and the parent's end of its pipe."""
+
+    def __init__(self, context, stats: Optional[Callable]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, stats))
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        if hasattr(os, 'killpg'):
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass  # The worker had not made its own group yet
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class SolverPool:
+    """Bounded pool of warm solver processes for an asyncio server.
+
+    Tasks run in separate processes, so a long solve never blocks the event
+    loop. Each task has a wall-clock timeout; a worker still busy at the
+    deadline (or whose request was cancelled) is killed outright and replaced.
+    At most `max_pending` tasks may be running or waiting for a worker, and
+    further submissions fail fast with PoolBusy.
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout: float, stats: Optional[Callable] = None):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.stats_function = stats
+        self.context = multiprocessing.get_context('spawn')
+        self.idle = None
+        self.all_workers = []
+        self.pending = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.worker_stats = {}  # pid -> last stats snapshot from that worker
+
+    def start(self):
+        """Start the worker processes; call from the running event loop. The first
+        task starts them too if this was not called, and later calls do nothing."""
+        if self.idle is not None:
+            return
+        self.idle = asyncio.Queue()
+        for _ in range(self.workers):
+            self._spawn()
+
+    def _spawn(self):
+        worker = _Worker(self.context, self.stats_function)
+        self.all_workers.append(worker)
+        self.idle.put_nowait(worker)
+
+    def _replace(self, worker: _Worker):
+        worker.kill()
+        self.all_workers.remove(worker)
+        self.worker_stats.pop(worker.process.pid, None)
+        self._spawn()
+
+    async def run(self, function: Callable, *args, timeout: Optional[float] = None):
+        """Run `function(*args)` in a worker and return its result.
+
+        Raises PoolBusy when the pool is full, PoolTimeout past the deadline,
+        and RuntimeError with the worker's message if the function raised.
+        """
+        exchange = self._exchange(function, args, False, timeout)
+        try:
+            async for kind, value in exchange:
+                return value
+        finally:
+            await exchange.aclose()
+
+    async def stream(self, function: Callable, *args, timeout: Optional[float] = None):
+        """Run `function(*args, emit)` in a worker, yielding ('event', event) pairs as it emits
+        them and finally ('result', value). Errors are raised as in run(); the
+        timeout covers the whole task, and closing the generator early kills the worker.
+        """
+        exchange = self._exchange(function, args, True, timeout)
+        try:
+            async for item in exchange:
+                yield item
+        finally:
+            await exchange.aclose()
+
+    async def _exchange(self, function: Callable, args: tuple, streaming: bool, timeout: Optional[float]):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PoolBusy(f"Too many requests in progress ({self.pending})")
+        self.start()
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            worker = await self.idle.get()
+            finished = False
+            try:
+                worker.conn.send((function, args, streaming))
+                deadline = time.monotonic() + timeout
+                while True:
+                    remaining = deadline - time.monotonic()
+                    ready = remaining > 0 and await loop.run_in_executor(None, worker.conn.poll, remaining)
+                    if not ready:
+                        self.timeouts += 1
+                        raise PoolTimeout(f"Solver timed out after {timeout:g}s")
+                    message = worker.conn.recv()
+                    if message[0] == 'event':
+                        yield message
+                        continue
+                    _, ok, value, stats = message
+                    finished = True
+                    break
+            finally:
+                if finished:
+                    self.idle.put_nowait(worker)
+                else:
+                    # Timed out, cancelled, abandoned mid-stream or dead: do not reuse it
+                    self._replace(worker)
+            self.completed += 1
+            if stats is not None:
+                self.worker_stats[worker.process.pid] = stats
+            if not ok:
+                raise RuntimeError(value)
+            yield ('result', value)
+        finally:
+            self.pending -= 1
+
+    def stats(self):
+        """Pool counters, plus the numeric worker stats summed over the live workers."""
+        summed = {}
+        for snapshot in self.worker_stats.values():
+            for key, value in snapshot.items():
+                summed[key] = summed.get(key, 0) + value
+        return {'workers': self.workers, 'pending': self.pending, 'completed': self.completed,
+                'timeouts': self.timeouts, 'rejected': self.rejected, 'worker_stats': summed}
+
+    def shutdown(self):
+        for worker in self.all_workers:
+            worker.kill()
+        self.all_workers = []
+        self.idle = None
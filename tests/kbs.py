@@ -0,0 +1,74 @@
+"""Random knowledge bases and a reference evaluator shared by the engine tests."""
+from itertools import product
+
+from sequence import LogicalConnective, parse_formula
+
+
+def random_generic_kb(rng, n_symbols, n_clauses):
+    """Clauses mixing every connective over symbols s0..s(n-1), and a query over them."""
+    symbols = [f's{i}' for i in range(n_symbols)]
+    
+    def literal():
+        return ('~' if rng.random() < 0.3 else '') + rng.choice(symbols)
+    
+    clauses = []
+    for _ in range(n_clauses):
+        connective = rng.choice(['||', '&', '=>', '<=>'])
+        clause = f' {connective} '.join(literal() for _ in range(rng.randint(1, 3)))
+        if rng.random() < 0.2:
+            clause = f'({clause}) {rng.choice(["||", "=>", "<=>"])} {literal()}'
+        clauses.append(clause)
+    query = rng.choice([literal(), f'{literal()} || {literal()}', f'{literal()} & {literal()}', f'{literal()} => {literal()}'])
+    return clauses, query
+
+
+def random_horn_kb(rng, n_symbols, n_rules):
+    """A few facts and rules with up to three premises, and a symbol to ask."""
+    symbols = [f'h{i}' for i in range(n_symbols)]
+    clauses = rng.sample(symbols, rng.randint(1, min(3, n_symbols)))
+    for _ in range(n_rules):
+        premises = rng.sample(symbols, rng.randint(1, min(3, n_symbols)))
+        clauses.append(f"{' & '.join(premises)} => {rng.choice(symbols)}")
+    return clauses, rng.choice(symbols)
+
+
+def evaluate(formula, model):
+    """Truth value of a parsed formula under a model (symbols it leaves out are false), by recursion."""
+    connective = formula.connective
+    if connective is None:
+        return model.get(formula.symbol, False)
+    values = [evaluate(arg, model) for arg in formula.args]
+    if connective is LogicalConnective.NEGATION:
+        return not values[0]
+    if connective is LogicalConnective.CONJUNCTION:
+        return all(values)
+    if connective is LogicalConnective.DISJUNCTION:
+        return any(values)
+    if connective is LogicalConnective.IMPLICATION:
+        return not values[0] or values[1]
+    return values[0] == values[1]
+
+
+def satisfies(formulas, model):
+    """Whether every parsed formula is true under the model."""
+    return all(evaluate(formula, model) for formula in formulas)
+
+
+def brute_force_counts(clauses, query):
+    """(KB models, KB models where the query holds) over the KB and query symbols, model by model."""
+    formulas = [parse_formula(clause) for clause in clauses]
+    query_formula = parse_formula(query)
+    symbols = sorted(set(query_formula.symbols()).union(*(formula.symbols() for formula in formulas)))
+    kb_models = proving_models = 0
+    for values in product((False, True), repeat=len(symbols)):
+        model = dict(zip(symbols, values))
+        if satisfies(formulas, model):
+            kb_models += 1
+            proving_models += evaluate(query_formula, model)
+    return kb_models, proving_models
+
+
+def is_counter_model(clauses, query, assignment):
+    """Whether an engine's assignment (steps and stats aside) satisfies the KB but not the query."""
+    model = {name: value for name, value in assignment.items() if name not in ('steps', 'stats')}
+    return satisfies([parse_formula(clause) for clause in clauses], model) and not evaluate(parse_formula(query), model)
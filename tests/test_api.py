@@ -0,0 +1,173 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip('fastapi')
+pytest.importorskip('httpx')
+from fastapi.testclient import TestClient
+
+# A small pool keeps the test run light; it must be set before api reads it
+os.environ.setdefault('IENGINE_WORKERS', '2')
+import api
+
+
+@pytest.fixture(scope='module')
+def client():
+    with TestClient(api.app) as client:
+        yield client
+
+
+def upload(kb, query):
+    return {'file': ('kb.txt', f"TELL\n{'; '.join(kb)};\nASK\n{query}\n".encode())}
+
+
+def test_lru_cache_evicts_by_entries_and_bytes():
+    cache = api.LRUCache(max_entries=2, max_bytes=10)
+    cache.put('a', 1, 4)
+    cache.put('b', 2, 4)
+    assert cache.get('a') == 1  # Now b is the least recently used
+    cache.put('c', 3, 4)
+    assert cache.get('b') is None
+    assert cache.stats() == {'entries': 2, 'bytes': 8, 'hits': 1, 'misses': 1, 'evictions': 1}
+    # Over the byte budget even within the entry limit
+    cache.put('d', 4, 8)
+    assert list(cache.entries) == ['d']
+    # A value larger than the whole budget is not cached, and replacing a key recharges it
+    cache.put('e', 5, 11)
+    cache.put('d', 6, 2)
+    assert cache.get('e') is None and cache.get('d') == 6
+    assert cache.bytes == 2
+
+
+def test_kb_hash_ignores_whitespace_only():
+    assert api.kb_hash(['a & b => c', 'a']) == api.kb_hash(['a&b=>c', ' a '])
+    assert api.kb_hash(['a', 'b']) != api.kb_hash(['b', 'a'])
+
+
+def test_cached_solver_is_reused():
+    kb = ['c1 => c2', 'c1']
+    key, solver = api.cached_solver('DPLL', kb, {})
+    assert api.cached_solver('DPLL', ['c1=>c2', 'c1'], {}) == (key, solver)
+    assert api.cached_solver('DPLL', kb, {'slice_query': False})[1] is not solver
+    assert api.cached_solver('FC', kb, {})[1] is not solver
+
+
+def test_repeated_request_hits_the_result_cache(client):
+    kb = ['r1 => r2', 'r1']
+    before = client.get('/api/cache').json()
+    first = client.post('/api/process', files=upload(kb, 'r2'), data={'method': 'DPLL'}).json()
+    second = client.post('/api/process', files=upload(['r1=>r2', 'r1'], 'r2'), data={'method': 'DPLL'}).json()
+    assert first == second
+    after = client.get('/api/cache').json()
+    assert after['results']['hits'] == before['results']['hits'] + 1
+    assert after['results']['entries'] == before['results']['entries'] + 1
+    # Only the first request reached a worker and compiled a solver there
+    assert after['solvers']['entries'] == before['solvers'].get('entries', 0) + 1
+    assert set(after['pool']) >= {'pending', 'completed'}
+
+
+def test_process_stats_count_this_solve_only(client):
+    # A KB of its own, so neither the result cache nor a worker's solver has seen it
+    kb = ['m1 => m2', 'm2 => m3', 'm1']
+    response = client.post('/api/process', files=upload(kb, 'm3'), data={'method': 'TT'}).json()
+    assert response['result'] == 'YES: 1'
+    assert response['stats']['memo_hits'] == 0
+    assert response['truthTable']['summary']['kb_models'] == 1
+
+
+def test_metrics_render_solves_and_counters(client):
+    kb = ['n1 & n2 => n3', 'n1', 'n2']
+    before = client.get('/metrics').text
+    for method in ('FC', 'DPLL'):
+        assert client.post('/api/process', files=upload(kb, 'n3'), data={'method': method}).json()['result'] \
+            .startswith('YES')
+    text = client.get('/metrics').text
+    assert text.endswith('\n')
+    assert '# TYPE iengine_solves_total counter' in text
+    assert 'iengine_solves_total{method="FC"}' in text
+    assert 'iengine_engine_events_total{method="FC",counter="rule_firings"}' in text
+    assert 'iengine_phase_seconds_total{method="DPLL",phase="search"}' in text
+    assert 'iengine_pool_pending 0' in text
+    assert text != before
+
+
+def test_metrics_sum_counters_and_timings():
+    metrics = api.Metrics()
+    metrics.record('DPLL', {'decisions': 3, 'parse_seconds': 0.25, 'search_seconds': 0.5})
+    metrics.record('DPLL', {'decisions': 4, 'search_seconds': 0.25})
+    metrics.record_error('TT')
+    text = metrics.render({'pending': 1, 'completed': 2, 'timeouts': 0, 'rejected': 3},
+                          {'hits': 4, 'misses': 5, 'evictions': 0})
+    lines = text.splitlines()
+    assert 'iengine_solves_total{method="DPLL"} 2' in lines
+    assert 'iengine_errors_total{method="TT"} 1' in lines
+    assert 'iengine_engine_events_total{method="DPLL",counter="decisions"} 7' in lines
+    assert 'iengine_phase_seconds_total{method="DPLL",phase="search"} 0.750000' in lines
+    assert 'iengine_phase_seconds_total{method="DPLL",phase="parse"} 0.250000' in lines
+    assert 'iengine_pool_rejected_total 3' in lines
+    assert 'iengine_result_cache_misses_total 5' in lines
+    assert '# HELP iengine_pool_pending Requests running or waiting for a worker.' in lines
+
+
+HARD = [f'x{i} || ~x{(7 * i + 3) % 22} || x{(5 * i + 11) % 22}' for i in range(22)] + \
+       [f'~x{i} || x{(3 * i + 5) % 22} || ~x{(11 * i + 2) % 22}' for i in range(22)]
+
+
+def test_truth_table_page_answers_unknown_past_its_deadline(client):
+    response = client.post('/api/truth-table', files=upload(HARD, 'x0'),
+                           data={'timeout': '0.1', 'filter': 'proves_query'}).json()
+    assert response['result'] == 'UNKNOWN'
+    assert response['unknown']['reason'] == 'deadline'
+
+
+def test_stream_answers_unknown_past_its_deadline(client):
+    lines = client.post('/api/process/stream', files=upload(HARD, 'x0'),
+                        data={'method': 'TT', 'tt_mode': 'enumerate', 'timeout': '0.1'}).text.splitlines()
+    final = json.loads(lines[-1])
+    assert final['type'] == 'result'
+    assert final['result'] == 'UNKNOWN'
+    assert final['unknown']['reason'] == 'deadline'
+    assert not any(json.loads(line)['type'] == 'rows' for line in lines)
+
+
+def stream(client, kb, query, **data):
+    response = client.post('/api/process/stream', files=upload(kb, query), data=data)
+    return response, response.text
+
+
+def test_stream_sends_ndjson_events_ending_with_the_result(client):
+    response, text = stream(client, ['s1 => s2', 's2 => s3', 's1'], 's3', method='FC')
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    events = [json.loads(line) for line in text.splitlines()]
+    steps = [event for event in events if event['type'] == 'step']
+    assert steps and all(event['type'] in ('step', 'progress') for event in events[:-1])
+    assert events[-1]['type'] == 'result'
+    assert events[-1]['result'] == 'YES: s1, s2, s3'
+
+
+def test_stream_sends_server_sent_events(client):
+    response, text = stream(client, ['u1 || u2', '~u1 || u3', '~u2 || u3'], 'u3', method='DPLL', format='sse')
+    assert response.headers['content-type'].startswith('text/event-stream')
+    messages = text.split('\n\n')
+    assert messages[-1] == ''
+    events = [json.loads(message[len('data: '):]) for message in messages[:-1]]
+    assert all(message.startswith('data: ') for message in messages[:-1])
+    assert any(event['type'] == 'step' for event in events)
+    assert events[-1]['result'] == 'YES'
+
+
+@pytest.mark.parametrize('rows_limit, expected', [(None, api.TRUTH_TABLE_PAGE_SIZE), ('10', 10),
+                                                  ('100000', api.MAX_TRUTH_TABLE_PAGE_SIZE)])
+def test_stream_rows_are_limited(client, rows_limit, expected):
+    # 13 symbols: 8192 rows, more than the largest page
+    kb = [f'r{i} => r{i + 1}' for i in range(12)]
+    data = {'method': 'TT'} if rows_limit is None else {'method': 'TT', 'rows_limit': rows_limit}
+    _, text = stream(client, kb, 'r0 => r12', **data)
+    events = [json.loads(line) for line in text.splitlines()]
+    assert events[0]['type'] == 'truth_table'
+    rows = [row for event in events if event['type'] == 'rows' for row in event['rows']]
+    assert len(rows) == expected
+    assert [row['index'] for row in rows] == list(range(expected))
+    assert all(len(event['rows']) <= api.TRUTH_TABLE_CHUNK_SIZE for event in events if event['type'] == 'rows')
+    assert events[-1]['summary']['total_models'] == 2 ** 13
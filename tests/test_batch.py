@@ -0,0 +1,62 @@
+import json
+import os
+import sys
+
+import batch
+
+HORN = 'TELL\np2 => p3; p3 => p1; c => e; b & e => f; f & g => h; p2 & p1 & p3 => d; p1 & p3 => c; a; b; p2;\nASK\n'
+
+
+def write(path, query='d'):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(HORN + query + '\n')
+    return str(path)
+
+
+def test_directories_globs_and_files_are_expanded_once(tmp_path):
+    first = write(tmp_path / 'kbs' / 'a.txt')
+    second = write(tmp_path / 'kbs' / 'b.txt')
+    write(tmp_path / 'kbs' / 'notes.md')
+    other = write(tmp_path / 'other' / 'c.txt')
+    files = batch.expand_inputs([str(tmp_path / 'kbs'), str(tmp_path / 'other' / '*.txt'), first, 'missing.txt'])
+    # Every .txt of a directory, in order, and an explicit path even if it does not exist
+    assert files == [first, second, other, 'missing.txt']
+
+
+def test_manifest_entries_are_relative_to_the_manifest(tmp_path):
+    first = write(tmp_path / 'kbs' / 'a.txt')
+    second = write(tmp_path / 'kbs' / 'b.txt')
+    manifest = tmp_path / 'kbs.list'
+    manifest.write_text('# Inputs\n\nkbs/b.txt\n  kbs/*.txt  \n')
+    assert batch.expand_inputs([], str(manifest)) == [second, first]
+
+
+def test_run_file_reports_errors_as_records(tmp_path):
+    assert batch.run_file(str(tmp_path / 'missing.txt'), ['TT'])[0]['error']
+    bad = tmp_path / 'bad.txt'
+    bad.write_text('TELL\na => ;\nASK\na\n')
+    records = batch.run_file(str(bad), ['TT', 'FC'])
+    assert [record['method'] for record in records] == ['TT', 'FC']
+    assert all('Could not parse' in record['error'] for record in records)
+
+
+def test_run_file_answers_every_query_with_every_method(tmp_path):
+    path = write(tmp_path / 'kb.txt', 'd; h')
+    records = batch.run_file(path, batch.METHODS)
+    assert [(record['method'], record['query'], record['result']) for record in records] == [
+        ('TT', 'd', 'YES: 3'), ('TT', 'h', 'NO'),
+        ('FC', 'd', 'YES: a, b, p2, p3, p1, c, e, f, d'), ('FC', 'h', 'NO'),
+        ('BC', 'd', 'YES: p2, p3, p1, d'), ('BC', 'h', 'NO'),
+        ('DPLL', 'd', 'YES'), ('DPLL', 'h', 'NO'),
+    ]
+    assert all(record['seconds'] >= 0 and record['load_seconds'] >= 0 for record in records)
+
+
+def test_main_prints_json_lines(monkeypatch, capsys, tmp_path):
+    write(tmp_path / 'a.txt', 'd')
+    write(tmp_path / 'b.txt', 'h')
+    monkeypatch.setattr(sys, 'argv', ['batch.py', str(tmp_path), '--methods', 'tt, dpll', '--workers', '2'])
+    batch.main()
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(os.path.basename(record['file']), record['method'], record['result']) for record in records] == [
+        ('a.txt', 'TT', 'YES: 3'), ('a.txt', 'DPLL', 'YES'), ('b.txt', 'TT', 'NO'), ('b.txt', 'DPLL', 'NO')]
@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from kbs import random_generic_kb
+from sequence import BDD, DPLL, TruthTable
+
+KB = ['a => b', 'b => c', 'a || d', 'x0 || ~x0']
+# Parity of twelve symbols: far more nodes than the KB's diagram
+WIDE_QUERY = ' <=> '.join(f'x{i}' for i in range(12))
+
+
+def test_counts_match_truth_table():
+    bdd = BDD(KB)
+    for query in ('c', 'b || d', '~a => d', 'a & d', WIDE_QUERY):
+        assert bdd.solve(query) == TruthTable(KB).solve(query), query
+
+
+@pytest.mark.parametrize('seed', range(150))
+def test_random_counts_match_truth_table(seed):
+    rng = random.Random(seed)
+    clauses, query = random_generic_kb(rng, rng.randint(2, 8), rng.randint(1, 8))
+    assert BDD(clauses).solve(query) == TruthTable(clauses, slice_query=False, horn_fast_path=False).solve(query)
+
+
+def test_query_past_node_limit_rolls_back_to_dpll():
+    kb_nodes = BDD(KB)
+    kb_nodes.compile()
+    bdd = BDD(KB, node_limit=kb_nodes._kb_nodes + 8)
+    
+    entailed, count = bdd.solve(WIDE_QUERY)
+    assert (entailed, count) == (DPLL(KB).solve(WIDE_QUERY)[0], None)
+    assert bdd.stats['fallbacks'] == 1
+    # The query's nodes are gone, so the compiled KB answers later queries with counts again
+    assert len(bdd.level) == bdd._kb_nodes
+    assert bdd.solve('b || d') == TruthTable(KB).solve('b || d')
+    assert bdd.stats['fallbacks'] == 0
+
+
+def test_kb_past_node_limit_answers_with_dpll():
+    bdd = BDD(KB + [WIDE_QUERY], node_limit=4)
+    assert bdd.compile() is None
+    for query in ('b || d', 'c', 'x0 <=> x1'):
+        assert bdd.solve(query) == (TruthTable(KB + [WIDE_QUERY]).solve(query)[0], None), query
+        assert bdd.stats['fallbacks'] == 1
+
+
+def test_inconsistent_kb_entails_nothing_past_node_limit():
+    # Past the limit the DPLL answer keeps the truth table's convention
+    clauses = ['a', '~a', WIDE_QUERY]
+    assert BDD(clauses, node_limit=4).solve('a') == (False, None)
+    assert BDD(clauses).solve('a') == TruthTable(clauses).solve('a')
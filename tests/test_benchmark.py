@@ -0,0 +1,31 @@
+import random
+
+import pytest
+
+from benchmark import GENERATORS, check_tests_archive, compare, parse_arguments, run_case
+
+
+def test_tests_archive_answers():
+    assert check_tests_archive(['TT', 'FC', 'BC', 'DPLL', 'CDCL', 'BDD'], tt_max_symbols=16) == []
+
+
+@pytest.mark.parametrize('generator_name', list(GENERATORS))
+def test_generated_kbs_get_one_answer(generator_name):
+    generator, sizes = GENERATORS[generator_name]
+    kb_clauses, query, expected = generator(sizes[0], random.Random(0))
+    record, errors = run_case(generator_name, kb_clauses, query, expected, ['TT', 'FC', 'BC', 'DPLL', 'CDCL'],
+                              repeat=1, tt_max_symbols=16)
+    assert errors == []
+    assert record['seconds'].keys() == record['answers'].keys()
+    assert 'DPLL' in record['answers']
+
+
+def test_compare_ignores_jitter_below_the_floor():
+    min_seconds = parse_arguments([]).min_seconds
+    assert min_seconds >= 0.05
+    baseline = {'chain/8': {'seconds': {'FC': 0.0002, 'DPLL': 0.2}}}
+    results = {'chain/8': {'seconds': {'FC': 0.0009, 'DPLL': 0.21}}, 'new/8': {'seconds': {'FC': 1.0}}}
+    assert compare(results, baseline, 0.25, min_seconds) == []
+    results['chain/8']['seconds']['DPLL'] = 0.3
+    regressions = compare(results, baseline, 0.25, min_seconds)
+    assert len(regressions) == 1 and regressions[0].startswith('chain/8 DPLL')
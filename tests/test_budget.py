@@ -0,0 +1,114 @@
+import random
+import time
+
+import pytest
+
+from iengine import format_result, make_budget
+from sequence import Budget, BudgetExceeded, Unknown, TruthTable, ForwardChaining, BackwardChaining, DPLL, CDCL, BDD
+
+
+def planted_3cnf(n_vars, seed=1):
+    """Satisfiable random 3-CNF at the phase transition ratio, asking one disjunction."""
+    rng = random.Random(seed)
+    planted = [rng.random() < 0.5 for _ in range(n_vars)]
+    clauses = []
+    while len(clauses) < int(4.26 * n_vars):
+        variables = rng.sample(range(n_vars), 3)
+        signs = [rng.random() < 0.5 for _ in variables]
+        if any(planted[v] == sign for v, sign in zip(variables, signs)):
+            clauses.append(' || '.join(f"{'' if sign else '~'}v{v}" for v, sign in zip(variables, signs)))
+    return clauses, 'v0 || v5'
+
+
+CLAUSES, QUERY = planted_3cnf(18)
+CHAIN = ['p0'] + [f'p{i} => p{i + 1}' for i in range(20000)]
+
+
+@pytest.mark.parametrize('make_engine, budget, reason', [
+    (lambda: TruthTable(CLAUSES, slice_query=False, horn_fast_path=False), Budget(max_models=10000), 'max_models'),
+    (lambda: TruthTable(CLAUSES, slice_query=False, horn_fast_path=False), Budget(seconds=0.05), 'deadline'),
+    (lambda: TruthTable(CLAUSES, mode='pruned', slice_query=False), Budget(max_models=500), 'max_models'),
+    (lambda: TruthTable(CLAUSES, mode='components', slice_query=False), Budget(max_decisions=3), 'max_decisions'),
+    (lambda: DPLL(CLAUSES, preprocess=()), Budget(max_decisions=0), 'max_decisions'),
+    (lambda: DPLL(CLAUSES, preprocess=()), Budget(max_conflicts=0), 'max_conflicts'),
+    (lambda: CDCL(CLAUSES), Budget(max_decisions=0), 'max_decisions'),
+    (lambda: BDD(CLAUSES, node_limit=10), Budget(max_decisions=1), 'max_decisions'),
+])
+def test_out_of_budget_answers_unknown_then_recovers(make_engine, budget, reason):
+    engine = make_engine()
+    result, info = engine.solve(QUERY, budget=budget)
+    assert isinstance(result, Unknown)
+    assert result.reason == reason
+    assert info is None
+    # The same engine answers in full afterwards, as a fresh one would
+    assert engine.solve(QUERY) == make_engine().solve(QUERY)
+    assert engine._budget is None
+
+
+@pytest.mark.parametrize('engine_class', [ForwardChaining, BackwardChaining])
+def test_chaining_deadline(engine_class):
+    result, _ = engine_class(CHAIN).solve('p20000', budget=Budget(seconds=0))
+    assert isinstance(result, Unknown) and result.reason == 'deadline'
+    assert engine_class(CHAIN).solve('p20000', budget=Budget(seconds=60))[0] is True
+
+
+def test_progress_reports_only_filled_counters():
+    result, _ = TruthTable(CLAUSES, slice_query=False, horn_fast_path=False).solve(QUERY, budget=Budget(max_models=10000))
+    assert result.progress['models_checked'] > 10000
+    assert {'kb_models', 'proving_models'} <= set(result.progress)
+    # Tallied only when the count completes
+    assert 'models_evaluated' not in result.progress
+    assert result.to_dict() == {'reason': 'max_models', 'progress': result.progress}
+
+
+def test_parallel_truth_table_stops_at_deadline():
+    clauses, query = planted_3cnf(24)
+    engine = TruthTable(clauses, workers=2, slice_query=False, horn_fast_path=False)
+    start = time.perf_counter()
+    result, _ = engine.solve(query, budget=Budget(seconds=0.2))
+    assert isinstance(result, Unknown) and result.reason == 'deadline'
+    # Workers are terminated rather than waited for
+    assert time.perf_counter() - start < 5
+
+
+def test_unknown_is_neither_yes_nor_no():
+    result, info = DPLL(CLAUSES, preprocess=()).solve(QUERY, budget=Budget(max_decisions=0))
+    with pytest.raises(TypeError):
+        bool(result)
+    assert format_result('DPLL', result, info).startswith('UNKNOWN: max_decisions (')
+
+
+def test_generous_budget_gives_the_usual_answer():
+    budget = Budget(seconds=60, max_models=1 << 30, max_decisions=10 ** 6, max_conflicts=10 ** 6)
+    for engine in (TruthTable(CLAUSES), DPLL(CLAUSES), CDCL(CLAUSES), BDD(CLAUSES)):
+        assert engine.solve(QUERY, budget=budget) == type(engine)(CLAUSES).solve(QUERY)
+
+
+def test_trace_events_are_capped_for_the_solve_only():
+    engine = DPLL(CLAUSES, preprocess=())
+    _, assignment = engine.solve(QUERY, budget=Budget(max_trace_events=3))
+    steps = assignment['steps']
+    assert len(steps) == 4 and steps[0].endswith('earlier steps not kept')
+    assert engine.trace.limit is None
+    assert len(engine.solve(QUERY)[1]['steps']) > 4
+
+
+def test_budget_validation():
+    with pytest.raises(ValueError):
+        Budget(seconds=-1)
+    with pytest.raises(ValueError):
+        Budget(max_trace_events=0)
+    assert make_budget() is None
+    assert make_budget(max_models=5).max_models == 5
+
+
+def test_truth_table_page_scan_is_bounded():
+    solver = TruthTable(CLAUSES, slice_query=False, horn_fast_path=False)
+    rows = solver.iter_truth_table(QUERY, filter='proves_query', start=10 ** 6, budget=Budget(seconds=0.05))
+    start = time.perf_counter()
+    with pytest.raises(BudgetExceeded) as raised:
+        list(rows)
+    assert raised.value.reason == 'deadline'
+    assert time.perf_counter() - start < 2
+    assert raised.value.progress['rows'] == 0
+    assert len(solver.get_truth_table(QUERY, limit=3, budget=Budget(seconds=5))['rows']) == 3
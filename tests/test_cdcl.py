@@ -0,0 +1,105 @@
+import random
+
+import pytest
+
+from kbs import is_counter_model, random_generic_kb
+from sequence import CDCL, DPLL, TruthTable
+
+KB = ['a => b', 'b & c => d', 'a || c', '~d || e', 'e <=> (f || g)', 'h']
+QUERIES = ['b || c', 'd', 'e', '~e', 'a & c', 'f || g || ~e', 'h & ~h', '(a <=> b) || c', 'a => e', 'g', 'd']
+
+
+def test_incremental_queries_match_fresh_solves():
+    solver = CDCL(KB)
+    solver.load()
+    for query in QUERIES * 3:
+        assert solver.entails(query) == CDCL(KB).solve(query)[0] == TruthTable(KB).solve(query)[0], query
+
+
+def test_retired_queries_do_not_constrain_later_ones():
+    solver = CDCL(['a || b'])
+    # Each query's clauses hold only under its own activation literal
+    assert solver.entails('a') is False
+    assert solver.entails('~a') is False
+    assert solver.entails('a || b') is True
+    assert solver.entails('~a => b') is True
+    assert solver.entails('b') is False
+
+
+def test_query_definitions_are_not_kept():
+    solver = CDCL(KB)
+    solver.load()
+    definitions = len(solver._cnf._definitions)
+    clauses = len(solver._cnf.clauses)
+    for query in QUERIES * 5:
+        solver.entails(query)
+    assert len(solver._cnf._definitions) == definitions
+    assert len(solver._cnf.clauses) == clauses
+
+
+def test_retired_query_clauses_are_deleted():
+    solver = CDCL(KB)
+    solver.load()
+    search = solver._incremental
+    kb_clauses, kb_vars = len(search.clauses), search.n_vars
+    for query in QUERIES * 20:
+        solver.entails(query)
+        # Clauses of answered queries are deleted once they make up half the database
+        assert len(search.clauses) <= 2 * kb_clauses + 8
+    # The answered queries' variables, all auxiliaries here, are fixed rather than branched on again
+    assert all(search.lit_value[2 * var] != 0 for var in range(kb_vars + 1, search.n_vars + 1))
+    assert [solver.entails(query) for query in QUERIES] == [TruthTable(KB).solve(query)[0] for query in QUERIES]
+
+
+def test_load_replaces_the_kb():
+    solver = CDCL(['a'])
+    assert solver.entails('a') is True
+    solver.load(['~a'])
+    assert solver.entails('a') is False
+    assert solver.entails('~a') is True
+
+
+def test_kb_model_and_satisfiable():
+    clauses = ['a || b', 'a || ~b || c', '~a || ~c', 'b <=> (c || d)']
+    solver = CDCL(clauses)
+    for _ in range(2):
+        assert solver.kb_satisfiable() is True
+        model = solver.kb_model()
+        assert set(model) == {'a', 'b', 'c', 'd'}
+        assert DPLL(clauses + [name if value else f'~{name}' for name, value in model.items()]).kb_satisfiable()
+        # The inherited KB checks must still work once entails() has loaded the KB
+        solver.load()
+        assert solver.entails('b') is False
+    assert CDCL(['a', 'a => b', '~b']).kb_model() is None
+    assert CDCL(['a', 'a => b', '~b']).kb_satisfiable() is False
+
+
+@pytest.mark.parametrize('option', [{'horn_fast_path': False}, {'preprocess': ()}, {'slice_query': False}])
+def test_dpll_options_are_rejected(option):
+    with pytest.raises(ValueError):
+        CDCL(['a'], **option)
+
+
+def test_random_kbs_agree_with_dpll():
+    rng = random.Random(7)
+    for _ in range(30):
+        n = rng.randint(3, 12)
+        clauses = [' || '.join(('~' if rng.random() < 0.5 else '') + f'v{rng.randrange(n)}' for _ in range(3))
+                   for _ in range(rng.randint(1, 4 * n))]
+        solver = CDCL(clauses)
+        for _ in range(5):
+            query = ('~' if rng.random() < 0.5 else '') + f'v{rng.randrange(n)}'
+            assert solver.entails(query) == DPLL(clauses).solve(query)[0], (clauses, query)
+
+
+@pytest.mark.parametrize('seed', range(150))
+def test_cdcl_agrees_with_truth_table(seed):
+    rng = random.Random(seed)
+    clauses, query = random_generic_kb(rng, rng.randint(2, 8), rng.randint(1, 8))
+    entailed, _ = TruthTable(clauses, slice_query=False, horn_fast_path=False).solve(query)
+    # Like DPLL, CDCL says an inconsistent KB entails everything
+    solver = CDCL(clauses)
+    result, assignment = solver.solve(query)
+    assert result == (entailed or not solver.kb_satisfiable())
+    if not result:
+        assert is_counter_model(clauses, query, assignment)
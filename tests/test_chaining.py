@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from kbs import random_horn_kb
+from sequence import TruthTable, ForwardChaining, BackwardChaining
+
+
+@pytest.mark.parametrize('seed', range(100))
+def test_forward_chaining_agrees_with_truth_table_on_horn_kbs(seed):
+    rng = random.Random(seed)
+    clauses, query = random_horn_kb(rng, rng.randint(2, 10), rng.randint(0, 12))
+    entailed, _ = TruthTable(clauses).solve(query)
+    assert ForwardChaining(clauses).solve(query)[0] == entailed
+    assert ForwardChaining(clauses, early_exit=True).solve(query)[0] == entailed
+    assert ForwardChaining(clauses, slice_query=True).solve(query)[0] == entailed
+
+
+def test_forward_chaining_fires_simpler_rules_first():
+    clauses = ['a & b => c', 'a => d', 'd => e', 'a', 'b']
+    assert ForwardChaining(clauses).solve('c') == (True, ['a', 'b', 'd', 'e', 'c'])
+
+
+def test_forward_chaining_early_exit_stops_at_the_query():
+    clauses = ['a', 'a => b', 'b => c', 'c => d']
+    solver = ForwardChaining(clauses, early_exit=True)
+    assert solver.solve('b') == (True, ['a', 'b'])
+    assert solver.stats['rule_firings'] == 1
+    assert ForwardChaining(clauses).solve('b') == (True, ['a', 'b', 'c', 'd'])
+
+
+def test_forward_chaining_lists_every_fact_by_default():
+    clauses = ['a', 'b', 'a => c', 'b => d']
+    assert ForwardChaining(clauses).solve('c') == (True, ['a', 'b', 'c', 'd'])
+    assert ForwardChaining(clauses, slice_query=True).solve('c') == (True, ['a', 'c'])
+
+
+def test_forward_chaining_long_chain():
+    size = 100000
+    clauses = ['p0'] + [f'p{i} => p{i + 1}' for i in range(size)]
+    solver = ForwardChaining(clauses)
+    entailed, facts = solver.solve(f'p{size}')
+    assert entailed
+    assert len(facts) == size + 1
+    assert solver.stats['rule_firings'] == solver.stats['agenda_pushes'] == size
+
+
+@pytest.mark.parametrize('seed', range(100))
+def test_backward_chaining_agrees_with_truth_table_on_horn_kbs(seed):
+    rng = random.Random(seed)
+    clauses, query = random_horn_kb(rng, rng.randint(2, 10), rng.randint(0, 12))
+    entailed, _ = TruthTable(clauses).solve(query)
+    assert BackwardChaining(clauses).solve(query)[0] == entailed
+
+
+def test_backward_chaining_cycles():
+    # A cycle alone proves nothing
+    assert BackwardChaining(['a => b', 'b => a', 'c']).solve('a')[0] is False
+    # q first fails only because p is in progress; once p is proven by its
+    # second rule, q must not stay recorded as failed
+    clauses = ['q => p', 's => p', 'p => q', 's', 'p & q => top']
+    assert BackwardChaining(clauses).solve('top')[0] is True
+    assert ForwardChaining(clauses).solve('top')[0] is True
+
+
+def test_backward_chaining_deep_chain():
+    size = 100000
+    clauses = ['p0'] + [f'p{i} => p{i + 1}' for i in range(size)]
+    entailed, proven = BackwardChaining(clauses).solve(f'p{size}')
+    assert entailed
+    assert len(proven) == size + 1
@@ -0,0 +1,41 @@
+import sys
+
+import iengine
+
+HORN = 'TELL\np2 => p3; p3 => p1; c => e; b & e => f; f & g => h; p2 & p1 & p3 => d; p1 & p3 => c; a; b; p2;\nASK\n'
+
+
+def run(monkeypatch, capsys, tmp_path, query, *arguments):
+    path = tmp_path / 'kb.txt'
+    path.write_text(HORN + query + '\n')
+    monkeypatch.setattr(sys, 'argv', ['iengine.py', str(path), *arguments])
+    iengine.main()
+    return capsys.readouterr().out.splitlines()
+
+
+def stats_lines(lines):
+    return dict(line.split(': ', 1) for line in lines if ': ' in line and not line.startswith('YES'))
+
+
+def test_stats_follow_the_result(monkeypatch, capsys, tmp_path):
+    lines = run(monkeypatch, capsys, tmp_path, 'd', 'FC', '--stats')
+    assert lines[0] == 'YES: a, b, p2, p3, p1, c, e, f, d'
+    stats = stats_lines(lines[1:])
+    assert int(stats['rule_firings']) > 0
+    assert float(stats['parse_seconds']) >= 0
+    # Timings are printed in seconds with six decimals
+    assert len(stats['search_seconds'].split('.')[1]) == 6
+
+
+def test_batch_stats_are_summed_over_the_queries(monkeypatch, capsys, tmp_path):
+    single = {query: stats_lines(run(monkeypatch, capsys, tmp_path, query, 'DPLL', '--stats', '--general-path')[1:])
+              for query in ('d', 'h')}
+    lines = run(monkeypatch, capsys, tmp_path, 'd; h', 'DPLL', '--batch', '--stats', '--general-path')
+    assert lines[:2] == ['d: YES', 'h: NO']
+    totals = stats_lines(lines[2:])
+    assert int(totals['decisions']) == sum(int(stats['decisions']) for stats in single.values())
+    assert int(totals['propagations']) == sum(int(stats['propagations']) for stats in single.values())
+
+
+def test_no_stats_without_the_flag(monkeypatch, capsys, tmp_path):
+    assert run(monkeypatch, capsys, tmp_path, 'd', 'TT') == ['YES: 3']
@@ -0,0 +1,72 @@
+import random
+from itertools import product
+
+import pytest
+
+from kbs import brute_force_counts, random_generic_kb, satisfies
+from sequence import CNFEncoder, parse_formula
+
+
+def encode(clauses, query=None, negate_query=True, equivalence=False):
+    """Encode the clauses (and the negated query) over the KB and query symbols, declared first."""
+    formulas = [parse_formula(clause) for clause in clauses]
+    query_formula = parse_formula(query or clauses[0])
+    symbols = sorted(set(query_formula.symbols()).union(*(formula.symbols() for formula in formulas)))
+    encoder = CNFEncoder(symbols, equivalence=equivalence)
+    for formula in formulas:
+        encoder.add(formula)
+    if query is not None and negate_query:
+        encoder.add(query_formula, positive=False)
+    return encoder, formulas
+
+
+def cnf_models(encoder):
+    """Every model of the encoder's clauses, over all its variables."""
+    for values in product((False, True), repeat=len(encoder.names)):
+        if all(any(values[abs(lit) - 1] == (lit > 0) for lit in clause) for clause in encoder.clauses):
+            yield dict(zip(encoder.names, values))
+
+
+@pytest.mark.parametrize('seed', range(60))
+def test_equivalence_encoding_keeps_the_model_count(seed):
+    rng = random.Random(seed)
+    clauses, query = random_generic_kb(rng, rng.randint(1, 5), rng.randint(1, 4))
+    encoder, _ = encode(clauses, query, negate_query=False, equivalence=True)
+    assert sum(1 for _ in cnf_models(encoder)) == brute_force_counts(clauses, query)[0]
+
+
+@pytest.mark.parametrize('seed', range(60))
+def test_polarity_encoding_is_equisatisfiable(seed):
+    rng = random.Random(seed)
+    clauses, query = random_generic_kb(rng, rng.randint(1, 5), rng.randint(1, 4))
+    encoder, formulas = encode(clauses, query)
+    kb_models, proving_models = brute_force_counts(clauses, query)
+    models = list(cnf_models(encoder))
+    # The KB with the negated query is satisfiable exactly when the query is not entailed
+    assert bool(models) == (proving_models < kb_models)
+    query_formula = parse_formula(query)
+    for model in models:
+        assert satisfies(formulas, model) and not satisfies([query_formula], model)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('a', [[1]]),
+    ('a || ~b || c', [[1, -2, 3]]),
+    ('a & b => c', [[-1, -2, 3]]),
+    ('a => (b || c)', [[-1, 2, 3]]),
+    ('a & ~b', [[1], [-2]]),
+    ('~(a || b)', [[-1], [-2]]),
+])
+def test_clause_shaped_formulas_get_no_auxiliaries(text, expected):
+    encoder, _ = encode([text])
+    assert encoder.clauses == expected
+    assert not any(encoder.is_aux(name) for name in encoder.names)
+
+
+def test_encoding_stays_linear_in_formula_size():
+    # Distribution would need 2^depth clauses for this alternation
+    depth = 40
+    text = ' || '.join(f'(x{i} & y{i})' for i in range(depth))
+    encoder, _ = encode([text])
+    assert len(encoder.names) == 3 * depth
+    assert len(encoder.clauses) <= 3 * depth
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from kbs import is_counter_model, random_generic_kb, satisfies
+from sequence import DPLL, TruthTable, KnowledgeBase
+
+# The bare search: no preprocessing, slicing or Horn fast path in front of it
+PLAIN = {'preprocess': (), 'slice_query': False, 'horn_fast_path': False}
+
+
+def random_3cnf(rng, n_vars, n_clauses):
+    return [' || '.join(('~' if rng.random() < 0.5 else '') + f'v{rng.randrange(n_vars)}' for _ in range(3))
+            for _ in range(n_clauses)]
+
+
+@pytest.mark.parametrize('seed', range(150))
+def test_dpll_agrees_with_truth_table(seed):
+    rng = random.Random(seed)
+    clauses, query = random_generic_kb(rng, rng.randint(2, 8), rng.randint(1, 8))
+    entailed, _ = TruthTable(clauses, slice_query=False, horn_fast_path=False).solve(query)
+    # DPLL differs from TT only on inconsistent KBs, which it says entail everything
+    solver = DPLL(clauses, **PLAIN)
+    consistent = solver.kb_satisfiable()
+    result, assignment = solver.solve(query)
+    assert result == (entailed or not consistent)
+    if not result:
+        assert is_counter_model(clauses, query, assignment)
+
+
+def test_propagation_and_pure_literals_need_no_decisions():
+    solver = DPLL(['a => b', 'c || d'], **PLAIN)
+    result, assignment = solver.solve('b')
+    assert result is False
+    assert assignment['steps'] == ['Unit propagation: b = False', 'Unit propagation: a = False',
+                                   'Pure literal: c = True', 'Pure literal: d = True', 'Evaluating formula: True']
+    assert (solver.stats['decisions'], solver.stats['propagations'], solver.stats['pure_literals']) == (0, 2, 2)
+    assert DPLL(['a => b', 'a'], **PLAIN).solve('b') == (True, {'steps': [
+        'Unit propagation: b = False', 'Unit propagation: a = False',
+        'Conflict at the top level: formula is unsatisfiable']})
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_medium_random_kbs(seed):
+    # Far beyond the truth table: 60 variables at a clause ratio where most instances are satisfiable
+    rng = random.Random(seed)
+    clauses = random_3cnf(rng, 60, 210)
+    solver = DPLL(clauses, **PLAIN)
+    model = solver.kb_model()
+    assert model is not None
+    assert satisfies(KnowledgeBase(clauses).formulas, model)
+    for _ in range(5):
+        query = ('~' if rng.random() < 0.5 else '') + f'v{rng.randrange(60)}'
+        result, assignment = solver.solve(query)
+        if not result:
+            assert is_counter_model(clauses, query, assignment)
+
+
+def test_slicing_checks_the_rest_of_the_kb_apart():
+    clauses = ['a => b', 'a', 'x || y', 'y => z']
+    solver = DPLL(clauses)
+    assert solver.solve('b')[0] is True
+    assert solver.stats['sliced_clauses'] == 2
+    # A counter-model still covers the symbols outside the query's part of the KB
+    result, assignment = solver.solve('a & ~b')
+    assert result is False
+    assert is_counter_model(clauses, 'a & ~b', assignment)
+    # An inconsistent rest makes the whole KB inconsistent, which entails everything
+    assert DPLL(['a => b', 'a', 'x', '~x']).solve('~b')[0] is True
+    assert DPLL(['a => b', 'a', 'x', '~x'], slice_query=False).solve('~b')[0] is True
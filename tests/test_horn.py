@@ -0,0 +1,74 @@
+import random
+from itertools import product
+
+import pytest
+
+from kbs import random_horn_kb
+from sequence import DPLL, TruthTable, _horn_renaming, _horn_sat
+
+
+def random_horn_cnf(rng, n_vars, n_clauses):
+    """Integer clauses with at most one positive literal each."""
+    clauses = []
+    for _ in range(n_clauses):
+        variables = rng.sample(range(1, n_vars + 1), rng.randint(1, min(3, n_vars)))
+        clause = [-var for var in variables]
+        if rng.random() < 0.7:
+            clause[0] = -clause[0]
+        clauses.append(clause)
+    return clauses
+
+
+def renamed(clauses, flipped):
+    return [[-lit if abs(lit) in flipped else lit for lit in clause] for clause in clauses]
+
+
+def satisfiable(clauses, n_vars):
+    return any(all(any(values[abs(lit) - 1] == (lit > 0) for lit in clause) for clause in clauses)
+               for values in product((False, True), repeat=n_vars))
+
+
+def to_kb(clauses):
+    return [' || '.join(('~' if lit < 0 else '') + f'v{abs(lit)}' for lit in clause) for clause in clauses]
+
+
+@pytest.mark.parametrize('seed', range(60))
+def test_renamed_horn_sets_are_decided_by_unit_resolution(seed):
+    rng = random.Random(seed)
+    n_vars = rng.randint(1, 8)
+    flipped = {var for var in range(1, n_vars + 1) if rng.random() < 0.5}
+    clauses = renamed(random_horn_cnf(rng, n_vars, rng.randint(1, 12)), flipped)
+    renaming = _horn_renaming(clauses, n_vars)
+    assert renaming is not None
+    assert all(sum((lit > 0) != (abs(lit) in renaming) for lit in clause) <= 1 for clause in clauses)
+    values = _horn_sat(clauses, n_vars, renaming)
+    assert (values is not None) == satisfiable(clauses, n_vars)
+    if values is not None:
+        assert all(any(values[abs(lit)] == (lit > 0) for lit in clause) for clause in clauses)
+
+
+def test_sets_that_are_not_renamable_horn():
+    # The first clause leaves at most one of its variables unflipped and the second flips at most one
+    assert _horn_renaming([[1, 2, 3], [-1, -2, -3]], 3) is None
+    assert _horn_renaming([[1, 2], [-1, -2], [1, -2], [-1, 2]], 2) is None
+    # Dual-Horn: flipping every variable works
+    assert _horn_renaming([[1, 2, 3], [1, -2]], 3) is not None
+
+
+@pytest.mark.parametrize('seed', range(60))
+def test_fast_path_answers_match_the_search(seed):
+    rng = random.Random(seed)
+    if seed % 2:
+        clauses, query = random_horn_kb(rng, rng.randint(2, 8), rng.randint(0, 10))
+    else:
+        n_vars = rng.randint(2, 8)
+        flipped = {var for var in range(1, n_vars + 1) if rng.random() < 0.5}
+        clauses = to_kb(renamed(random_horn_cnf(rng, n_vars, rng.randint(1, 10)), flipped))
+        query = ('~' if rng.random() < 0.5 else '') + f'v{rng.randint(1, n_vars)}'
+    options = {'slice_query': False}
+    fast = TruthTable(clauses, **options)
+    assert fast.solve(query) == TruthTable(clauses, horn_fast_path=False, **options).solve(query)
+    assert fast.stats['horn_fast_path'] == 1
+    fast = DPLL(clauses, preprocess=(), **options)
+    assert fast.solve(query)[0] == DPLL(clauses, horn_fast_path=False, preprocess=(), **options).solve(query)[0]
+    assert fast.stats['horn_fast_path'] == 1
@@ -0,0 +1,79 @@
+import pytest
+
+from sequence import KnowledgeBase, TruthTable, parse_formula, tokenize
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('a & b || c', '((a & b) || c)'),
+    ('a || b & c', '(a || (b & c))'),
+    ('~a & b', '(~a & b)'),
+    ('~(a & b)', '~(a & b)'),
+    ('a & b => c || d', '((a & b) => (c || d))'),
+    ('a => b <=> c', '((a => b) <=> c)'),
+    # => and <=> associate to the right
+    ('a => b => c', '(a => (b => c))'),
+    ('a <=> b <=> c', '(a <=> (b <=> c))'),
+    # & and || chains are flattened, parenthesised or not
+    ('a & b & c', '(a & b & c)'),
+    ('(a || b) || (c || d)', '(a || b || c || d)'),
+    ('a&~b=>c_1', '((a & ~b) => c_1)'),
+])
+def test_precedence_associativity_and_flattening(text, expected):
+    assert repr(parse_formula(text)) == expected
+
+
+def test_tokenize():
+    assert tokenize(' p1&(q||~r)<=>s ') == ['p1', '&', '(', 'q', '||', '~', 'r', ')', '<=>', 's']
+
+
+@pytest.mark.parametrize('text', ['', 'a &', '(a || b', 'a b', 'a )', '& a', 'a $ b', 'a => => b', '()'])
+def test_malformed_formulas_are_rejected(text):
+    with pytest.raises(ValueError):
+        parse_formula(text)
+
+
+def test_engines_report_unparsable_kbs():
+    with pytest.raises(ValueError, match='Could not parse knowledge base'):
+        TruthTable(['a => b', 'a & '])
+
+
+def test_symbols_are_interned():
+    kb = KnowledgeBase(['b & a => c', 'c || a', 'd'])
+    leaves = {}
+    for formula in kb.formulas:
+        stack = [formula]
+        while stack:
+            node = stack.pop()
+            if node.connective is None:
+                assert leaves.setdefault(node.symbol, node) is node
+            else:
+                stack.extend(node.args)
+    assert kb.symbol_names == ['a', 'b', 'c', 'd']
+    assert kb.symbol_ids == {'a': 0, 'b': 1, 'c': 2, 'd': 3}
+    assert kb.occurrences == [[0, 1], [0], [0, 1], [2]]
+
+
+@pytest.mark.parametrize('clauses, horn_clauses, non_horn', [
+    (['a', 'a & b => c', 'c => d & e'], [([], 'a'), (['a', 'b'], 'c'), (['c'], 'd'), (['c'], 'e')], []),
+    # Negated facts and negated conclusions are Horn but derive nothing
+    (['~a', 'a => ~b', 'a & ~c'], [([], 'a')], []),
+    (['a || b', 'a => b || c', '~a => b', 'a <=> b', 'b'], [([], 'b')], ['a || b', 'a => b || c', '~a => b', 'a <=> b']),
+])
+def test_horn_structure(clauses, horn_clauses, non_horn):
+    kb = KnowledgeBase(clauses)
+    assert kb.horn_clauses == horn_clauses
+    assert kb.non_horn_clauses == non_horn
+    assert kb.is_horn_form == (not non_horn)
+
+
+def test_connected_clauses():
+    kb = KnowledgeBase(['a => b', 'b => c', 'x || y', 'y => z', 'w'])
+    assert kb.connected_clauses(['c']) == [0, 1]
+    assert kb.connected_clauses(['z', 'a']) == [0, 1, 2, 3]
+    assert kb.connected_clauses(['q']) == []
+
+
+def test_goal_cone():
+    kb = KnowledgeBase(['a', 'b', 'a => c', 'b => d', 'c & e => f', 'e'])
+    assert kb.goal_cone(['f']) == [([], 'a'), (['a'], 'c'), (['c', 'e'], 'f'), ([], 'e')]
+    assert kb.goal_cone(['d']) == [([], 'b'), (['b'], 'd')]
@@ -0,0 +1,87 @@
+import itertools
+import random
+
+import pytest
+
+from kbs import is_counter_model, random_generic_kb
+from sequence import DPLL, TruthTable, _Preprocessor
+
+
+def first_model(clauses, n_vars):
+    """A model of integer CNF over variables 1..n_vars by brute force, or None."""
+    for bits in itertools.product((False, True), repeat=n_vars):
+        if all(any((lit > 0) == bits[abs(lit) - 1] for lit in clause) for clause in clauses):
+            return dict(enumerate(bits, 1))
+    return None
+
+
+def satisfied(clauses, model):
+    return all(any((lit > 0) == model.get(abs(lit), False) for lit in clause) for clause in clauses)
+
+
+def test_elimination_is_reconstructed():
+    # Every variable can be resolved away, leaving no clauses at all
+    clauses = [[1, 2], [-1, 3], [-2, -3]]
+    preprocessor = _Preprocessor(('elimination',))
+    assert preprocessor.run(clauses) == []
+    assert preprocessor.stats['variables_eliminated'] == 3
+    model = preprocessor.extend({})
+    assert set(model) == {1, 2, 3}
+    assert satisfied(clauses, model)
+
+
+def test_pure_literals_are_reconstructed():
+    clauses = [[1, 2], [1, -3], [2, 3]]
+    preprocessor = _Preprocessor(('pure',))
+    simplified = preprocessor.run(clauses)
+    assert preprocessor.stats['pure_fixed'] >= 1
+    model = preprocessor.extend(first_model(simplified, 3) or {})
+    assert satisfied(clauses, model)
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_models_of_simplified_clauses_extend_to_the_originals(seed):
+    rng = random.Random(seed)
+    for _ in range(100):
+        n_vars = rng.randint(1, 7)
+        clauses = [[rng.choice((-1, 1)) * rng.randint(1, n_vars) for _ in range(rng.randint(1, 4))]
+                   for _ in range(rng.randint(0, 24))]
+        passes = [name for name in _Preprocessor.PASSES if rng.random() < 0.7]
+        preprocessor = _Preprocessor(passes)
+        simplified = preprocessor.run(clauses)
+        model = None if simplified == [[]] else first_model(simplified, n_vars)
+        assert (model is None) == (first_model(clauses, n_vars) is None), (clauses, passes)
+        if model is not None:
+            used = {abs(lit) for clause in simplified for lit in clause}
+            extended = preprocessor.extend({var: model[var] for var in used})
+            assert satisfied(clauses, extended), (clauses, passes, extended)
+
+
+def test_dpll_assignment_covers_removed_variables():
+    # b is a unit, d is pure and c is eliminated, but the counter-model names them all
+    clauses = ['a || c', '~c || d', 'b', 'a => e']
+    result, assignment = DPLL(clauses, slice_query=False, horn_fast_path=False).solve('e')
+    assert result is False
+    assert assignment['b'] is True
+    assert assignment['e'] is False
+    assert assignment['a'] is False
+    assert assignment['c'] is True and assignment['d'] is True
+
+
+@pytest.mark.parametrize('seed', range(150))
+def test_preprocessed_dpll_agrees_with_truth_table(seed):
+    rng = random.Random(seed)
+    clauses, query = random_generic_kb(rng, rng.randint(2, 8), rng.randint(1, 8))
+    entailed, _ = TruthTable(clauses, slice_query=False, horn_fast_path=False).solve(query)
+    # DPLL differs from TT only on inconsistent KBs, which it says entail everything
+    consistent = DPLL(clauses).kb_satisfiable()
+    for solver in (DPLL(clauses, slice_query=False, horn_fast_path=False), DPLL(clauses)):
+        result, assignment = solver.solve(query)
+        assert result == (entailed or not consistent)
+        if not result:
+            assert is_counter_model(clauses, query, assignment)
+
+
+def test_dpll_rejects_unknown_passes():
+    with pytest.raises(ValueError):
+        DPLL(['a'], preprocess=('units', 'magic'))
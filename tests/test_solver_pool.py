@@ -0,0 +1,70 @@
+import asyncio
+import math
+import os
+import time
+
+import pytest
+
+from solver_pool import PoolBusy, PoolTimeout, SolverPool
+
+
+def run_pool(pool, *tasks):
+    """Run the coroutines made by each task(pool) together, returning their results or exceptions."""
+    async def main():
+        try:
+            return await asyncio.gather(*(task(pool) for task in tasks), return_exceptions=True)
+        finally:
+            pool.shutdown()
+    return asyncio.run(main())
+
+
+def test_results_and_errors():
+    pool = SolverPool(1, 4, 10)
+    result, error = run_pool(pool, lambda pool: pool.run(math.factorial, 5), lambda pool: pool.run(math.sqrt, -1))
+    assert result == 120
+    assert isinstance(error, RuntimeError) and 'math domain error' in str(error)
+    assert pool.completed == 2
+
+
+def test_timed_out_worker_is_killed_and_replaced():
+    pool = SolverPool(1, 4, 10)
+
+    async def task(pool):
+        first = await pool.run(os.getpid)
+        start = time.monotonic()
+        with pytest.raises(PoolTimeout):
+            await pool.run(time.sleep, 5, timeout=0.5)
+        elapsed = time.monotonic() - start
+        return first, elapsed, await pool.run(os.getpid), len(pool.all_workers)
+
+    [(first, elapsed, second, workers)] = run_pool(pool, task)
+    assert elapsed < 3
+    assert second != first
+    assert pool.timeouts == 1
+    assert workers == 1
+
+
+def test_requests_past_the_queue_limit_are_rejected():
+    pool = SolverPool(1, 2, 10)
+    results = run_pool(pool, *[lambda pool: pool.run(time.sleep, 0.5)] * 3)
+    assert results[:2] == [None, None]
+    assert isinstance(results[2], PoolBusy)
+    assert (pool.rejected, pool.completed, pool.pending) == (1, 2, 0)
+
+
+def test_api_maps_pool_failures_to_status_codes(monkeypatch):
+    pytest.importorskip('fastapi')
+    pytest.importorskip('httpx')
+    from fastapi.testclient import TestClient
+    os.environ.setdefault('IENGINE_WORKERS', '2')
+    import api
+
+    files = {'file': ('kb.txt', b'TELL\nsp1 => sp2; sp1;\nASK\nsp2\n')}
+    with TestClient(api.app) as client:
+        for error, status in ((PoolBusy('full'), 429), (PoolTimeout('Solver timed out after 1s'), 504)):
+            async def fail(*args, **kwargs):
+                raise error
+            monkeypatch.setattr(api.POOL, 'run', fail)
+            response = client.post('/api/process', files=files, data={'method': 'DPLL'})
+            assert response.status_code == status
+            assert 'error' in response.json()
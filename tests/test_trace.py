@@ -0,0 +1,62 @@
+import pytest
+
+from sequence import DPLL, ForwardChaining, Trace
+
+CHAIN = ['a', 'a => b', 'b => c', 'c => d']
+# The bare DPLL search, so every step of the refutation is traced
+PLAIN = {'preprocess': (), 'horn_fast_path': False}
+
+
+def test_levels_keep_counts_and_records():
+    for level, records, total in (('off', [], 0), ('summary', [], 3), ('full', [('unit', 1), ('unit', 2), ('decide', 3)], 3)):
+        trace = Trace(level)
+        trace.add('unit', 1)
+        trace.add('unit', 2)
+        trace.add('decide', 3)
+        assert list(trace.records) == records
+        assert trace.summary() == {'level': level, 'events': total, 'dropped': 0,
+                                   'counts': {'unit': 2, 'decide': 1} if total else {}}
+
+
+def test_limit_keeps_the_latest_events():
+    trace = Trace('full', limit=2)
+    for k in range(5):
+        trace.add('unit', k)
+    assert list(trace.records) == [('unit', 3), ('unit', 4)]
+    assert trace.summary() == {'level': 'full', 'events': 5, 'dropped': 3, 'counts': {'unit': 5}}
+    trace.clear()
+    assert trace.summary()['events'] == 0 and not trace.records
+
+
+@pytest.mark.parametrize('options', [{'level': 'verbose'}, {'limit': 0}, {'limit': -1}])
+def test_invalid_options_are_rejected(options):
+    with pytest.raises(ValueError):
+        Trace(**options)
+    with pytest.raises(ValueError):
+        ForwardChaining(CHAIN, **{'trace_' + key: value for key, value in options.items()})
+
+
+def test_forward_chaining_steps_by_level():
+    full = ForwardChaining(CHAIN)
+    assert full.solve('d') == (True, ['a', 'b', 'c', 'd'])
+    assert full.steps[-1] == {'fact': 'd', 'reasoning': 'Derived using: c', 'known_facts': ['a', 'b', 'c']}
+    for level in ('off', 'summary'):
+        solver = ForwardChaining(CHAIN, trace_level=level)
+        # The answer never depends on the trace
+        assert solver.solve('d') == (True, ['a', 'b', 'c', 'd'])
+        assert solver.steps == []
+    assert solver.trace.summary()['counts'] == {'fact': 1, 'derived': 3}
+    limited = ForwardChaining(CHAIN, trace_limit=2)
+    limited.solve('d')
+    assert limited.steps == full.steps[2:]
+
+
+def test_dpll_steps_by_level():
+    full = DPLL(CHAIN, **PLAIN).solve('d')[1]['steps']
+    assert full == ['Unit propagation: d = False', 'Unit propagation: c = False', 'Unit propagation: b = False',
+                    'Unit propagation: a = False', 'Conflict at the top level: formula is unsatisfiable']
+    assert DPLL(CHAIN, trace_level='off', **PLAIN).solve('d') == (True, {'steps': []})
+    assert DPLL(CHAIN, trace_level='summary', **PLAIN).solve('d')[1]['steps'][0] == \
+        '0 decisions, 4 unit propagations, 0 pure literals, 0 backtracks'
+    # A limited trace says how many earlier steps it dropped
+    assert DPLL(CHAIN, trace_limit=2, **PLAIN).solve('d')[1]['steps'] == ['... 3 earlier steps not kept'] + full[-2:]
@@ -0,0 +1,233 @@
+import random
+from itertools import product
+
+import pytest
+
+from kbs import brute_force_counts, evaluate, random_generic_kb
+from sequence import TruthTable, _ModelCounter, compile_conjunction, compile_formula, parse_formula
+
+HORN = ['p2 => p3', 'p3 => p1', 'c => e', 'b & e => f', 'f & g => h', 'p2 & p1 & p3 => d', 'p1 & p3 => c', 'a', 'b',
+        'p2']
+
+
+@pytest.mark.parametrize('text', ['a', '~a', 'a & b & ~c', 'a || ~b || c', 'a => b => c', 'a <=> ~b',
+                                  '~(a & b) <=> (~a || ~b)', '(a => b) & (b => c) => (a => c)', 'a & b || c => ~a <=> b'])
+def test_compiled_formula_matches_its_meaning(text):
+    formula = parse_formula(text)
+    symbols = sorted(formula.symbols())
+    check = compile_formula(formula, {symbol: j for j, symbol in enumerate(symbols)})
+    for values in product((False, True), repeat=len(symbols)):
+        assert check(values) == evaluate(formula, dict(zip(symbols, values))), values
+
+
+def test_empty_conjunction_compiles_to_none():
+    assert compile_conjunction([], {}) is None
+    both = compile_conjunction([parse_formula('a'), parse_formula('~b')], {'a': 0, 'b': 1})
+    assert [both(values) for values in product((False, True), repeat=2)] == [False, False, True, False]
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_counts_match_brute_force(seed):
+    rng = random.Random(seed)
+    clauses, query = random_generic_kb(rng, rng.randint(1, 7), rng.randint(1, 6))
+    kb_models, proving_models = brute_force_counts(clauses, query)
+    solver = TruthTable(clauses, slice_query=False, horn_fast_path=False)
+    assert solver.solve(query) == (kb_models > 0 and proving_models == kb_models, proving_models)
+
+
+def test_testcase_counts():
+    assert TruthTable(HORN).solve('d') == (True, 3)
+    assert TruthTable(HORN, horn_fast_path=False, slice_query=False).solve('d') == (True, 3)
+    assert TruthTable(['a || b', '~a']).solve('b') == (True, 1)
+    assert TruthTable(['a || b']).solve('a') == (False, 2)
+
+
+def test_invalid_mode_is_rejected():
+    with pytest.raises(ValueError):
+        TruthTable(HORN, mode='fast')
+
+
+@pytest.mark.parametrize('seed', range(40))
+@pytest.mark.parametrize('block_size', [64, 100, TruthTable.DEFAULT_BLOCK_SIZE])
+def test_vectorized_counts_match_enumeration(seed, block_size):
+    pytest.importorskip('numpy')
+    rng = random.Random(seed)
+    # From one symbol (a partial word) to ten (several words, and several blocks when they are small)
+    clauses, query = random_generic_kb(rng, 1 + seed % 10, rng.randint(1, 6))
+    expected = TruthTable(clauses, slice_query=False, horn_fast_path=False).solve(query)
+    solver = TruthTable(clauses, mode='vectorized', block_size=block_size, slice_query=False, horn_fast_path=False)
+    assert solver.solve(query) == expected
+
+
+def test_vectorized_prefix_ranges_add_up():
+    pytest.importorskip('numpy')
+    clauses, query = random_generic_kb(random.Random(3), 10, 8)
+    solver = TruthTable(clauses, mode='vectorized', block_size=128, slice_query=False, horn_fast_path=False)
+    n_symbols = len(solver._prepare(query)[0])
+    assert n_symbols >= 8
+    ranges = [solver._count_vectorized(query, prefix, 2) for prefix in range(4)]
+    assert tuple(map(sum, zip(*ranges))) == solver._count_enumerate(query)
+    assert solver._count_enumerate(query, 1, 2) == ranges[1]
+    solver.solve(query)
+    # One KB evaluation per 64-model word
+    assert solver.stats['kb_evaluations'] == 2 ** n_symbols // 64
+
+
+def test_invalid_block_size_is_rejected():
+    with pytest.raises(ValueError):
+        TruthTable(HORN, mode='vectorized', block_size=0)
+
+
+@pytest.mark.parametrize('row_filter', TruthTable.ROW_FILTERS)
+@pytest.mark.parametrize('limit', [1, 5, 64])
+def test_pages_add_up_to_the_full_table(row_filter, limit):
+    solver = TruthTable(HORN)
+    full = solver.get_truth_table('d', filter=row_filter)
+    rows, start = [], 0
+    while True:
+        page = solver.get_truth_table('d', start, limit, row_filter)
+        assert len(page['rows']) <= limit
+        assert page['page'] == {'start': start, 'limit': limit, 'filter': row_filter, 'has_more': page['page']['has_more']}
+        rows += page['rows']
+        start += limit
+        if not page['page']['has_more']:
+            break
+    assert rows == full['rows']
+    assert full['page']['has_more'] is False
+    assert page['summary'] == full['summary'] == {'total_models': 2 ** len(full['symbols']), 'kb_models': 3,
+                                                  'proving_models': 3, 'is_entailed': True}
+
+
+def test_row_filters():
+    clauses, query = ['a || b', 'b => c'], 'c'
+    solver = TruthTable(clauses)
+    everything = list(solver.iter_truth_table(query))
+    assert [row['index'] for row in everything] == list(range(8))
+    for row in everything:
+        assert row['kb_satisfied'] == all(row['kb_results']) == all(evaluate(parse_formula(clause), row['model'])
+                                                                     for clause in clauses)
+        assert row['query_result'] == row['model']['c']
+        assert row['proves_query'] == (row['kb_satisfied'] and row['query_result'])
+    assert list(solver.iter_truth_table(query, filter='kb_satisfied')) == [row for row in everything
+                                                                           if row['kb_satisfied']]
+    assert list(solver.iter_truth_table(query, filter='proves_query')) == [row for row in everything
+                                                                           if row['proves_query']]
+    assert list(solver.iter_truth_table(query, 1, 2, 'proves_query')) == [row for row in everything
+                                                                          if row['proves_query']][1:3]
+    assert list(solver.iter_truth_table(query, 8)) == []
+
+
+@pytest.mark.parametrize('options', [{'filter': 'models'}, {'start': -1}, {'limit': -1}])
+def test_invalid_page_is_rejected(options):
+    with pytest.raises(ValueError):
+        list(TruthTable(HORN).iter_truth_table('d', **options))
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_pruned_counts_match_enumeration(seed):
+    rng = random.Random(seed)
+    clauses, query = random_generic_kb(rng, rng.randint(1, 8), rng.randint(1, 8))
+    expected = TruthTable(clauses, slice_query=False, horn_fast_path=False).solve(query)
+    solver = TruthTable(clauses, mode='pruned', slice_query=False, horn_fast_path=False)
+    assert solver.solve(query) == expected
+    assert solver.stats['models_evaluated'] == solver.stats['kb_evaluations'] == solver.nodes_visited
+
+
+def test_pruned_search_skips_decided_subtrees():
+    size = 20
+    clauses = ['p0'] + [f'p{i} => p{i + 1}' for i in range(size)]
+    solver = TruthTable(clauses, mode='pruned', slice_query=False, horn_fast_path=False)
+    assert solver.solve(f'p{size}') == (True, 1)
+    assert solver.nodes_visited < size * size
+    assert solver.stats['models_evaluated'] < 2 ** size
+
+
+@pytest.mark.parametrize('mode', ['enumerate', 'vectorized'])
+@pytest.mark.parametrize('seed', range(3))
+def test_parallel_counts_match_serial(mode, seed):
+    if mode == 'vectorized':
+        pytest.importorskip('numpy')
+    # Enough symbols for the vectorized mode to split the space after its 64-model words
+    clauses, query = random_generic_kb(random.Random(seed), 12, 10)
+    options = {'mode': mode, 'slice_query': False, 'horn_fast_path': False}
+    assert TruthTable(clauses, workers=2, **options).solve(query) == TruthTable(clauses, **options).solve(query)
+
+
+def test_invalid_workers_are_rejected():
+    with pytest.raises(ValueError):
+        TruthTable(HORN, workers=0)
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_component_counts_match_enumeration(seed):
+    rng = random.Random(seed)
+    clauses, query = random_generic_kb(rng, rng.randint(1, 8), rng.randint(1, 8))
+    expected = TruthTable(clauses, slice_query=False, horn_fast_path=False).solve(query)
+    assert TruthTable(clauses, mode='components', slice_query=False, horn_fast_path=False).solve(query) == expected
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_model_counter_matches_brute_force(seed):
+    rng = random.Random(seed)
+    n_vars = rng.randint(1, 10)
+    clauses = [[rng.choice((-1, 1)) * rng.randint(1, n_vars) for _ in range(rng.randint(1, 3))]
+               for _ in range(rng.randint(0, 12))]
+    expected = sum(all(any(values[abs(lit) - 1] == (lit > 0) for lit in clause) for clause in clauses)
+                   for values in product((False, True), repeat=n_vars))
+    assert _ModelCounter().count(clauses, n_vars) == expected
+
+
+def test_components_count_independent_parts_apart():
+    # 3^40 KB models: far beyond enumeration, but forty two-variable components
+    size = 40
+    clauses = [f'x{i} || y{i}' for i in range(size)]
+    solver = TruthTable(clauses, mode='components', slice_query=False, horn_fast_path=False)
+    assert solver.solve('x0') == (False, 2 * 3 ** (size - 1))
+    first_decisions = solver.stats['decisions']
+    assert first_decisions <= 4 * size
+    # The KB's components are cached, so a later query only searches what its own clause changes
+    assert solver.solve('y1') == (False, 2 * 3 ** (size - 1))
+    assert solver.stats['cache_hits'] > 0
+    assert solver.stats['decisions'] < first_decisions
+
+
+@pytest.mark.parametrize('seed', range(150))
+def test_sliced_counts_match_unsliced(seed):
+    rng = random.Random(seed)
+    clauses, query = random_generic_kb(rng, rng.randint(2, 8), rng.randint(1, 8))
+    expected = TruthTable(clauses, slice_query=False, horn_fast_path=False).solve(query)
+    assert TruthTable(clauses, horn_fast_path=False).solve(query) == expected
+    assert TruthTable(clauses).solve(query) == expected
+
+
+@pytest.mark.parametrize('rest, factor', [
+    (['x || y'], 3),  # Rest with 3 models of its own
+    (['x', 'y', 'z'], 1),  # Rest fixed entirely
+    (['x || y', 'u', 'v || ~v'], 6),  # Rest with a tautology over its own symbol
+])
+def test_truth_table_slicing_scales_counts(rest, factor):
+    part = ['a => b', 'b => c', 'a']
+    sliced = TruthTable(part + rest)
+    result = sliced.solve('c')
+    assert result == TruthTable(part + rest, slice_query=False).solve('c')
+    assert result == (True, TruthTable(part).solve('c')[1] * factor)
+    assert sliced.stats['sliced_clauses'] == len(rest)
+
+
+def test_truth_table_slicing_with_inconsistent_rest():
+    clauses = ['a => b', 'a', 'x', '~x']
+    assert TruthTable(clauses).solve('b') == (False, 0)
+    assert TruthTable(clauses, slice_query=False).solve('b') == (False, 0)
+
+
+def test_only_a_repeated_solve_is_a_memo_hit():
+    solver = TruthTable(HORN, horn_fast_path=False)
+    assert solver.solve('d') == (True, 3)
+    evaluated = solver.stats['models_evaluated']
+    # The page's summary reuses the count without changing the solve's stats
+    assert solver.get_truth_table('d', limit=4)['summary']['proving_models'] == 3
+    assert solver.stats['memo_hits'] == 0
+    assert solver.stats['models_evaluated'] == evaluated
+    assert solver.solve('d') == (True, 3)
+    assert solver.stats['memo_hits'] == 1
+    assert solver.stats['models_evaluated'] == 0